@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Build the site with the production base path
-python3 src/main.py "/static-website-generator-/"
+python3 src/main.py "/static-website-generator-/" --site-url "https://timdehof.github.io"
 
 # Print success message
 echo "Site built successfully with production base path!"
\ No newline at end of file
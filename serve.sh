@@ -0,0 +1 @@
+python3 src/devserver.py "$@"
\ No newline at end of file
@@ -0,0 +1,338 @@
+import os
+import sys
+import gzip
+import json
+import shutil
+import timeit
+import logging
+import argparse
+import resource
+import tempfile
+import functools
+import tracemalloc
+from textnode import TextNode
+from text_type import TextType, BlockType
+from block import block_lines_to_block_type, iter_blocks
+from document import parse_document
+from markdown_to_html import markdown_to_html_node
+from main import generate_pages_recursive
+from build_report import count_nodes
+from search_index import SearchIndex, page_terms
+from corpus import CORPUS_SHAPES, corpus_pages, write_corpus
+
+# Template for the build benchmark; the real one's head is irrelevant to timing
+BENCHMARK_TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+# A stage is a regression when it's this much slower than its baseline
+DEFAULT_THRESHOLD = 0.25
+
+def time_call(func, repeat: int = 5, number: int = 1) -> float:
+    """Return the best per-call time of func in seconds over several runs."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+def link_heavy_paragraph(links: int = 500, repeated: bool = False) -> str:
+    """Build a paragraph with many inline links (all identical if repeated)."""
+    return " ".join(
+        f"see [link {0 if repeated else i}](https://example.com/{0 if repeated else i}) here"
+        for i in range(links)
+    )
+
+def image_heavy_paragraph(images: int = 500) -> str:
+    """Build a paragraph with many inline images."""
+    return " ".join(f"look ![image {i}](/images/{i}.png) here" for i in range(images))
+
+def mixed_blocks(count: int = 1000) -> list[list[str]]:
+    """Build the line lists of a realistic mix of blocks, mostly paragraphs."""
+    shapes = [
+        ["A paragraph of ordinary prose that goes on for a while.", "It wraps onto a second line."],
+        ["## A section heading"],
+        ["Another paragraph, this one on a single line."],
+        ["- first item", "- second item", "- third item"],
+        ["A third paragraph with **bold** and a [link](/somewhere)."],
+        ["1. first step", "2. second step", "3. third step", "4. fourth step"],
+        ["> a quoted line", "> and another"],
+        ["```", "print('hello')", "```"],
+        ["One more paragraph to end the section."],
+        ["Dates like 2024 at the start make a paragraph that looks like a list."],
+    ]
+    return [shapes[i % len(shapes)] for i in range(count)]
+
+def bench_classify_blocks() -> float:
+    blocks = mixed_blocks()
+    return time_call(lambda: [block_lines_to_block_type(lines) for lines in blocks])
+
+def synthetic_markdown(sections: int = 200) -> str:
+    """Build a large markdown document made of many similar sections."""
+    parts = []
+    for i in range(sections):
+        parts.append(f"## Section {i}")
+        parts.append(
+            f"Paragraph {i} has **bold**, *italic* and `code` spans, a [link](/page/{i}) "
+            f"and an ![image](/images/{i}.png) among plenty of plain words."
+        )
+        parts.append("\n".join(f"- item {j} with _emphasis_" for j in range(5)))
+        parts.append("\n".join(f"{j + 1}. step {j}" for j in range(3)))
+        parts.append("> A quoted line\n> with **weight**")
+        parts.append("```\nprint('section')\n```")
+    return "# Synthetic Document\n\n" + "\n\n".join(parts)
+
+def memory_report(sections: int = 2000) -> dict:
+    """Measure the memory held by the parsed tree of a large synthetic document.
+
+    Returns:
+        A dict with the node count, traced bytes held by the tree, bytes per
+        node and the process's peak RSS in bytes
+    """
+    markdown = synthetic_markdown(sections)
+    tracemalloc.start()
+    try:
+        document = parse_document(markdown)
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    nodes = count_nodes(document.root)
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"nodes": nodes, "bytes": held, "bytes_per_node": held / nodes, "peak_rss": peak_rss}
+
+def bench_split_links() -> float:
+    nodes = [TextNode(link_heavy_paragraph(), TextType.TEXT)]
+    return time_call(lambda: TextNode.split_nodes_link(nodes))
+
+def bench_split_links_repeated() -> float:
+    nodes = [TextNode(link_heavy_paragraph(repeated=True), TextType.TEXT)]
+    return time_call(lambda: TextNode.split_nodes_link(nodes))
+
+def bench_split_images() -> float:
+    nodes = [TextNode(image_heavy_paragraph(), TextType.TEXT)]
+    return time_call(lambda: TextNode.split_nodes_image(nodes))
+
+def bench_inline_links() -> float:
+    text = link_heavy_paragraph()
+    return time_call(lambda: TextNode.text_to_textnodes(text))
+
+class Corpus:
+    """A synthetic site, with the inputs of every pipeline stage precomputed."""
+    def __init__(self, shape: str = "mixed", pages: int = None, seed: int = 0):
+        self.shape = shape
+        self.seed = seed
+        self.pages = corpus_pages(shape, pages, seed)
+        self.markdown = [markdown for _, markdown in self.pages]
+
+    def settings(self) -> dict:
+        """Describe the corpus, so timings are only compared against the same site."""
+        return {"shape": self.shape, "pages": len(self.pages), "seed": self.seed}
+
+    @functools.cached_property
+    def blocks(self) -> list:
+        return [block for markdown in self.markdown for block in iter_blocks(markdown)]
+
+    @functools.cached_property
+    def paragraphs(self) -> list[str]:
+        return [" ".join(block.lines) for block in self.blocks if block.block_type == BlockType.PARAGRAPH]
+
+    @functools.cached_property
+    def trees(self) -> list:
+        return [markdown_to_html_node(markdown) for markdown in self.markdown]
+
+    @functools.cached_property
+    def terms(self) -> list[dict[str, int]]:
+        return [page_terms(tree) for tree in self.trees]
+
+    def search_index(self, prefix_length: int = None) -> SearchIndex:
+        """Build a search index of every page, as a full --search build does."""
+        index = SearchIndex() if prefix_length is None else SearchIndex(prefix_length=prefix_length)
+        for i, terms in enumerate(self.terms):
+            index.update(f"/page-{i}/", f"Page {i}", terms)
+        return index
+
+def bench_block_split(corpus: Corpus) -> float:
+    return time_call(lambda: [list(iter_blocks(markdown)) for markdown in corpus.markdown])
+
+def bench_block_type(corpus: Corpus) -> float:
+    blocks = [block.lines for block in corpus.blocks]
+    return time_call(lambda: [block_lines_to_block_type(lines) for lines in blocks])
+
+def bench_text_to_textnodes(corpus: Corpus) -> float:
+    paragraphs = corpus.paragraphs
+    return time_call(lambda: [TextNode.text_to_textnodes(text) for text in paragraphs])
+
+def bench_markdown_to_html_node(corpus: Corpus) -> float:
+    return time_call(lambda: [markdown_to_html_node(markdown) for markdown in corpus.markdown])
+
+def bench_to_html(corpus: Corpus) -> float:
+    trees = corpus.trees
+    return time_call(lambda: [tree.to_html() for tree in trees])
+
+def bench_to_html_minify(corpus: Corpus) -> float:
+    trees = corpus.trees
+    return time_call(lambda: [tree.to_html(minify=True) for tree in trees])
+
+def bench_search_terms(corpus: Corpus) -> float:
+    trees = corpus.trees
+    return time_call(lambda: [page_terms(tree) for tree in trees])
+
+def bench_search_index(corpus: Corpus) -> float:
+    """Time indexing every page's terms and rendering all of the index's files."""
+    corpus.terms
+    return time_call(lambda: corpus.search_index().render_changes())
+
+def index_size_report(corpus: Corpus, prefix_lengths: tuple[int, ...] = (1, 2, 3)) -> dict:
+    """Measure the search index's shards for each shard prefix length.
+
+    Returns:
+        Prefix length -> a dict with the shard count, total and gzipped bytes
+        of the shards, and the name and bytes of the largest shard
+    """
+    report = {}
+    for prefix_length in prefix_lengths:
+        index = corpus.search_index(prefix_length)
+        shards = {name[len("shards/"):-len(".json")]: text.encode("utf-8")
+                  for name, text in index.render_changes().items() if name != "docs.json"}
+        largest = max(shards, key=lambda name: len(shards[name]))
+        report[prefix_length] = {
+            "shards": len(shards),
+            "bytes": sum(len(data) for data in shards.values()),
+            "gzip_bytes": sum(len(gzip.compress(data)) for data in shards.values()),
+            "largest": largest,
+            "largest_bytes": len(shards[largest]),
+        }
+    return report
+
+def bench_build(corpus: Corpus) -> float:
+    """Time a full build of the corpus with generate_pages_recursive."""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        content_dir = os.path.join(temp_dir, "content")
+        write_corpus(content_dir, corpus.shape, len(corpus.pages), corpus.seed)
+        template_path = os.path.join(temp_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write(BENCHMARK_TEMPLATE)
+        dest_dir = os.path.join(temp_dir, "docs")
+
+        # Per-page log lines would dominate the timing
+        logging.disable(logging.INFO)
+        try:
+            return time_call(lambda: generate_pages_recursive(content_dir, template_path, dest_dir), repeat=3)
+        finally:
+            logging.disable(logging.NOTSET)
+    finally:
+        shutil.rmtree(temp_dir)
+
+# Pipeline stages, timed over the whole synthetic corpus
+STAGES = {
+    "block_split": bench_block_split,
+    "block_type": bench_block_type,
+    "text_to_textnodes": bench_text_to_textnodes,
+    "markdown_to_html_node": bench_markdown_to_html_node,
+    "to_html": bench_to_html,
+    "to_html_minify": bench_to_html_minify,
+    "search_terms": bench_search_terms,
+    "search_index": bench_search_index,
+    "build": bench_build,
+}
+
+def compare_results(baseline: dict, results: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Find the benchmarks that got slower than their baseline by more than the threshold.
+
+    Args:
+        baseline: Benchmark name -> seconds, from a saved baseline
+        results: Benchmark name -> seconds, from this run
+        threshold: Allowed slowdown as a fraction of the baseline (defaults to 0.25)
+
+    Returns:
+        The names of the regressed benchmarks; ones missing from the baseline are skipped
+    """
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + threshold)]
+
+def load_baseline(path: str, corpus: Corpus) -> dict:
+    """
+    Load the results of a saved baseline.
+
+    Raises:
+        ValueError: If the baseline was taken on a different corpus
+    """
+    with open(path, "r") as f:
+        baseline = json.load(f)
+    if baseline.get("corpus") != corpus.settings():
+        raise ValueError(f"Baseline {path} was taken on a different corpus: {baseline.get('corpus')}")
+    return baseline["results"]
+
+def save_baseline(path: str, corpus: Corpus, results: dict) -> None:
+    """Save this run's results as the baseline for later runs."""
+    with open(path, "w") as f:
+        json.dump({"corpus": corpus.settings(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+BENCHMARKS = {
+    "split_links": bench_split_links,
+    "split_links_repeated": bench_split_links_repeated,
+    "split_images": bench_split_images,
+    "inline_links": bench_inline_links,
+    "classify_blocks": bench_classify_blocks,
+}
+
+def main(*argv) -> int:
+    parser = argparse.ArgumentParser(description="Time the generator's hot paths and pipeline stages.")
+    parser.add_argument("names", nargs="*", help="Benchmarks and stages to run (defaults to all)")
+    parser.add_argument("--memory", action="store_true",
+                        help="Report bytes per node and peak RSS for a large synthetic document instead")
+    parser.add_argument("--index-size", action="store_true",
+                        help="Report the search index's shard count and sizes per shard prefix length instead")
+    parser.add_argument("--shape", choices=CORPUS_SHAPES, default="mixed",
+                        help="Shape of the synthetic site the stages run on (defaults to mixed)")
+    parser.add_argument("--pages", type=int, help="Number of pages in the synthetic site (defaults to the shape's)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic site (defaults to 0)")
+    parser.add_argument("--baseline", help="Compare against the results saved in this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Fail when a benchmark is slower than its baseline by more than this fraction "
+                             f"(defaults to {DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        report = memory_report()
+        print(f"nodes: {report['nodes']}")
+        print(f"tree bytes: {report['bytes']}")
+        print(f"bytes per node: {report['bytes_per_node']:.1f}")
+        print(f"peak RSS: {report['peak_rss'] / (1 << 20):.1f} MiB")
+        return 0
+
+    if args.index_size:
+        corpus = Corpus(args.shape, args.pages, args.seed)
+        for prefix_length, report in index_size_report(corpus).items():
+            print(f"prefix {prefix_length}: {report['shards']} shards, {report['bytes'] / 1024:.1f} KiB "
+                  f"({report['gzip_bytes'] / 1024:.1f} KiB gzipped), largest {report['largest']} "
+                  f"{report['largest_bytes'] / 1024:.1f} KiB")
+        return 0
+
+    names = args.names or [*BENCHMARKS, *STAGES]
+    for name in names:
+        if name not in BENCHMARKS and name not in STAGES:
+            raise ValueError(f"Unknown benchmark: {name}")
+
+    corpus = Corpus(args.shape, args.pages, args.seed)
+    baseline = load_baseline(args.baseline, corpus) if args.baseline else {}
+    results = {}
+    for name in names:
+        seconds = BENCHMARKS[name]() if name in BENCHMARKS else STAGES[name](corpus)
+        results[name] = seconds
+        if name in baseline:
+            change = (seconds / baseline[name] - 1) * 100
+            print(f"{name}: {seconds * 1000:.3f} ms (baseline {baseline[name] * 1000:.3f} ms, {change:+.1f}%)")
+        else:
+            print(f"{name}: {seconds * 1000:.3f} ms")
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, corpus, results)
+
+    regressions = compare_results(baseline, results, args.threshold)
+    for name in regressions:
+        print(f"Regression: {name} is more than {args.threshold:.0%} slower than its baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -1,6 +1,71 @@
 import re
+from typing import Iterable, Iterator
 from text_type import BlockType
 
+class Block:
+    """A markdown block: its lines, stripped of surrounding whitespace, and its type."""
+    __slots__ = ("lines", "block_type")
+
+    def __init__(self, lines: list[str], block_type: BlockType):
+        self.lines = lines
+        self.block_type = block_type
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def __eq__(self, value: object) -> bool:
+        return (
+            isinstance(value, Block)
+            and self.lines == value.lines
+            and self.block_type == value.block_type
+        )
+
+    def __repr__(self) -> str:
+        return f"Block({self.lines}, {self.block_type.value})"
+
+def iter_blocks(source: str | Iterable[str]) -> Iterator[Block]:
+    """Split a markdown document into typed blocks, one line at a time.
+
+    Blocks are separated by blank lines, except inside a fenced code block,
+    which runs from its opening ``` line to the closing one even if it
+    contains blank lines. Each block is classified as soon as it ends.
+
+    Args:
+        source: The markdown document as a string, or any iterable of lines
+            such as an open file
+
+    Yields:
+        The document's non-empty blocks, in order
+    """
+    if isinstance(source, str):
+        source = source.split("\n")
+
+    lines = []
+    in_fence = False
+    for line in source:
+        line = line.strip()
+        if in_fence:
+            lines.append(line)
+            if line.startswith("```"):
+                in_fence = False
+            continue
+
+        if not line:
+            if lines:
+                yield Block(lines, block_lines_to_block_type(lines))
+                lines = []
+            continue
+
+        # A fence opens a code block only at the start of a block, and only if
+        # it isn't closed on the same line
+        if not lines and line.startswith("```") and "```" not in line[3:]:
+            in_fence = True
+        lines.append(line)
+
+    if lines:
+        yield Block(lines, block_lines_to_block_type(lines))
+
 def block_to_block_type(block: str) -> BlockType:
     """Determine the type of a markdown block.
 
@@ -14,28 +79,68 @@ def block_to_block_type(block: str) -> BlockType:
     if not block:
         return BlockType.PARAGRAPH
 
-    # Check for heading (1-6 # characters followed by space)
-    if re.match(r'^#{1,6} ', block):
+    return block_lines_to_block_type(block.split('\n'))
+
+# Patterns for the start of heading lines and ordered list items
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+ORDERED_ITEM_PATTERN = re.compile(r"(\d+)\. ")
+
+def _classify_heading(lines: list[str]) -> BlockType:
+    # 1-6 # characters followed by a space
+    if HEADING_PATTERN.match(lines[0]):
         return BlockType.HEADING
+    return BlockType.PARAGRAPH
 
-    # Check for code block (starts and ends with ```)
-    if block.startswith('```') and block.endswith('```'):
+def _classify_code(lines: list[str]) -> BlockType:
+    # Starts and ends with ```
+    if lines[0].startswith("```") and lines[-1].endswith("```"):
         return BlockType.CODE
+    return BlockType.PARAGRAPH
+
+def _classify_quote(lines: list[str]) -> BlockType:
+    # Every line starts with >
+    for line in lines:
+        if not line.startswith(">"):
+            return BlockType.PARAGRAPH
+    return BlockType.QUOTE
+
+def _classify_unordered_list(lines: list[str]) -> BlockType:
+    # Every line starts with "- "
+    for line in lines:
+        if not line.lstrip().startswith("- "):
+            return BlockType.PARAGRAPH
+    return BlockType.UNORDERED_LIST
 
-    # Split into lines for multi-line block checks
-    lines = block.split('\n')
+def _classify_ordered_list(lines: list[str]) -> BlockType:
+    # Lines start with "1. ", "2. ", ... in order
+    for number, line in enumerate(lines, 1):
+        match = ORDERED_ITEM_PATTERN.match(line.lstrip())
+        if match is None or match.group(1)[0] == "0" or int(match.group(1)) != number:
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
 
-    # Check for quote block (every line starts with >)
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
+# Classifier for each character a non-paragraph block can start with
+BLOCK_CLASSIFIERS = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_unordered_list,
+    **{digit: _classify_ordered_list for digit in "0123456789"},
+}
 
-    # Check for unordered list (every line starts with -)
-    if all(line.strip().startswith('- ') for line in lines):
-        return BlockType.UNORDERED_LIST
+def block_lines_to_block_type(lines: list[str]) -> BlockType:
+    """Determine the type of a markdown block that is already split into lines.
 
-    # Check for ordered list (lines start with incrementing numbers)
-    if all(line.strip().startswith(f"{i+1}. ") for i, line in enumerate(lines)):
-        return BlockType.ORDERED_LIST
+    Only the check for the kind of block the first character can start is
+    run, so a plain paragraph costs a single dictionary lookup.
 
-    # Default to paragraph
-    return BlockType.PARAGRAPH
\ No newline at end of file
+    Args:
+        lines: The lines of the block, the first of them non-empty
+
+    Returns:
+        The BlockType of the block
+    """
+    classifier = BLOCK_CLASSIFIERS.get(lines[0].lstrip()[:1])
+    if classifier is None:
+        return BlockType.PARAGRAPH
+    return classifier(lines)
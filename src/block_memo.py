@@ -0,0 +1,123 @@
+import os
+import marshal
+from collections import OrderedDict
+from block import Block
+from htmlnode import HTMLNode, RenderedNode
+from markdown_to_html import block_to_html_node
+from manifest import GENERATOR_VERSION, hash_bytes
+from urls import URL_PROPS, is_root_relative
+
+# Stands in for the leading slash of root-relative URLs while a block is rendered
+URL_MARKER = "\0"
+
+# Blocks kept in memory by default
+DEFAULT_MAXSIZE = 50_000
+
+class BlockMemo:
+    """LRU cache of rendered blocks, keyed by a hash of each block's markdown.
+
+    A block that was rendered before, on this page or any other, in this run
+    or a saved earlier one, becomes a RenderedNode without being parsed or
+    rendered again. Editing one section of a huge document then only costs
+    the blocks that changed.
+
+    Blocks are rendered for the base path "/" and split where root-relative
+    URLs start, so one entry serves every base path. A memo renders blocks
+    either minified or not, for pages rendered the same way. Keying on the
+    hash rather than the markdown keeps a big code block or table from being
+    held twice, once in its entry and once in the page.
+    """
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, path: str = None, minify: bool = False):
+        self.maxsize = maxsize
+        self.path = path
+        self.minify = minify
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: str, maxsize: int = DEFAULT_MAXSIZE, minify: bool = False) -> "BlockMemo":
+        """
+        Load a memo saved by an earlier build.
+
+        Args:
+            path: Path of the saved memo; save() writes back to it
+            maxsize: Number of blocks to keep (defaults to DEFAULT_MAXSIZE)
+            minify: Render blocks minified (defaults to False)
+
+        Returns:
+            The loaded memo, or an empty one if the file is missing, unreadable,
+            from another generator version or rendered the other way
+        """
+        memo = cls(maxsize, path, minify)
+        try:
+            with open(path, "rb") as f:
+                version, saved_minify, entries = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return memo
+        if version == GENERATOR_VERSION and saved_minify == minify:
+            for key, parts, texts in entries[-maxsize:]:
+                memo.entries[key] = (parts, texts)
+        return memo
+
+    def save(self) -> None:
+        """Write the memo to its path atomically, least recently used blocks first."""
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        entries = [(key, parts, texts) for key, (parts, texts) in self.entries.items()]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps((GENERATOR_VERSION, self.minify, entries)))
+        os.replace(tmp_path, self.path)
+
+    def node(self, block: Block, base_path: str = "/") -> HTMLNode:
+        """
+        Return the HTML node of a block, rendering it only if it isn't memoized.
+
+        Args:
+            block: The block to convert
+            base_path: Base path to resolve root-relative URLs against (defaults to "/")
+
+        Returns:
+            A RenderedNode holding the block's HTML
+        """
+        key = hash_bytes(block.text.encode("utf-8"))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return RenderedNode(entry[0], entry[1], base_path)
+
+        self.misses += 1
+        if URL_MARKER in block.text:
+            # The marker can't be told apart from the block's own text
+            return block_to_html_node(block, base_path)
+        entry = render_block(block, self.minify)
+        self.entries[key] = entry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return RenderedNode(entry[0], entry[1], base_path)
+
+def render_block(block: Block, minify: bool = False) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Render a block for any base path, minified if minify.
+
+    Returns:
+        The block's HTML split where root-relative URLs start, to be joined
+        with the base path, and the text values of its leaves
+    """
+    node = block_to_html_node(block, "/")
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.props is not None:
+            for name in URL_PROPS:
+                url = current.props.get(name)
+                if url is not None and is_root_relative(url):
+                    current.props[name] = URL_MARKER + url[1:]
+        if current.children:
+            stack.extend(current.children)
+    return tuple(node.to_html(minify).split(URL_MARKER)), tuple(node.iter_text())
@@ -0,0 +1,122 @@
+import os
+import json
+from htmlnode import HTMLNode
+
+# Stages of generating a page, in pipeline order
+PAGE_STAGES = ("read", "block_split", "inline_parse", "render", "template", "write")
+
+class PageStats:
+    """Timings and counters of generating one page.
+
+    Attributes:
+        source: Path of the markdown file
+        dest: Path of the generated HTML file
+        times: Seconds spent in each of PAGE_STAGES
+        nodes: Number of nodes in the page's HTMLNode tree
+        output_bytes: Size of the generated HTML file
+        document_cached: Whether the parsed document came from the document cache
+    """
+    __slots__ = ("source", "dest", "times", "nodes", "output_bytes", "document_cached")
+
+    def __init__(self, source: str, dest: str):
+        self.source = source
+        self.dest = dest
+        self.times = dict.fromkeys(PAGE_STAGES, 0.0)
+        self.nodes = 0
+        self.output_bytes = 0
+        self.document_cached = False
+
+    @property
+    def total(self) -> float:
+        return sum(self.times.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "dest": self.dest,
+            "total": self.total,
+            "times": self.times,
+            "nodes": self.nodes,
+            "output_bytes": self.output_bytes,
+            "document_cached": self.document_cached,
+        }
+
+def count_nodes(node: HTMLNode) -> int:
+    """Count the nodes of an HTMLNode tree."""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
+
+class BuildReport:
+    """Collects the per-page stats and cache counters of a build."""
+    def __init__(self):
+        self.pages = []
+        self.counters = {}
+
+    def add_page(self, stats: PageStats) -> None:
+        self.pages.append(stats)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a named counter, such as a cache's hits or misses."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self, slowest: int = 10) -> dict:
+        """
+        Summarize the build across every generated page.
+
+        Args:
+            slowest: Number of slowest pages to list (defaults to 10)
+
+        Returns:
+            A dict with the page count, total time, per-stage times, node and
+            byte totals, the slowest pages and the cache counters
+        """
+        stage_times = dict.fromkeys(PAGE_STAGES, 0.0)
+        for page in self.pages:
+            for stage, seconds in page.times.items():
+                stage_times[stage] += seconds
+
+        by_time = sorted(self.pages, key=lambda page: page.total, reverse=True)
+        counters = dict(self.counters)
+        counters["document_cache_hits"] = sum(page.document_cached for page in self.pages)
+        counters["document_cache_misses"] = len(self.pages) - counters["document_cache_hits"]
+        return {
+            "pages": len(self.pages),
+            "total": sum(stage_times.values()),
+            "times": stage_times,
+            "nodes": sum(page.nodes for page in self.pages),
+            "output_bytes": sum(page.output_bytes for page in self.pages),
+            "slowest": [{"dest": page.dest, "total": page.total} for page in by_time[:slowest]],
+            "counters": counters,
+        }
+
+    def write(self, path: str, slowest: int = 10) -> None:
+        """
+        Write the report as JSON, or as JSONL if the path ends in .jsonl.
+
+        JSON holds a single object with the summary and a list of pages. JSONL
+        has one line per page followed by a summary line, each tagged with a
+        "type", so it can be streamed and grepped.
+
+        Args:
+            path: Path of the report file
+            slowest: Number of slowest pages to list in the summary (defaults to 10)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        summary = self.summary(slowest)
+        with open(path, "w") as f:
+            if path.endswith(".jsonl"):
+                for page in self.pages:
+                    f.write(json.dumps({"type": "page", **page.to_dict()}) + "\n")
+                f.write(json.dumps({"type": "summary", **summary}) + "\n")
+            else:
+                json.dump({"summary": summary, "pages": [page.to_dict() for page in self.pages]}, f, indent=2)
+                f.write("\n")
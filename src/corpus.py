@@ -0,0 +1,144 @@
+import os
+import random
+
+WORDS = (
+    "the ring was forged in fire and shadow beneath the mountain while elves sang "
+    "of stars over quiet rivers and hobbits kept gardens far from any road or war"
+).split()
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _inline_paragraph(rng: random.Random, index: int, sentences: int = 3) -> str:
+    """A paragraph with a few of each inline span among plain prose."""
+    parts = [_sentence(rng) for _ in range(sentences)]
+    parts.insert(1, f"It has **bold {index}**, _italic_ and `code` spans")
+    parts.append(f"See [page {index}](/posts/post-{index}) and ![figure {index}](/images/{index % 10}.png).")
+    return " ".join(parts)
+
+def _link_paragraph(rng: random.Random, links: int = 40) -> str:
+    """A paragraph made almost entirely of links and images."""
+    parts = []
+    for i in range(links):
+        if i % 4 == 3:
+            parts.append(f"![shot {i}](/images/{rng.randrange(100)}.png)")
+        else:
+            parts.append(f"[{rng.choice(WORDS)} {i}](https://example.com/{rng.randrange(10000)})")
+    return " then ".join(parts)
+
+def _list_block(rng: random.Random, items: int, ordered: bool) -> str:
+    lines = []
+    for i in range(items):
+        marker = f"{i + 1}." if ordered else "-"
+        lines.append(f"{marker} {_sentence(rng, 6)} with *emphasis* and a [link](/list/{i})")
+    return "\n".join(lines)
+
+def _sections(rng: random.Random, index: int, sections: int) -> list[str]:
+    """A realistic run of headed sections mixing every block type."""
+    blocks = []
+    for section in range(sections):
+        blocks.append(f"## Section {section}")
+        blocks.append(_inline_paragraph(rng, index))
+        kind = section % 4
+        if kind == 0:
+            blocks.append(_list_block(rng, 4, ordered=False))
+        elif kind == 1:
+            blocks.append(_list_block(rng, 3, ordered=True))
+        elif kind == 2:
+            blocks.append(f"> {_sentence(rng)}\n> {_sentence(rng)}")
+        else:
+            blocks.append(f"```\ndef section_{section}():\n    return {section}\n```")
+        blocks.append(_sentence(rng, 20))
+    return blocks
+
+def small_post(rng: random.Random, index: int) -> list[str]:
+    """A short blog post: a couple of sections."""
+    return _sections(rng, index, 2)
+
+def huge_document(rng: random.Random, index: int) -> list[str]:
+    """A long reference page with hundreds of sections."""
+    return _sections(rng, index, 400)
+
+def link_heavy_post(rng: random.Random, index: int) -> list[str]:
+    """A link roundup: paragraphs dense with links and images."""
+    return [_link_paragraph(rng) for _ in range(8)]
+
+def list_heavy_post(rng: random.Random, index: int) -> list[str]:
+    """A checklist-style page made of long lists."""
+    blocks = []
+    for i in range(6):
+        blocks.append(f"## List {i}")
+        blocks.append(_list_block(rng, 30, ordered=i % 2 == 1))
+    return blocks
+
+def mixed_post(rng: random.Random, index: int) -> list[str]:
+    """Mostly small posts, with link-heavy and list-heavy pages and the odd huge one."""
+    if index % 50 == 49:
+        return huge_document(rng, index)
+    if index % 10 == 3:
+        return link_heavy_post(rng, index)
+    if index % 10 == 7:
+        return list_heavy_post(rng, index)
+    return small_post(rng, index)
+
+# Corpus shape name -> (function building a page's blocks, default page count)
+CORPUS_SHAPES = {
+    "small_posts": (small_post, 500),
+    "huge_documents": (huge_document, 5),
+    "link_heavy": (link_heavy_post, 100),
+    "list_heavy": (list_heavy_post, 100),
+    "mixed": (mixed_post, 200),
+}
+
+def corpus_pages(shape: str = "mixed", pages: int = None, seed: int = 0) -> list[tuple[str, str]]:
+    """
+    Generate the markdown of a synthetic site.
+
+    The same shape, page count and seed always produce the same site, so
+    timings taken on it can be compared between runs.
+
+    Args:
+        shape: One of CORPUS_SHAPES (defaults to "mixed")
+        pages: Number of pages (defaults to the shape's default)
+        seed: Random seed (defaults to 0)
+
+    Returns:
+        A list of (relative path, markdown) pairs, one per page
+
+    Raises:
+        ValueError: If the shape is unknown
+    """
+    if shape not in CORPUS_SHAPES:
+        raise ValueError(f"Unknown corpus shape: {shape}")
+    page_blocks, default_pages = CORPUS_SHAPES[shape]
+    if pages is None:
+        pages = default_pages
+
+    rng = random.Random(seed)
+    site = []
+    for index in range(pages):
+        blocks = [f"# Post {index}"] + page_blocks(rng, index)
+        site.append((os.path.join("posts", f"post-{index}", "index.md"), "\n\n".join(blocks) + "\n"))
+    return site
+
+def write_corpus(dest_dir: str, shape: str = "mixed", pages: int = None, seed: int = 0) -> list[str]:
+    """
+    Write a synthetic site's markdown under dest_dir.
+
+    Args:
+        dest_dir: Content directory to write the pages into
+        shape: One of CORPUS_SHAPES (defaults to "mixed")
+        pages: Number of pages (defaults to the shape's default)
+        seed: Random seed (defaults to 0)
+
+    Returns:
+        The paths of the written markdown files
+    """
+    paths = []
+    for rel_path, markdown in corpus_pages(shape, pages, seed):
+        path = os.path.join(dest_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+        paths.append(path)
+    return paths
@@ -0,0 +1,356 @@
+import os
+import sys
+import gzip
+import logging
+import argparse
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from manifest import hash_bytes
+from urls import normalize_base_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+# Endpoint browsers subscribe to for reload events
+LIVE_RELOAD_PATH = "/__livereload"
+
+# Injected into every HTML page served in watch mode
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = () => location.reload();</script>'
+)
+
+# Content types worth compressing; images and fonts are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+
+# Bodies smaller than this gain nothing from compression
+MIN_GZIP_SIZE = 256
+
+class ReloadNotifier:
+    """Tells waiting live reload connections that the site was rebuilt."""
+    def __init__(self):
+        self.generation = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def notify(self) -> None:
+        """Signal that a rebuild finished."""
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Release every waiting connection."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def wait(self, generation: int, timeout: float) -> int:
+        """Wait until the generation moves past the given one, or the timeout expires.
+
+        Returns:
+            The current generation
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != generation or self.closed, timeout)
+            return self.generation
+
+class CachedFile:
+    """A file's response body, held in memory with its ETag and gzipped variant."""
+    __slots__ = ("body", "gzip_body", "etag", "content_type", "stat_key")
+
+    def __init__(self, body: bytes, content_type: str, stat_key: tuple, compress: bool = False):
+        self.body = body
+        self.content_type = content_type
+        self.stat_key = stat_key
+        self.etag = f'"{hash_bytes(body)[:32]}"'
+        self.gzip_body = None
+        if compress and len(body) >= MIN_GZIP_SIZE:
+            gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+            # Keep the variant only if it actually saves bytes
+            if len(gzip_body) < len(body):
+                self.gzip_body = gzip_body
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gz"'
+
+class FileCache:
+    """In-memory cache of served files, keyed by path and revalidated with a stat call.
+
+    A file is read, hashed and compressed once; later requests only stat it to
+    make sure it didn't change on disk, so rebuilt files are picked up without
+    any explicit invalidation.
+    """
+    def __init__(self, inject_reload_script: bool = False):
+        self.inject_reload_script = inject_reload_script
+        self.files = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, content_type: str) -> CachedFile:
+        """
+        Return the cached copy of a file, reading it again if it changed.
+
+        Args:
+            path: Path of the file
+            content_type: Content type to serve it with
+
+        Returns:
+            The cached file
+
+        Raises:
+            OSError: If the file can't be read
+        """
+        stat = os.stat(path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        cached = self.files.get(path)
+        if cached is not None and cached.stat_key == stat_key:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with open(path, "rb") as f:
+            body = f.read()
+        if self.inject_reload_script and content_type.startswith("text/html"):
+            body = _inject_reload_script(body)
+        cached = CachedFile(body, content_type, stat_key, content_type.startswith(COMPRESSIBLE_TYPES))
+        with self._lock:
+            self.files[path] = cached
+            self.misses += 1
+        return cached
+
+def _inject_reload_script(body: bytes) -> bytes:
+    """Insert the live reload script before </body>, or at the end if there is none."""
+    script = LIVE_RELOAD_SCRIPT.encode("utf-8")
+    index = body.rfind(b"</body>")
+    if index == -1:
+        return body + script
+    return body[:index] + script + body[index:]
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range Range header.
+
+    Args:
+        header: Value of the Range header, e.g. "bytes=0-1023"
+        size: Size of the full body in bytes
+
+    Returns:
+        The inclusive (start, end) byte positions to send, or None if the
+        header should be ignored and the full body sent
+
+    Raises:
+        ValueError: If the range lies outside the body
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        # Other units and multipart ranges aren't supported; send everything
+        return None
+    start, dash, end = spec.strip().partition("-")
+    # A range that doesn't parse is ignored, as RFC 9110 asks
+    if not dash or not (start or end) or (start and not start.isdigit()) or (end and not end.isdigit()):
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError(f"Unsatisfiable range: {header}")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, end
+
+def _etag_matches(header: str, etags: tuple[str, ...]) -> bool:
+    """Check an If-None-Match header against the ETags of a response."""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the build output from memory, with live reload when given a ReloadNotifier.
+
+    URLs under the site's base path are mapped onto the served directory, so a
+    site built for a sub-path can be previewed as is. Responses carry ETags and
+    are gzipped when the client accepts it; connections are kept alive.
+    """
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body back on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def __init__(self, *args, base_path: str = "/", notifier: ReloadNotifier = None, cache: FileCache = None,
+                 **kwargs):
+        self.base_path = base_path
+        self.notifier = notifier
+        self.cache = cache if cache is not None else FileCache(notifier is not None)
+        super().__init__(*args, **kwargs)
+
+    def translate_path(self, path: str) -> str:
+        if self.base_path != "/" and path.startswith(self.base_path):
+            path = "/" + path[len(self.base_path):]
+        return super().translate_path(path)
+
+    def do_GET(self):
+        if self.notifier is not None and self.path == LIVE_RELOAD_PATH:
+            self._stream_reload_events()
+            return
+        self._send_cached(head_only=False)
+
+    def do_HEAD(self):
+        self._send_cached(head_only=True)
+
+    def _send_cached(self, head_only: bool) -> None:
+        path, _, query = self.path.partition("?")
+        file_path = self.translate_path(self.path)
+        # The base path without its trailing slash is the site's root directory too
+        if os.path.isdir(file_path) or path + "/" == self.base_path:
+            if not path.endswith("/"):
+                # Same as SimpleHTTPRequestHandler: relative links need the trailing slash
+                location = path + "/" + ("?" + query if query else "")
+                self.send_response(301)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            file_path = os.path.join(file_path, "index.html")
+
+        try:
+            cached = self.cache.get(file_path, self.guess_type(file_path))
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            self.send_error(404, "File not found")
+            return
+        except OSError:
+            self.send_error(403, "Permission denied")
+            return
+
+        use_gzip = cached.gzip_body is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        etag = cached.gzip_etag if use_gzip else cached.etag
+
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None and _etag_matches(if_none_match, (cached.etag, cached.gzip_etag)):
+            self.send_response(304)
+            self._send_cache_headers(cached, etag)
+            self.end_headers()
+            return
+
+        body = cached.body
+        status = 200
+        content_range = None
+        range_header = self.headers.get("Range")
+        if range_header is not None and self.headers.get("If-Range", cached.etag) == cached.etag:
+            try:
+                byte_range = parse_range(range_header, len(body))
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range is not None:
+                # Ranges always address the identity body
+                start, end = byte_range
+                body = body[start:end + 1]
+                status = 206
+                content_range = f"bytes {start}-{end}/{len(cached.body)}"
+                use_gzip = False
+                etag = cached.etag
+        if use_gzip:
+            body = cached.gzip_body
+
+        self.send_response(status)
+        self.send_header("Content-Type", cached.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cache_headers(cached, etag)
+        if content_range is not None:
+            self.send_header("Content-Range", content_range)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, cached: CachedFile, etag: str) -> None:
+        # Always revalidate, so rebuilt files show up on the next request
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Accept-Ranges", "bytes")
+        if cached.gzip_body is not None:
+            self.send_header("Vary", "Accept-Encoding")
+
+    def _stream_reload_events(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        generation = self.notifier.generation
+        try:
+            while not self.notifier.closed:
+                current = self.notifier.wait(generation, timeout=15)
+                if current == generation:
+                    # Comment line that keeps idle connections open
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    generation = current
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug(f"{self.address_string()} {format % args}")
+
+def start_server(directory: str, port: int, base_path: str = "/", notifier: ReloadNotifier = None) -> ThreadingHTTPServer:
+    """
+    Serve a directory over HTTP from a background thread.
+
+    Args:
+        directory: Directory to serve
+        port: Port to listen on (0 picks a free one)
+        base_path: Base path the site was built for (defaults to "/")
+        notifier: Enables live reload when given (defaults to None)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    cache = FileCache(inject_reload_script=notifier is not None)
+    handler = partial(DevRequestHandler, directory=directory, base_path=base_path, notifier=notifier, cache=cache)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    server.cache = cache
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(*argv):
+    parser = argparse.ArgumentParser(description="Serve the built site from memory, without rebuilding it.")
+    parser.add_argument("base_path", nargs="?", default="/", help="Base path the site was built for (defaults to /)")
+    parser.add_argument("--port", type=int, default=8888, help="Port to serve on (defaults to 8888)")
+    parser.add_argument("--directory", default="docs", help="Directory to serve (defaults to docs)")
+    args = parser.parse_args(list(argv))
+
+    base_path = normalize_base_path(args.base_path)
+    server = start_server(args.directory, args.port, base_path)
+    logging.info(f"Serving {args.directory} at http://localhost:{server.server_address[1]}{base_path}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        cache = server.cache
+        logging.info(f"Served {cache.hits + cache.misses} file request(s): {cache.hits} from memory, "
+                     f"{cache.misses} read from disk")
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
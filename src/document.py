@@ -0,0 +1,106 @@
+import re
+from typing import TYPE_CHECKING, Iterable
+from htmlnode import HTMLNode, ParentNode
+from text_type import BlockType
+from block import Block, iter_blocks
+from markdown_to_html import block_to_html_node
+
+if TYPE_CHECKING:
+    from block_memo import BlockMemo
+
+# Longest summary kept, in characters
+SUMMARY_LENGTH = 200
+
+# Matches inline links and images, to tell prose from paragraphs such as "[< Back Home](/)"
+INLINE_LINK_PATTERN = re.compile(r"!?\[[^\]]*\]\([^)]*\)")
+
+class Document:
+    """Everything the generator needs from a markdown document, from a single parse.
+
+    Attributes:
+        root: The HTMLNode tree of the document's content
+        outline: The document's headings as (level, text) pairs, in order
+        word_count: Number of words in the document's text
+        summary: Text of the document's first paragraph of prose, shortened
+            to SUMMARY_LENGTH characters, or None if it has none
+        front_matter: Values from the front matter of the file the document
+            was read from, see front_matter.split_front_matter
+    """
+    def __init__(self, root: HTMLNode, outline: list[tuple[int, str]], word_count: int, summary: str = None,
+                 front_matter: dict = None):
+        self.root = root
+        self.outline = outline
+        self.word_count = word_count
+        self.summary = summary
+        self.front_matter = front_matter or {}
+
+    @property
+    def title(self) -> str | None:
+        """The text of the first h1 heading, or None if there isn't one."""
+        for level, text in self.outline:
+            if level == 1:
+                return text
+        return None
+
+    def __repr__(self) -> str:
+        return f"Document(title={self.title}, headings={len(self.outline)}, word_count={self.word_count})"
+
+def parse_document(markdown: str | Iterable[str], base_path: str = "/", memo: "BlockMemo | None" = None) -> Document:
+    """Parse a markdown document once into its HTML tree and metadata.
+
+    Args:
+        markdown: The markdown document as a string, or any iterable of its
+            lines such as an open file
+        base_path: Base path that root-relative link and image URLs are resolved
+            against (defaults to "/", which leaves them unchanged)
+        memo: BlockMemo to reuse the HTML of previously rendered blocks from
+            (defaults to None)
+
+    Returns:
+        The parsed Document
+    """
+    return document_from_blocks(iter_blocks(markdown), base_path, memo)
+
+def document_from_blocks(blocks: Iterable[Block], base_path: str = "/",
+                         memo: "BlockMemo | None" = None) -> Document:
+    """Build a Document from markdown that was already split into blocks.
+
+    Args:
+        blocks: The document's blocks, as produced by iter_blocks
+        base_path: Base path that root-relative link and image URLs are resolved
+            against (defaults to "/")
+        memo: BlockMemo to reuse the HTML of previously rendered blocks from
+            (defaults to None)
+
+    Returns:
+        The parsed Document
+    """
+    root = ParentNode("div", [])
+    outline = []
+    word_count = 0
+    summary = None
+
+    for block in blocks:
+        node = memo.node(block, base_path) if memo is not None else block_to_html_node(block, base_path)
+        root.children.append(node)
+
+        if block.block_type == BlockType.HEADING:
+            text = block.text
+            level = len(text) - len(text.lstrip("#"))
+            outline.append((level, text[level:].strip()))
+        elif (summary is None and block.block_type == BlockType.PARAGRAPH
+              and INLINE_LINK_PATTERN.sub("", block.text).strip()):
+            summary = shorten(" ".join("".join(node.iter_text()).split()))
+
+        # Count words from the block's parsed text rather than its markdown
+        for text in node.iter_text():
+            word_count += len(text.split())
+
+    return Document(root, outline, word_count, summary)
+
+def shorten(text: str, length: int = SUMMARY_LENGTH) -> str:
+    """Cut text down to at most length characters at a word boundary, marking the cut with an ellipsis."""
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:") + "…"
@@ -0,0 +1,172 @@
+import os
+import marshal
+from htmlnode import HTMLNode, LeafNode, ParentNode, RenderedNode
+from document import Document
+from manifest import GENERATOR_VERSION, hash_bytes
+from urls import URL_PROPS, resolve_url
+
+# Child count marking a RenderedNode in an encoded tree; LeafNodes are -1
+RENDERED_COUNT = -2
+
+class DocumentStore:
+    """On-disk cache of parsed documents, so unchanged markdown is never parsed twice.
+
+    Each source file has one entry, valid while both the hash of its markdown
+    and GENERATOR_VERSION match. Documents are stored with root-relative URLs
+    unresolved and resolved while loading, so one entry serves every base
+    path. Blocks reused from a BlockMemo are stored as the HTML it rendered,
+    so a store only serves documents parsed for pages rendered the same
+    way, minified or not. Entries are marshalled flat tuples, which load several times faster
+    than the markdown parses.
+    """
+    def __init__(self, directory: str, minify: bool = False):
+        self.directory = directory
+        self.minify = minify
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, source_path: str) -> str:
+        """Return the path of the entry caching a source file's document."""
+        return os.path.join(self.directory, hash_bytes(source_path.encode("utf-8")) + ".marshal")
+
+    def load(self, source_path: str, markdown: str, base_path: str = "/") -> Document | None:
+        """
+        Load a source file's cached document.
+
+        Args:
+            source_path: Path of the markdown file
+            markdown: Current contents of the markdown file
+            base_path: Base path to resolve root-relative URLs against (defaults to "/")
+
+        Returns:
+            The cached Document, or None if there is no valid entry for this markdown
+        """
+        try:
+            # marshal.load reads a file in tiny pieces; loading from bytes is much faster
+            with open(self.entry_path(source_path), "rb") as f:
+                (version, minify, source_hash, outline, word_count, summary, front_matter,
+                 root) = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            # Missing, or written by another Python version
+            self.misses += 1
+            return None
+        if (version != GENERATOR_VERSION or minify != self.minify
+                or source_hash != hash_bytes(markdown.encode("utf-8"))):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return Document(decode_node(root, base_path), [tuple(heading) for heading in outline], word_count, summary,
+                        front_matter)
+
+    def save(self, source_path: str, markdown: str, document: Document) -> None:
+        """
+        Cache a source file's document, replacing any older entry atomically.
+
+        Args:
+            source_path: Path of the markdown file
+            markdown: Contents of the markdown file the document was parsed from
+            document: The document, parsed with the default base path of "/"
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        data = (GENERATOR_VERSION, self.minify, hash_bytes(markdown.encode("utf-8")), document.outline,
+                document.word_count, document.summary, document.front_matter, encode_node(document.root))
+        path = self.entry_path(source_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps(data))
+        os.replace(tmp_path, path)
+
+    def prune(self, source_paths: list[str]) -> int:
+        """
+        Delete the entries of source files that no longer exist.
+
+        Args:
+            source_paths: Paths of every current markdown file
+
+        Returns:
+            The number of entries deleted
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        keep = {os.path.basename(self.entry_path(path)) for path in source_paths}
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name not in keep:
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        return removed
+
+def encode_node(root: HTMLNode) -> tuple:
+    """
+    Flatten an HTMLNode tree into tuples marshal can store.
+
+    Nodes are listed in preorder as parallel tuples of tags, values, props and
+    child counts, with -1 marking a LeafNode. A RenderedNode is marked with
+    RENDERED_COUNT and stores its (parts, texts) as its value. Flat tuples load
+    faster than nested ones and don't recurse.
+    """
+    tags, values, props, counts = [], [], [], []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        tags.append(node.tag)
+        props.append(node.props)
+        if isinstance(node, RenderedNode):
+            values.append((node.parts, node.texts))
+            counts.append(RENDERED_COUNT)
+            continue
+        values.append(node.value)
+        if node.children is None:
+            counts.append(-1)
+        else:
+            counts.append(len(node.children))
+            stack.extend(reversed(node.children))
+    return tuple(tags), tuple(values), tuple(props), tuple(counts)
+
+def decode_node(data: tuple, base_path: str = "/") -> HTMLNode:
+    """Rebuild an HTMLNode tree from encode_node's tuples, resolving URL props against base_path."""
+    tags, values, props, counts = data
+    # Build bottom-up by walking the preorder backwards; each parent takes its
+    # children off the end of the built list. Nodes are created without calling
+    # __init__, which is most of the cost of loading a page.
+    built = []
+    for i in range(len(tags) - 1, -1, -1):
+        count = counts[i]
+        if count == RENDERED_COUNT:
+            parts, texts = values[i]
+            built.append(RenderedNode(parts, texts, base_path))
+            continue
+        if count < 0:
+            node = object.__new__(LeafNode)
+            node.children = None
+        else:
+            node = object.__new__(ParentNode)
+            node.children = built[:-count - 1:-1] if count else []
+            del built[len(built) - count:]
+        node.tag = tags[i]
+        node.value = values[i]
+        node_props = props[i]
+        if node_props is not None and base_path != "/":
+            for name in URL_PROPS:
+                if name in node_props:
+                    node_props[name] = resolve_url(node_props[name], base_path)
+        node.props = node_props
+        built.append(node)
+    return built[0]
+
+def resolve_node_urls(node: HTMLNode, base_path: str) -> None:
+    """Resolve the URL props of a tree parsed with the default base path, in place."""
+    if base_path == "/":
+        return
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, RenderedNode):
+            node.resolve(base_path)
+        elif node.props is not None:
+            for name in URL_PROPS:
+                if name in node.props:
+                    node.props[name] = resolve_url(node.props[name], base_path)
+        if node.children:
+            stack.extend(node.children)
@@ -0,0 +1,166 @@
+import os
+from datetime import datetime, timezone
+
+# Line that opens and closes a front matter block at the top of a markdown file
+FENCE = "---"
+
+# Front matter keys and the type each value is converted to; other keys are kept as strings
+FRONT_MATTER_KEYS = {
+    "title": "str",
+    "date": "date",
+    "tags": "list",
+    "draft": "bool",
+    "template": "str",
+}
+
+BOOLEAN_VALUES = {"true": True, "yes": True, "false": False, "no": False}
+
+def parse_front_matter(lines: list[str]) -> dict:
+    """
+    Parse the lines between the fences of a front matter block.
+
+    The syntax is the simple subset of YAML that blog front matter uses:
+    key: value pairs, quoted or bare strings, true/false, [a, b] lists or
+    "- item" lines under a key, and # comments.
+
+    Args:
+        lines: The block's lines, without the --- fences
+
+    Returns:
+        A dict of the values, with date normalized to UTC ISO 8601, tags a
+        list and draft a bool
+
+    Raises:
+        ValueError: If a line or a value is malformed
+    """
+    values = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped == "-" or stripped.startswith("- "):
+            # An item of a block list under the previous key
+            if key is None or not isinstance(values[key], list):
+                raise ValueError(f"List item without a key to belong to: {stripped}")
+            values[key].append(_unquote(stripped[1:].strip()))
+            continue
+
+        key, separator, value = stripped.partition(":")
+        key = key.strip()
+        if not separator or not key:
+            raise ValueError(f"Expected key: value in front matter, got: {stripped}")
+        value = value.strip()
+        values[key] = [] if not value else _parse_value(value)
+
+    return {key: _convert(key, value) for key, value in values.items()}
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+def _parse_value(value: str) -> str | list[str]:
+    if value.startswith("[") and value.endswith("]"):
+        return [_unquote(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    return _unquote(value)
+
+def _convert(key: str, value: str | list[str]) -> str | list[str] | bool:
+    """Convert a parsed value to the type of its key."""
+    kind = FRONT_MATTER_KEYS.get(key, "str")
+    if kind == "list":
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(",") if item.strip()]
+        return value
+    if isinstance(value, list):
+        if value:
+            raise ValueError(f"Front matter {key} must not be a list")
+        value = ""
+    if kind == "bool":
+        if value.lower() not in BOOLEAN_VALUES:
+            raise ValueError(f"Front matter {key} must be true or false, got: {value}")
+        return BOOLEAN_VALUES[value.lower()]
+    if kind == "date":
+        return normalize_date(value)
+    return value
+
+def normalize_date(value: str) -> str:
+    """
+    Normalize a front matter date such as 2024-01-02 or 2024-01-02 10:30+02:00.
+
+    Returns:
+        The date in UTC as YYYY-MM-DDTHH:MM:SSZ; dates without a time zone are taken as UTC
+
+    Raises:
+        ValueError: If the value isn't an ISO 8601 date
+    """
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Front matter date must be an ISO 8601 date, got: {value}") from None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Split a markdown document into its front matter and its body.
+
+    Args:
+        markdown: The markdown document
+
+    Returns:
+        The parsed front matter, empty if the document has none, and the
+        markdown after it
+
+    Raises:
+        ValueError: If the front matter is malformed or never closed
+    """
+    if not markdown.startswith(FENCE):
+        return {}, markdown
+    first_end = markdown.find("\n")
+    if first_end == -1 or markdown[:first_end].strip() != FENCE:
+        return {}, markdown
+
+    start = position = first_end + 1
+    while position < len(markdown):
+        end = markdown.find("\n", position)
+        if end == -1:
+            end = len(markdown)
+        if markdown[position:end].strip() == FENCE:
+            return parse_front_matter(markdown[start:position].splitlines()), markdown[end + 1:]
+        position = end + 1
+    raise ValueError("Front matter is not closed with ---")
+
+def read_front_matter(path: str) -> dict:
+    """
+    Read a markdown file's front matter without reading the rest of the file.
+
+    Args:
+        path: Path of the markdown file
+
+    Returns:
+        The parsed front matter, empty if the file has none
+
+    Raises:
+        ValueError: If the front matter is malformed or never closed
+    """
+    with open(path, "r") as f:
+        if f.readline().strip() != FENCE:
+            return {}
+        lines = []
+        for line in f:
+            if line.strip() == FENCE:
+                try:
+                    return parse_front_matter(lines)
+                except ValueError as e:
+                    raise ValueError(f"{path}: {e}") from None
+            lines.append(line)
+    raise ValueError(f"{path}: Front matter is not closed with ---")
+
+def page_template_path(front_matter: dict, template_path: str) -> str:
+    """Return the template a page asks for, relative to the default template's directory, or the default."""
+    template = front_matter.get("template")
+    if not template:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), template)
@@ -1,19 +1,103 @@
 from __future__ import annotations
+import sys
+from typing import Iterator, TextIO
+from minify import PRESERVE_WHITESPACE_TAGS, collapse_whitespace, quote_attribute
 
 class HTMLNode:
+    # Slots instead of a per-instance __dict__: pages are built from many thousands of nodes.
+    # Nodes without attributes share None as their props rather than each holding an empty dict.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str = None, value: str = None, children: list = None, props: dict = None):
-        self.tag = tag
+        # Intern tags so every node with the same tag shares one string
+        self.tag = sys.intern(tag) if tag else tag
         self.value = value
         self.children = children
         self.props = props
 
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
         raise NotImplementedError("to_html is not implemented")
 
-    def props_to_html(self) -> str:
+    def iter_html(self, minify: bool = False) -> Iterator[str]:
+        """Yield the node's HTML in chunks, walking the tree without recursion.
+
+        Joining the chunks gives the same result as to_html(), but no string is
+        built per subtree and nesting depth is not limited by Python's recursion limit.
+
+        Args:
+            minify: Collapse whitespace runs in text to one space, except
+                inside <pre> and the other PRESERVE_WHITESPACE_TAGS, and
+                quote only the attribute values that need it (defaults to False).
+                Elements are never separated by whitespace either way.
+        """
+        if minify:
+            yield from self._iter_minified_html()
+            return
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+                continue
+            opening, closing = node._html_open_close()
+            yield opening
+            if closing is not None:
+                stack.append(closing)
+                stack.extend(reversed(node.children))
+
+    def _iter_minified_html(self) -> Iterator[str]:
+        stack = [self]
+        # Number of open elements whose whitespace is kept; None on the stack marks where one closes
+        preserving = 0
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+                continue
+            if node is None:
+                preserving -= 1
+                continue
+            opening, closing = node._minified_open_close(preserving > 0)
+            yield opening
+            if closing is not None:
+                if node.tag in PRESERVE_WHITESPACE_TAGS:
+                    preserving += 1
+                    stack.append(None)
+                stack.append(closing)
+                stack.extend(reversed(node.children))
+
+    def render_to(self, fp: TextIO, minify: bool = False) -> None:
+        """Write the node's HTML straight to an open text file."""
+        fp.writelines(self.iter_html(minify))
+
+    def iter_text(self) -> Iterator[str]:
+        """Yield the text values of the node's leaves in document order, without recursion."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, RenderedNode):
+                yield from node.texts
+                continue
+            if node.value:
+                yield node.value
+            if node.children:
+                stack.extend(reversed(node.children))
+
+    def _html_open_close(self, minify: bool = False) -> tuple[str, str | None]:
+        """Return the opening and closing HTML of a node with children, or the node's full HTML and None."""
+        return self.to_html(minify), None
+
+    def _minified_open_close(self, keep_whitespace: bool) -> tuple[str, str | None]:
+        """Like _html_open_close(True), with keep_whitespace set inside <pre> and the like."""
+        return self._html_open_close(True)
+
+    def props_to_html(self, minify: bool = False) -> str:
         if not self.props:
             return ""
-        props_list = [f"{key}={value}" for key, value in self.props.items()]
+        if minify:
+            props_list = [f"{key}={quote_attribute(value)}" for key, value in self.props.items()]
+        else:
+            props_list = [f"{key}={value}" for key, value in self.props.items()]
         return " " + " ".join(props_list)
 
     def __repr__(self) -> str:
@@ -21,10 +105,15 @@ class HTMLNode:
 
 class LeafNode(HTMLNode):
     """A node that can't have children"""
+    __slots__ = ()
+
     def __init__(self, value: str, tag: str = None, props: dict = None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
+        if minify:
+            return self._minified_open_close(False)[0]
+
         # Self-closing tags like img don't need a value
         if self.tag in ["img", "br", "hr"]:
             props = self.props_to_html()
@@ -39,17 +128,61 @@ class LeafNode(HTMLNode):
         props = self.props_to_html()
         return f"<{self.tag}{props}>{self.value}</{self.tag}>"
 
+    def _minified_open_close(self, keep_whitespace: bool) -> tuple[str, None]:
+        tag = self.tag
+        if tag in ["img", "br", "hr"]:
+            return f"<{tag}{self.props_to_html(True)}>", None
+
+        if not self.value:
+            raise ValueError("LeafNode must have a value")
+
+        value = self.value
+        if not keep_whitespace and tag not in PRESERVE_WHITESPACE_TAGS:
+            value = collapse_whitespace(value)
+        if not tag:
+            return value, None
+        return f"<{tag}{self.props_to_html(True)}>{value}</{tag}>", None
+
 class ParentNode(HTMLNode):
     """A node that can have children"""
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list = None, props: dict = None):
         super().__init__(tag, None, children or [], props)
 
-    def to_html(self) -> str:
+    def to_html(self, minify: bool = False) -> str:
+        return "".join(self.iter_html(minify))
+
+    def _html_open_close(self, minify: bool = False) -> tuple[str, str]:
         if not self.tag:
             raise ValueError("ParentNode must have a tag")
         if not self.children:
             raise ValueError("ParentNode must have children")
 
-        children_html = "".join(child.to_html() for child in self.children)
-        props = self.props_to_html()
-        return f"<{self.tag}{props}>{children_html}</{self.tag}>"
+        props = self.props_to_html(minify)
+        return f"<{self.tag}{props}>", f"</{self.tag}>"
+
+class RenderedNode(HTMLNode):
+    """A block whose HTML was rendered ahead of time, such as one reused from the block memo.
+
+    The HTML is kept as parts split wherever a root-relative URL starts, so it
+    can be resolved against any base path, along with the text values of the
+    leaves it was rendered from. It was rendered minified or not ahead of
+    time too, so the minify argument of to_html doesn't change it.
+    """
+    __slots__ = ("parts", "texts")
+
+    def __init__(self, parts: tuple[str, ...], texts: tuple[str, ...], base_path: str = "/"):
+        super().__init__(None, base_path.join(parts))
+        self.parts = parts
+        self.texts = texts
+
+    def resolve(self, base_path: str) -> None:
+        """Resolve the node's root-relative URLs against a new base path."""
+        self.value = base_path.join(self.parts)
+
+    def to_html(self, minify: bool = False) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"RenderedNode(parts={self.parts}, texts={self.texts})"
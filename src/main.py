@@ -1,77 +1,278 @@
 import os
 import sys
+import json
 import shutil
 import logging
+import time
+import argparse
+from collections import deque
+from typing import Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode
-from markdown_to_html import markdown_to_html_node
+from text_type import BlockType
+from block import iter_blocks
+from document import Document, document_from_blocks, parse_document
+from document_store import DocumentStore, resolve_node_urls
+from front_matter import page_template_path, read_front_matter, split_front_matter
+from block_memo import BlockMemo
+from manifest import GENERATOR_VERSION, BuildManifest, hash_bytes
+from build_report import BuildReport, PageStats, count_nodes
+from profiling import BuildProfiler
+from minify import minify_markup
+from precompress import GZIP_SUFFIX, precompress_tree, remove_precompressed
+from search_index import SEARCH_DIR, SearchIndex, page_terms, search_page
+from site_index import (BLOG_SECTION, FEED_ENTRIES, FEED_PATH, POSTS_PER_PAGE, SITEMAP_PATH, listing_node,
+                        page_metadata, page_url, paginate, render_feed, render_sitemap, site_pages, url_dest_path)
+from template import load_template
+from urls import normalize_base_path
+from static_sync import SYNC_COMPARISONS, SYNC_METHODS, sync_static
+from watch import watch_changes
+from devserver import ReloadNotifier, start_server
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
-def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str = "/") -> None:
+# Where the build manifest used for incremental builds is kept
+MANIFEST_PATH = os.path.join(".build", "manifest.json")
+
+# Where parsed documents are cached between builds
+DOCUMENT_STORE_DIR = os.path.join(".build", "documents")
+
+# Where --block-cache keeps rendered blocks between builds
+BLOCK_MEMO_PATH = os.path.join(".build", "blocks.marshal")
+
+# Where --search keeps the search index between builds
+SEARCH_INDEX_PATH = os.path.join(".build", "search.marshal")
+
+# Threads reading and writing pages in a --pipeline build, and how far ahead they may get
+PIPELINE_READERS = 4
+PIPELINE_WRITERS = 4
+PIPELINE_DEPTH = 16
+
+# Where --profile writes its reports by default
+PROFILE_DIR = os.path.join(".build", "profile")
+
+# Inputs and output of the site build
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+TEMPLATE_PATH = "template.html"
+DEST_DIR = "docs"
+
+def _read_markdown(from_path: str) -> str:
+    with open(from_path, "r") as f:
+        return f.read()
+
+def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str = "/",
+                  document_cache: dict = None, stats: PageStats = None, document_store: DocumentStore = None,
+                  block_memo: BlockMemo = None, minify: bool = False) -> Document:
     """
     Generate an HTML page from a markdown file using a template.
 
+    The page's front matter can set its title, which otherwise comes from its
+    first h1, and a template to use instead of template_path.
+
     Args:
         from_path: Path to the markdown file
         template_path: Path to the HTML template
         dest_path: Path where the generated HTML should be saved
         base_path: Base path for the site (defaults to "/")
+        document_cache: Dict in which to keep each page's parsed document, so
+            the page can be re-rendered without parsing while its markdown is
+            unchanged (defaults to None, which always parses)
+        stats: PageStats to fill with the time spent in each stage (defaults
+            to None). Timing needs the stages run one after another, so the
+            page is rendered to a string instead of streamed to disk.
+        document_store: On-disk DocumentStore to load the parsed document
+            from, and save it to after parsing (defaults to None)
+        block_memo: BlockMemo to reuse the HTML of unchanged blocks from when
+            the page has to be parsed (defaults to None)
+        minify: Render the page and its template minified; the document store
+            and block memo must be in the same mode (defaults to False)
+
+    Returns:
+        The page's parsed Document
     """
     logging.info(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    start = time.perf_counter()
 
     # Read markdown file
-    with open(from_path, "r") as f:
-        markdown = f.read()
-
-    # Read template file
-    with open(template_path, "r") as f:
-        template = f.read()
-
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown)
-    html_content = html_node.to_html()
-
-    # Extract title
-    title = extract_title(markdown)
-
-    # Replace placeholders in template
-    html_page = template.replace("{{ Title }}", title)
-    html_page = html_page.replace("{{ Content }}", html_content)
-
-    # Ensure base_path ends with a slash for proper URL joining
-    if not base_path.endswith("/"):
-        base_path = base_path + "/"
-
-    # Replace href="/ and src="/ with the base path
-    # Handle both quoted and unquoted attributes
-    html_page = html_page.replace('href="/', f'href="{base_path}')
-    html_page = html_page.replace('src="/', f'src="{base_path}')
-    html_page = html_page.replace("href='/", f"href='{base_path}")
-    html_page = html_page.replace("src='/", f"src='{base_path}")
-    # Handle attributes without quotes
-    html_page = html_page.replace('href=/', f'href={base_path}')
-    html_page = html_page.replace('src=/', f'src={base_path}')
-
-    # Create destination directory if it doesn't exist
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    markdown = _read_markdown(from_path)
+    if stats is not None:
+        stats.times["read"] = time.perf_counter() - start
+
+    # Ensure base_path starts and ends with a slash for proper URL joining
+    base_path = normalize_base_path(base_path)
 
-    # Write the generated HTML to file
-    with open(dest_path, "w") as f:
-        f.write(html_page)
+    document = load_document(from_path, markdown, base_path, document_cache, stats, document_store, block_memo)
+    title = page_title(document)
 
+    # Load the compiled template the page asks for, only read from disk when it changes
+    template = load_template(page_template_path(document.front_matter, template_path), base_path, minify)
+
+    if stats is None:
+        # Stream the page into the template and straight to disk, without
+        # building the full HTML string
+        write_page(dest_path, template.iter_render({"Title": title, "Content": document.root.iter_html(minify)}))
+    else:
+        start = time.perf_counter()
+        content = document.root.to_html(minify)
+        stats.times["render"] = time.perf_counter() - start
+        start = time.perf_counter()
+        page = template.render({"Title": title, "Content": content})
+        stats.times["template"] = time.perf_counter() - start
+        start = time.perf_counter()
+        write_page(dest_path, [page])
+        stats.times["write"] = time.perf_counter() - start
+        stats.nodes = count_nodes(document.root)
+        stats.output_bytes = os.path.getsize(dest_path)
     logging.info(f"Generated {dest_path}")
+    return document
+
+def page_title(document: Document) -> str:
+    """
+    Return a page's title: the title in its front matter, or else its first h1.
+
+    Raises:
+        ValueError: If the page has neither
+    """
+    title = document.front_matter.get("title") or document.title
+    if title is None:
+        raise ValueError("No title in front matter and no h1 heading found in markdown")
+    return title
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, base_path: str = "/") -> None:
+def load_document(from_path: str, markdown: str, base_path: str, document_cache: dict = None, stats: PageStats = None,
+                  document_store: DocumentStore = None, block_memo: BlockMemo = None) -> Document:
+    """
+    Get a page's parsed document from the first cache that has it, parsing it otherwise.
+
+    The front matter is split off before the markdown is parsed and kept in
+    the document's front_matter. Root-relative links are resolved against the
+    base path. The caches and stats are the ones described in generate_page.
+
+    Args:
+        from_path: Path to the markdown file
+        markdown: Contents of the markdown file
+        base_path: Base path for the site, starting and ending with a slash
+
+    Returns:
+        The page's Document
+    """
+    cache_key = (from_path, base_path)
+    cached = document_cache.get(cache_key) if document_cache is not None else None
+    if cached is not None and cached[0] == markdown:
+        document = cached[1]
+    elif document_store is not None:
+        document = document_store.load(from_path, markdown, base_path)
+    else:
+        document = None
+    if document is not None:
+        if stats is not None:
+            stats.document_cached = True
+    else:
+        front_matter, body = split_front_matter(markdown)
+        # Stored documents keep their URLs unresolved, so parse for the default base path first
+        parse_base_path = "/" if document_store is not None else base_path
+        if stats is None:
+            document = parse_document(body, parse_base_path, block_memo)
+        else:
+            start = time.perf_counter()
+            blocks = list(iter_blocks(body))
+            stats.times["block_split"] = time.perf_counter() - start
+            start = time.perf_counter()
+            document = document_from_blocks(blocks, parse_base_path, block_memo)
+            stats.times["inline_parse"] = time.perf_counter() - start
+        document.front_matter = front_matter
+        if document_store is not None:
+            document_store.save(from_path, markdown, document)
+            resolve_node_urls(document.root, base_path)
+    if document_cache is not None:
+        document_cache[cache_key] = (markdown, document)
+    return document
+
+def write_page(dest_path: str, chunks: Iterable[str]) -> None:
+    """
+    Write a page's HTML, creating its directory if needed.
+
+    The page is written to a temporary file first, so a failed render never
+    leaves a half-written page behind.
+
+    Args:
+        dest_path: Path where the generated HTML should be saved
+        chunks: The page's HTML, in chunks
+    """
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.writelines(chunks)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def find_pages(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    """
+    Recursively find the markdown files in a directory and the HTML paths they generate.
+
+    Args:
+        dir_path_content: Path to the directory containing markdown files
+        dest_dir_path: Path where the generated HTML files should be saved
+
+    Returns:
+        A sorted list of (markdown path, HTML path) pairs
+    """
+    pages = []
+    for filename in sorted(os.listdir(dir_path_content)):
+        from_path = os.path.join(dir_path_content, filename)
+        dest_path = os.path.join(dest_dir_path, filename)
+
+        if os.path.isfile(from_path):
+            if filename.endswith(".md"):
+                pages.append((from_path, dest_path[:-len(".md")] + ".html"))
+        elif os.path.isdir(from_path):
+            pages.extend(find_pages(from_path, dest_path))
+    return pages
+
+def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, base_path: str = "/",
+                             manifest: BuildManifest = None, jobs: int = 1, document_cache: dict = None,
+                             report: BuildReport = None, profiler: BuildProfiler = None,
+                             document_store: DocumentStore = None, block_memo: BlockMemo = None,
+                             pipeline: bool = False, drafts: bool = False, search_index: SearchIndex = None,
+                             minify: bool = False) -> None:
     """
     Recursively generate HTML pages from markdown files in a directory using a template.
 
+    Only the front matter of each file is read to plan the build, so drafts
+    are skipped, and unchanged pages found, before any markdown is parsed.
+
     Args:
         dir_path_content: Path to the directory containing markdown files
         template_path: Path to the HTML template
         dest_dir_path: Path where the generated HTML files should be saved
         base_path: Base path for the site (defaults to "/")
+        manifest: Build manifest used to skip pages whose inputs are unchanged
+            (defaults to None, which regenerates every page)
+        jobs: Number of worker processes to generate pages with (defaults to 1)
+        document_cache: Parsed document cache passed on to generate_page; only
+            used when generating in this process (defaults to None)
+        report: BuildReport to add each generated page's stats and the
+            manifest's hits and misses to (defaults to None)
+        profiler: BuildProfiler to run each page under; profiling generates
+            every page in this process, whatever jobs is (defaults to None)
+        document_store: On-disk DocumentStore of parsed documents passed on
+            to generate_page (defaults to None)
+        block_memo: BlockMemo passed on to generate_page; only used when
+            generating in this process (defaults to None)
+        pipeline: Overlap reading and writing pages with parsing them, see
+            generate_pages_pipelined; ignored with jobs, report or profiler,
+            which need pages generated one at a time (defaults to False)
+        drafts: Generate pages whose front matter marks them as drafts
+            (defaults to False, which skips them)
+        search_index: SearchIndex to index each generated page's text in,
+            straight from its parsed document (defaults to None)
+        minify: Render pages minified, see generate_page (defaults to False)
     """
     logging.info(f"Generating pages recursively from {dir_path_content} to {dest_dir_path} using {template_path}")
 
@@ -79,56 +280,345 @@ def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir
     if not os.path.exists(dest_dir_path):
         os.makedirs(dest_dir_path)
 
-    # Iterate over files in the directory
-    for filename in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
+    # Find every page first so the work can be planned and spread across workers
+    pages = []
+    for from_path, dest_path in find_pages(dir_path_content, dest_dir_path):
+        front_matter = read_front_matter(from_path)
+        if front_matter.get("draft") and not drafts:
+            logging.info(f"Skipping draft {from_path}")
+            # Forget a page that just became a draft, so the site and search indexes stop listing it
+            if manifest is not None and manifest.remove(dest_path, dest_dir_path):
+                logging.info(f"Removed draft {dest_path}")
+            continue
+        inputs = None
+        if manifest is not None:
+            # Skip pages whose source, template, base path and generator are unchanged
+            inputs = manifest.page_inputs(from_path, page_template_path(front_matter, template_path), base_path,
+                                          minify)
+            if manifest.is_fresh(dest_path, inputs):
+                logging.debug(f"Skipping unchanged page {dest_path}")
+                if report is not None:
+                    report.count("manifest_hits")
+                continue
+            if report is not None:
+                report.count("manifest_misses")
+        pages.append((from_path, dest_path, inputs))
+
+    collect_terms = search_index is not None
+    results = {}
+    try:
+        if pipeline and report is None and profiler is None and jobs == 1:
+            results = generate_pages_pipelined([page[:2] for page in pages], template_path, base_path,
+                                               document_cache, document_store, block_memo,
+                                               collect_terms=collect_terms, minify=minify)
+        elif jobs > 1 and len(pages) > 1 and profiler is None:
+            generate_pages_parallel([page[:2] for page in pages], template_path, base_path, jobs, report,
+                                    document_store, collect_terms, minify, results)
+        else:
+            for from_path, dest_path, _ in pages:
+                stats = PageStats(from_path, dest_path) if report is not None else None
+                if profiler is not None:
+                    # A throwaway cache keeps the parsed page alive for the profiler's memory snapshot
+                    cache = document_cache if document_cache is not None else {}
+                    document = profiler.run(dest_path, generate_page, from_path, template_path, dest_path, base_path,
+                                            cache, stats, document_store, block_memo, minify)
+                else:
+                    document = generate_page(from_path, template_path, dest_path, base_path, document_cache, stats,
+                                             document_store, block_memo, minify)
+                results[dest_path] = page_results(document, collect_terms)
+                if report is not None:
+                    report.add_page(stats)
+    finally:
+        if manifest is not None:
+            # Keep each page's metadata with its inputs, so the site index can list it without reparsing.
+            # Pages generated before a failure are recorded too, so the next build only retries the rest.
+            for _, dest_path, inputs in pages:
+                if dest_path in results:
+                    manifest.record(dest_path, inputs, results[dest_path][0])
+    if search_index is not None:
+        for _, dest_path, inputs in pages:
+            metadata, terms = results[dest_path]
+            source_hash = inputs["source_hash"] if inputs is not None else None
+            search_index.update(page_url(dest_path, dest_dir_path), metadata["title"], terms, source_hash)
+
+def page_results(document: Document, collect_terms: bool = False) -> tuple[dict, dict | None]:
+    """Return what the build keeps of a generated page: its metadata, and its search terms if collect_terms."""
+    return page_metadata(document), page_terms(document.root) if collect_terms else None
+
+def _init_page_worker() -> None:
+    # Workers stay quiet; the parent process logs results in a deterministic order
+    logging.getLogger().setLevel(logging.WARNING)
+
+def _generate_page_job(job: tuple) -> tuple[Exception | None, PageStats | None, tuple | None]:
+    """Generate one page in a worker process, returning the error instead of raising it."""
+    from_path, template_path, dest_path, base_path, collect_stats, document_store, collect_terms, minify = job
+    stats = PageStats(from_path, dest_path) if collect_stats else None
+    try:
+        document = generate_page(from_path, template_path, dest_path, base_path, stats=stats,
+                                 document_store=document_store, minify=minify)
+        # Send back what the build keeps of the page rather than its whole document
+        return None, stats, page_results(document, collect_terms)
+    except Exception as e:
+        return e, None, None
+
+def generate_pages_parallel(pages: list[tuple[str, str]], template_path: str, base_path: str, jobs: int,
+                            report: BuildReport = None, document_store: DocumentStore = None,
+                            collect_terms: bool = False, minify: bool = False, results: dict = None) -> dict:
+    """
+    Generate pages across a pool of worker processes.
 
-        # If it's a file, generate the page
-        if os.path.isfile(from_path):
-            if filename.endswith(".md"):
-                dest_path = dest_path.replace(".md", ".html")
-                generate_page(from_path, template_path, dest_path, base_path)
-        # If it's a directory, recurse
-        elif os.path.isdir(from_path):
-            generate_pages_recursive(from_path, template_path, dest_path, base_path)
+    Pages are logged in the order given, regardless of which worker finishes
+    first. Every page is attempted; if any fail, each failure is logged and the
+    first one is raised once the pool is done, after the results of the pages
+    that succeeded were added to results.
+
+    Args:
+        pages: List of (markdown path, HTML path) pairs to generate
+        template_path: Path to the HTML template
+        base_path: Base path for the site
+        jobs: Number of worker processes
+        report: BuildReport to add each generated page's stats to (defaults to None)
+        document_store: On-disk DocumentStore of parsed documents (defaults to None)
+        collect_terms: Count the search terms of each page (defaults to False)
+        minify: Render pages minified, see generate_page (defaults to False)
+        results: Dict to add the results to, which keeps them when a failure
+            is raised (defaults to None, for a new dict)
+
+    Returns:
+        The page_results of each generated page, keyed by HTML path
+    """
+    jobs_list = [(from_path, template_path, dest_path, base_path, report is not None, document_store, collect_terms,
+                  minify) for from_path, dest_path in pages]
+    chunksize = max(1, len(jobs_list) // (jobs * 4))
+    errors = []
+    results = {} if results is None else results
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_page_worker) as pool:
+        outcomes = pool.map(_generate_page_job, jobs_list, chunksize=chunksize)
+        for (from_path, dest_path), (error, stats, result) in zip(pages, outcomes):
+            if error is None:
+                logging.info(f"Generated {dest_path}")
+                results[dest_path] = result
+                if report is not None:
+                    report.add_page(stats)
+            else:
+                logging.error(f"Failed to generate {dest_path} from {from_path}: {error}")
+                errors.append(error)
+
+    if errors:
+        raise errors[0]
+    return results
+
+def generate_pages_pipelined(pages: list[tuple[str, str]], template_path: str, base_path: str,
+                             document_cache: dict = None, document_store: DocumentStore = None,
+                             block_memo: BlockMemo = None, readers: int = PIPELINE_READERS,
+                             writers: int = PIPELINE_WRITERS, depth: int = PIPELINE_DEPTH,
+                             collect_terms: bool = False, minify: bool = False) -> dict:
+    """
+    Generate pages with disk reads and writes overlapping the parsing and rendering.
+
+    Reader threads prefetch the markdown of upcoming pages while this thread
+    parses and renders the current one, and writer threads flush finished
+    pages. At most depth reads and depth writes are in flight, so a slow disk
+    holds the renderer back instead of letting finished pages pile up in
+    memory. Pages are logged in order, and the first error is raised once the
+    pages already in flight are done.
+
+    Args:
+        pages: List of (markdown path, HTML path) pairs to generate
+        template_path: Path to the HTML template
+        base_path: Base path for the site
+        document_cache: Parsed document cache, as in generate_page (defaults to None)
+        document_store: On-disk DocumentStore, as in generate_page (defaults to None)
+        block_memo: BlockMemo, as in generate_page (defaults to None)
+        readers: Number of reader threads (defaults to PIPELINE_READERS)
+        writers: Number of writer threads (defaults to PIPELINE_WRITERS)
+        depth: Most reads, and most writes, in flight at once (defaults to PIPELINE_DEPTH)
+        collect_terms: Count the search terms of each page (defaults to False)
+        minify: Render pages minified, see generate_page (defaults to False)
+
+    Returns:
+        The page_results of each generated page, keyed by HTML path
+    """
+    base_path = normalize_base_path(base_path)
+    upcoming = iter(pages)
+    reads = deque()
+    writes = deque()
+    results = {}
+
+    def finish_write() -> None:
+        dest_path, future = writes.popleft()
+        future.result()
+        logging.info(f"Generated {dest_path}")
+
+    with ThreadPoolExecutor(readers) as read_pool, ThreadPoolExecutor(writers) as write_pool:
+        def prefetch() -> None:
+            for from_path, dest_path in upcoming:
+                reads.append((from_path, dest_path, read_pool.submit(_read_markdown, from_path)))
+                if len(reads) >= depth:
+                    return
+
+        prefetch()
+        while reads:
+            from_path, dest_path, future = reads.popleft()
+            markdown = future.result()
+            prefetch()
+
+            logging.info(f"Generating page from {from_path} to {dest_path} using {template_path}")
+            document = load_document(from_path, markdown, base_path, document_cache, None, document_store, block_memo)
+            title = page_title(document)
+            template = load_template(page_template_path(document.front_matter, template_path), base_path, minify)
+            page = "".join(template.iter_render({"Title": title, "Content": document.root.iter_html(minify)}))
+            results[dest_path] = page_results(document, collect_terms)
+
+            # Backpressure: wait for the oldest write before queueing another
+            if len(writes) >= depth:
+                finish_write()
+            writes.append((dest_path, write_pool.submit(write_page, dest_path, [page])))
+
+        while writes:
+            finish_write()
+    return results
+
+def generate_site_index(manifest: BuildManifest, dest_paths: list[str], template_path: str, dest_dir_path: str,
+                        base_path: str = "/", site_url: str = None, per_page: int = POSTS_PER_PAGE,
+                        minify: bool = False) -> None:
+    """
+    Generate the blog's listing pages, and the sitemap and Atom feed, from the pages' metadata.
+
+    No markdown is read or parsed: each page's metadata was recorded in the
+    manifest when the page was last generated. Each output is recorded in the
+    manifest like a page and only rendered again when what it shows changes,
+    so a new post rewrites the newest listing page rather than all of them.
+    Outputs of an earlier pass that this one doesn't produce are removed.
 
-def copy_static_to_public(source_dir: str, dest_dir: str) -> None:
+    Args:
+        manifest: Build manifest holding the pages' metadata
+        dest_paths: HTML paths of every page in the site
+        template_path: Path to the HTML template the listing pages are rendered with
+        dest_dir_path: Output directory of the site
+        base_path: Base path for the site (defaults to "/")
+        site_url: Scheme and host the site is served from, such as
+            https://example.com; the sitemap and feed need absolute URLs and
+            are skipped without it (defaults to None)
+        per_page: Posts on each listing page (defaults to POSTS_PER_PAGE)
+        minify: Render the listing pages minified (defaults to False)
+    """
+    base_path = normalize_base_path(base_path)
+    pages = site_pages(manifest.metadata, dest_paths, dest_dir_path)
+    section_url = f"/{BLOG_SECTION}/"
+    posts = [page for page in pages if page["url"].startswith(section_url) and page["url"] != section_url]
+    index_taken = any(page["url"] == section_url for page in pages)
+    listings = paginate(posts, section_url, per_page, index_taken)
+    produced = set()
+
+    template_hash = manifest.template_hash(template_path)
+    for listing in listings:
+        dest_path = url_dest_path(listing.url, dest_dir_path)
+        produced.add(dest_path)
+        inputs = {
+            "index": "listing",
+            "listing_hash": hash_bytes(json.dumps(listing.inputs(), sort_keys=True).encode("utf-8")),
+            "template_hash": template_hash,
+            "base_path": base_path,
+            "minify": minify,
+            "generator": GENERATOR_VERSION,
+        }
+        if manifest.is_fresh(dest_path, inputs):
+            continue
+        title = BLOG_SECTION.capitalize()
+        if listing.url != section_url:
+            title = f"{title} - page {listing.number}"
+        template = load_template(template_path, base_path, minify)
+        content = listing_node(listing, title, base_path).iter_html(minify)
+        write_page(dest_path, template.iter_render({"Title": title, "Content": content}))
+        manifest.record(dest_path, inputs)
+        logging.info(f"Generated {dest_path}")
+
+    if site_url:
+        entries = [(page["url"], page["date"]) for page in pages]
+        entries.extend((listing.url, listing.posts[0]["date"]) for listing in listings)
+        sitemap = render_sitemap(entries, site_url, base_path)
+
+        home = [page["title"] for page in pages if page["url"] == "/"]
+        feed_title = home[0] if home else BLOG_SECTION.capitalize()
+        dated = [post for post in posts if post["date"]]
+        feed = render_feed(dated[::-1][:FEED_ENTRIES], feed_title, "/" + FEED_PATH, site_url, base_path)
+
+        for rel_path, text in ((SITEMAP_PATH, sitemap), (FEED_PATH, feed)):
+            dest_path = os.path.join(dest_dir_path, rel_path)
+            produced.add(dest_path)
+            inputs = {"index": rel_path, "content_hash": hash_bytes(text.encode("utf-8"))}
+            if not manifest.is_fresh(dest_path, inputs):
+                write_page(dest_path, [text])
+                manifest.record(dest_path, inputs)
+                logging.info(f"Generated {dest_path}")
+
+    # Drop listing pages that no longer have posts, and the sitemap and feed without a site URL
+    for dest_path, inputs in list(manifest.entries.items()):
+        if "index" in inputs and dest_path not in produced and manifest.remove(dest_path, dest_dir_path):
+            logging.info(f"Removed {dest_path}")
+
+def update_search_index(search_index: SearchIndex, manifest: BuildManifest, pages: list[tuple[str, str]],
+                        template_path: str, dest_dir_path: str, base_path: str = "/",
+                        document_store: DocumentStore = None, minify: bool = False) -> None:
     """
-    Recursively copy all contents from source_dir to dest_dir.
-    First deletes all contents of dest_dir to ensure a clean copy.
+    Bring the search index up to date with the site's pages, and write the index files that changed.
+
+    Pages generated in this build were indexed from their parsed documents
+    already. A page indexed from other markdown than it was last built from,
+    such as one built before the index existed, is indexed again from its
+    stored or parsed document. Pages that are gone or became drafts are
+    dropped. The search page is written along with the index.
 
     Args:
-        source_dir: Source directory path
-        dest_dir: Destination directory path
-    """
-    # Delete destination directory if it exists
-    if os.path.exists(dest_dir):
-        logging.info(f"Cleaning destination directory: {dest_dir}")
-        shutil.rmtree(dest_dir)
-
-    # Create destination directory
-    os.makedirs(dest_dir)
-
-    # Walk through source directory
-    for root, dirs, files in os.walk(source_dir):
-        # Get the relative path from source_dir
-        rel_path = os.path.relpath(root, source_dir)
-        # Create corresponding directory in destination
-        dest_path = os.path.join(dest_dir, rel_path)
-
-        # Create directories
-        for dir_name in dirs:
-            full_dir_path = os.path.join(dest_path, dir_name)
-            os.makedirs(full_dir_path)
-            logging.info(f"Created directory: {full_dir_path}")
-
-        # Copy files
-        for file_name in files:
-            source_file = os.path.join(root, file_name)
-            dest_file = os.path.join(dest_path, file_name)
-            shutil.copy2(source_file, dest_file)
-            logging.info(f"Copied file: {dest_file}")
+        search_index: The SearchIndex to update
+        manifest: Build manifest holding the pages' inputs and metadata
+        pages: Every (markdown path, HTML path) pair of the site
+        template_path: Path to the HTML template of the search page
+        dest_dir_path: Output directory of the site
+        base_path: Base path for the site (defaults to "/")
+        document_store: On-disk DocumentStore to load documents that need
+            indexing from (defaults to None)
+        minify: Render the search page minified (defaults to False)
+    """
+    base_path = normalize_base_path(base_path)
+    current = set()
+    for from_path, dest_path in pages:
+        metadata = manifest.metadata.get(dest_path)
+        if metadata is None:
+            # A draft, or a page that wasn't built
+            continue
+        url = page_url(dest_path, dest_dir_path)
+        current.add(url)
+        source_hash = manifest.entries[dest_path]["source_hash"]
+        if search_index.source_hash(url) != source_hash:
+            document = load_document(from_path, _read_markdown(from_path), "/", document_store=document_store)
+            search_index.update(url, metadata["title"], page_terms(document.root), source_hash)
+    search_index.retain(current)
+
+    # Write index files deleted from the output again, as with pages and assets
+    search_dir = os.path.join(dest_dir_path, SEARCH_DIR)
+    missing = search_index.mark_missing(search_dir)
+    if missing:
+        logging.info(f"Rewriting {missing} missing search index file(s)")
+    changes = search_index.render_changes(base_path)
+    for name, text in changes.items():
+        path = os.path.join(search_dir, *name.split("/"))
+        if text is not None:
+            write_page(path, [text])
+        elif os.path.exists(path):
+            os.remove(path)
+
+    dest_path = os.path.join(search_dir, "index.html")
+    inputs = {"search": "page", "template_hash": manifest.template_hash(template_path), "base_path": base_path,
+              "minify": minify, "generator": GENERATOR_VERSION}
+    if not manifest.is_fresh(dest_path, inputs):
+        template = load_template(template_path, base_path, minify)
+        content = minify_markup(search_page(base_path)) if minify else search_page(base_path)
+        write_page(dest_path, template.iter_render({"Title": "Search", "Content": content}))
+        manifest.record(dest_path, inputs)
+    logging.info(f"Search index: {len(search_index.pages)} page(s), {len(search_index.postings)} token(s), "
+                 f"{len(changes)} file(s) written")
 
 def extract_title(markdown: str) -> str:
     """
@@ -143,14 +633,10 @@ def extract_title(markdown: str) -> str:
     Raises:
         ValueError: If no h1 heading is found
     """
-    # Split markdown into blocks
-    blocks = TextNode.markdown_to_blocks(markdown)
-
-    # Look for a block that starts with a single #
-    for block in blocks:
-        text = block.text.strip()
-        if text.startswith("# "):
-            return text[2:].strip()
+    # Scan the blocks lazily, stopping at the first one that starts with a single #
+    for block in iter_blocks(markdown):
+        if block.block_type == BlockType.HEADING and block.lines[0].startswith("# "):
+            return block.text[2:].strip()
 
     raise ValueError("No h1 heading found in markdown")
 
@@ -170,17 +656,293 @@ def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
     else:
         raise ValueError("Invalid text node")
 
-def main(*argv):
-    # Get base path from command line arguments or use default
-    base_path = argv[0] if argv else "/"
+def rebuild_changed(changed: set[str], base_path: str, manifest: BuildManifest, document_cache: dict,
+                    static_compare: str = "mtime", static_method: str = "copy", block_memo: BlockMemo = None,
+                    site_url: str = None, drafts: bool = False, search_index: SearchIndex = None,
+                    minify: bool = False, document_store: DocumentStore = None) -> None:
+    """
+    Rebuild only what a set of changed input files affects.
 
-    # Ensure base path starts with /
-    if not base_path.startswith("/"):
-        base_path = "/" + base_path
+    A changed static file is synced, a changed markdown file regenerates its
+    page, a deleted one removes its page, and a changed template re-renders
+    every page that uses it from the document cache or store without
+    reparsing unchanged markdown. Any other changed path is taken to be a
+    template.
+    A page that becomes a draft is removed. The site index is then brought up
+    to date from the pages' metadata.
 
-    # Copy static files to public directory
-    copy_static_to_public("static", "docs")
-    generate_pages_recursive("content", "template.html", "docs", base_path)
+    Args:
+        changed: Paths of the input files that were added, modified or deleted
+        base_path: Base path for the site
+        manifest: Build manifest to keep up to date
+        document_cache: Parsed documents from earlier builds in this process
+        static_compare: How to detect changed static files (defaults to "mtime")
+        static_method: How to write changed static files (defaults to "copy")
+        block_memo: BlockMemo that lets an edited page reuse its unchanged
+            blocks (defaults to None)
+        site_url: Site URL for the sitemap and feed, see generate_site_index
+            (defaults to None)
+        drafts: Generate draft pages instead of removing them (defaults to False)
+        search_index: SearchIndex to keep up to date (defaults to None)
+        minify: Render pages minified, see generate_page (defaults to False)
+        document_store: On-disk DocumentStore of parsed documents, for pages
+            the document cache doesn't hold (defaults to None)
+    """
+    static_prefix = STATIC_DIR + os.sep
+    if any(path.startswith(static_prefix) for path in changed):
+        manifest.assets = sync_static(STATIC_DIR, DEST_DIR, manifest.assets, static_compare, static_method)
+
+    # Remove the pages of deleted markdown first, even when a template change rebuilds every other page
+    content_prefix = CONTENT_DIR + os.sep
+    pages = []
+    for from_path in sorted(changed):
+        if not (from_path.startswith(content_prefix) and from_path.endswith(".md")):
+            continue
+        dest_path = os.path.join(DEST_DIR, os.path.relpath(from_path, CONTENT_DIR))[:-len(".md")] + ".html"
+        if os.path.exists(from_path):
+            pages.append((from_path, dest_path))
+        else:
+            document_cache.pop((from_path, base_path), None)
+            if manifest.remove(dest_path, DEST_DIR):
+                logging.info(f"Removed {dest_path}")
+
+    templates = {path for path in changed if not path.startswith(content_prefix) and not path.startswith(static_prefix)}
+    if templates:
+        for from_path, dest_path in find_pages(CONTENT_DIR, DEST_DIR):
+            template_path = page_template_path(read_front_matter(from_path), TEMPLATE_PATH)
+            if template_path in templates and (from_path, dest_path) not in pages:
+                pages.append((from_path, dest_path))
+
+    for from_path, dest_path in pages:
+        if not drafts and read_front_matter(from_path).get("draft"):
+            if manifest.remove(dest_path, DEST_DIR):
+                logging.info(f"Removed draft {dest_path}")
+            continue
+        document = generate_page(from_path, TEMPLATE_PATH, dest_path, base_path, document_cache,
+                                 document_store=document_store, block_memo=block_memo, minify=minify)
+        template_path = page_template_path(document.front_matter, TEMPLATE_PATH)
+        inputs = manifest.page_inputs(from_path, template_path, base_path, minify)
+        metadata = page_metadata(document)
+        manifest.record(dest_path, inputs, metadata)
+        if search_index is not None:
+            search_index.update(page_url(dest_path, DEST_DIR), metadata["title"], page_terms(document.root),
+                                inputs["source_hash"])
+
+    if pages or templates or any(path.startswith(content_prefix) for path in changed):
+        all_pages = find_pages(CONTENT_DIR, DEST_DIR)
+        generate_site_index(manifest, [dest_path for _, dest_path in all_pages], TEMPLATE_PATH, DEST_DIR, base_path,
+                            site_url, minify=minify)
+        if search_index is not None:
+            update_search_index(search_index, manifest, all_pages, TEMPLATE_PATH, DEST_DIR, base_path, document_store,
+                                minify)
+
+def watched_templates() -> list[str]:
+    """Return the default template and every other template a page asks for in its front matter."""
+    templates = {page_template_path(read_front_matter(from_path), TEMPLATE_PATH)
+                 for from_path, _ in find_pages(CONTENT_DIR, DEST_DIR)}
+    return sorted(templates | {TEMPLATE_PATH})
+
+def watch_site(base_path: str, manifest: BuildManifest, document_cache: dict, port: int,
+               static_compare: str = "mtime", static_method: str = "copy", block_memo: BlockMemo = None,
+               site_url: str = None, drafts: bool = False, search_index: SearchIndex = None,
+               precompress: bool = False, minify: bool = False, document_store: DocumentStore = None) -> None:
+    """
+    Serve the built site with live reload, rebuilding whatever changes until interrupted.
+
+    Args:
+        base_path: Base path for the site
+        manifest: Build manifest of the initial build
+        document_cache: Parsed documents from the initial build
+        port: Port to serve the site on
+        static_compare: How to detect changed static files (defaults to "mtime")
+        static_method: How to write changed static files (defaults to "copy")
+        block_memo: BlockMemo of the initial build, saved when watching stops
+            (defaults to None)
+        site_url: Site URL for the sitemap and feed (defaults to None)
+        drafts: Generate draft pages (defaults to False)
+        search_index: SearchIndex of the initial build, kept up to date and
+            saved when watching stops (defaults to None)
+        precompress: Bring the .gz files up to date after each rebuild
+            (defaults to False)
+        minify: Render pages minified (defaults to False)
+        document_store: On-disk DocumentStore of the initial build, so a
+            template change re-renders pages it skipped or parsed in worker
+            processes without reparsing them (defaults to None)
+    """
+    # Also watch the templates pages ask for in their front matter, updated as pages change
+    watched = [CONTENT_DIR, STATIC_DIR, *watched_templates()]
+    notifier = ReloadNotifier()
+    server = start_server(DEST_DIR, port, base_path, notifier)
+    logging.info(f"Serving {DEST_DIR} at http://localhost:{server.server_address[1]}{base_path}")
+    logging.info(f"Watching {', '.join(watched[:-1])} and {watched[-1]} for changes")
+
+    try:
+        for changed in watch_changes(watched):
+            start = time.perf_counter()
+            if any(path.startswith(CONTENT_DIR + os.sep) for path in changed):
+                watched[2:] = watched_templates()
+            try:
+                rebuild_changed(changed, base_path, manifest, document_cache, static_compare, static_method, block_memo,
+                                site_url, drafts, search_index, minify, document_store)
+            except Exception as e:
+                # Keep watching; the next save will usually fix it
+                logging.error(f"Rebuild failed: {e}")
+                continue
+            if precompress:
+                manifest.compressed = precompress_tree(DEST_DIR, manifest.compressed)
+            manifest.save()
+            notifier.notify()
+            logging.info(f"Rebuilt {len(changed)} changed file(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        notifier.close()
+        server.shutdown()
+        if block_memo is not None:
+            block_memo.save()
+        if search_index is not None:
+            search_index.save()
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse the command line arguments of the site generator."""
+    parser = argparse.ArgumentParser(description="Build the static site from content/ into docs/.")
+    parser.add_argument("base_path", nargs="?", default="/", help="Base path for the site (defaults to /)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest and regenerate every page")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of processes to generate pages with (0 uses every CPU)")
+    parser.add_argument("--no-document-cache", action="store_true",
+                        help=f"Parse every regenerated page instead of loading unchanged ones from {DOCUMENT_STORE_DIR}")
+    parser.add_argument("--block-cache", action="store_true",
+                        help=f"Reuse the rendered HTML of unchanged blocks from earlier builds, kept in {BLOCK_MEMO_PATH}")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Read and write pages on background threads while parsing others; "
+                             "helps most on slow or network disks")
+    parser.add_argument("--static-compare", choices=SYNC_COMPARISONS, default="mtime",
+                        help="How to detect changed static files: size and mtime, or content hash")
+    parser.add_argument("--static-method", choices=SYNC_METHODS, default="copy",
+                        help="How to write changed static files; hardlink and copy_file_range "
+                             "avoid copying data when static/ and docs/ share a filesystem")
+    parser.add_argument("--drafts", action="store_true",
+                        help="Also generate pages whose front matter sets draft: true")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="Scheme and host the site is served from, such as https://example.com; "
+                             f"{SITEMAP_PATH} and {FEED_PATH} are only written when it is given")
+    parser.add_argument("--search", action="store_true",
+                        help=f"Write a sharded search index of the pages' text and a search page to "
+                             f"{DEST_DIR}/{SEARCH_DIR}/, updated incrementally from {SEARCH_INDEX_PATH}")
+    parser.add_argument("--minify", action="store_true",
+                        help="Render pages and the template without redundant whitespace and attribute quotes; "
+                             "<pre> content is kept as written")
+    parser.add_argument("--gzip", action="store_true",
+                        help=f"Write a precompressed {GZIP_SUFFIX} next to every compressible page and asset for "
+                             "hosts that serve them, compressing only what changed")
+    parser.add_argument("--watch", action="store_true",
+                        help="After building, serve docs/ with live reload and rebuild pages as their inputs change")
+    parser.add_argument("--port", type=int, default=8888, help="Port to serve on in watch mode (defaults to 8888)")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a per-page, per-stage build report to PATH, as JSONL if it ends in .jsonl "
+                             "and JSON otherwise")
+    parser.add_argument("--report-slowest", type=int, default=10, metavar="N",
+                        help="Number of slowest pages listed in the report's summary (defaults to 10)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR",
+                        help="Generate pages under cProfile and tracemalloc and write the reports to DIR "
+                             f"(defaults to {PROFILE_DIR}); implies -j 1")
+    parser.add_argument("--profile-top", type=int, default=5, metavar="N",
+                        help="Number of slowest and most memory-hungry pages to dump profiles of (defaults to 5)")
+    return parser.parse_args(argv)
+
+def main(*argv):
+    args = parse_args(list(argv))
+    base_path = args.base_path
+    jobs = args.jobs or os.cpu_count() or 1
+
+    # Ensure base path starts and ends with /
+    base_path = normalize_base_path(base_path)
+
+    # Pages recorded in the manifest are only regenerated when their inputs change
+    manifest = BuildManifest(MANIFEST_PATH) if args.force else BuildManifest.load(MANIFEST_PATH)
+
+    # Start from an empty output directory on a full build
+    if not manifest.entries and os.path.exists(DEST_DIR):
+        logging.info(f"Cleaning destination directory: {DEST_DIR}")
+        shutil.rmtree(DEST_DIR)
+
+    # Copy only the static files that changed, and remove the ones deleted from static/
+    manifest.assets = sync_static(STATIC_DIR, DEST_DIR, manifest.assets, args.static_compare, args.static_method)
+
+    # Keep parsed documents around in watch mode so template edits don't reparse
+    document_cache = {} if args.watch else None
+    report = BuildReport() if args.report else None
+    profiler = BuildProfiler(args.profile_top) if args.profile else None
+
+    # Template and base path changes re-render pages from their stored parse
+    document_store = None if args.no_document_cache else DocumentStore(DOCUMENT_STORE_DIR, args.minify)
+
+    # Edited pages reuse their unchanged blocks, across builds with --block-cache and between rebuilds in watch mode
+    block_memo = None
+    if args.block_cache:
+        block_memo = BlockMemo.load(BLOCK_MEMO_PATH, minify=args.minify)
+    elif args.watch:
+        block_memo = BlockMemo(minify=args.minify)
+
+    # A full build starts a new search index, since the old one's files were just deleted
+    search_index = None
+    if args.search:
+        search_index = SearchIndex.load(SEARCH_INDEX_PATH) if manifest.entries else SearchIndex(SEARCH_INDEX_PATH)
+    elif os.path.exists(SEARCH_INDEX_PATH):
+        logging.info(f"Removing search index from {DEST_DIR}/{SEARCH_DIR}")
+        os.remove(SEARCH_INDEX_PATH)
+        shutil.rmtree(os.path.join(DEST_DIR, SEARCH_DIR), ignore_errors=True)
+
+    try:
+        generate_pages_recursive(CONTENT_DIR, TEMPLATE_PATH, DEST_DIR, base_path, manifest, jobs, document_cache,
+                                 report, profiler, document_store, block_memo, args.pipeline, args.drafts,
+                                 search_index, args.minify)
+    except Exception:
+        # Keep the pages that were generated, so the next build only retries the ones that failed
+        manifest.save()
+        raise
+    if block_memo is not None:
+        block_memo.save()
+    pages = find_pages(CONTENT_DIR, DEST_DIR)
+    if document_store is not None:
+        document_store.prune([from_path for from_path, _ in pages])
+
+    # List the blog's posts and write the sitemap and feed from the metadata recorded with each page
+    generate_site_index(manifest, [dest_path for _, dest_path in pages], TEMPLATE_PATH, DEST_DIR, base_path,
+                        args.site_url, minify=args.minify)
+    if search_index is not None:
+        update_search_index(search_index, manifest, pages, TEMPLATE_PATH, DEST_DIR, base_path, document_store,
+                            args.minify)
+        search_index.save()
+
+    # Remove pages whose markdown source no longer exists
+    for dest_path in manifest.prune(DEST_DIR):
+        logging.info(f"Removed {dest_path}")
+
+    # Compress after everything else is written, so the .gz files match what was built
+    if args.gzip:
+        manifest.compressed = precompress_tree(DEST_DIR, manifest.compressed)
+    elif manifest.compressed:
+        removed = remove_precompressed(DEST_DIR, manifest.compressed)
+        logging.info(f"Removed {removed} precompressed file(s) from {DEST_DIR}")
+        manifest.compressed = {}
+    manifest.save()
+
+    if report is not None:
+        report.write(args.report, args.report_slowest)
+        summary = report.summary(args.report_slowest)
+        logging.info(f"Wrote build report for {summary['pages']} page(s) to {args.report} "
+                     f"({summary['total'] * 1000:.1f} ms in page generation)")
+
+    if profiler is not None:
+        written = profiler.write(args.profile)
+        logging.info(f"Profiled {profiler.pages} page(s); wrote {len(written)} report(s) to {args.profile}")
+
+    if args.watch:
+        watch_site(base_path, manifest, document_cache, args.port, args.static_compare, args.static_method, block_memo,
+                   args.site_url, args.drafts, search_index, args.gzip, args.minify, document_store)
 
 if __name__ == "__main__":
     main(*sys.argv[1:])
@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+import logging
+
+# Bump whenever a change to the generator alters the HTML it produces, so that
+# every page recorded by an older generator is rebuilt on the next run.
+GENERATOR_VERSION = "4"
+
+# Version of the on-disk manifest layout itself
+MANIFEST_FORMAT = 2
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex SHA-256 digest of a byte string."""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path: str) -> str:
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BuildManifest:
+    """Persistent record of the inputs that produced each generated page.
+
+    Each entry maps an output path to the hashes of its source markdown and
+    template, the base path, whether it was minified and the generator
+    version used to build it. A page whose recorded inputs match the current
+    ones does not need to be rebuilt. The manifest also keeps the record of the last static asset sync in assets,
+    the record of the last precompression in compressed, and the metadata of
+    each page (title, date, summary) in metadata, so the site index can list
+    pages that were not rebuilt without reading them.
+    """
+    def __init__(self, path: str, entries: dict = None, assets: dict = None, metadata: dict = None,
+                 compressed: dict = None):
+        self.path = path
+        self.entries = entries or {}
+        self.assets = assets or {}
+        self.metadata = metadata or {}
+        self.compressed = compressed or {}
+        self._seen = set()
+        self._template_hashes = {}
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        """Load a manifest from disk, or return an empty one if it is missing or unreadable."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("format") != MANIFEST_FORMAT:
+            logging.info(f"Ignoring incompatible build manifest: {path}")
+            return cls(path)
+        return cls(path, data.get("pages", {}), data.get("assets", {}), data.get("metadata", {}),
+                   data.get("compressed", {}))
+
+    def save(self) -> None:
+        """Write the manifest to disk atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"format": MANIFEST_FORMAT, "pages": self.entries, "assets": self.assets,
+                       "metadata": self.metadata, "compressed": self.compressed}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def template_hash(self, template_path: str) -> str:
+        """Hash a template once per build, re-hashing only if its mtime changes."""
+        mtime = os.stat(template_path).st_mtime_ns
+        cached = self._template_hashes.get(template_path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, hash_file(template_path))
+            self._template_hashes[template_path] = cached
+        return cached[1]
+
+    def page_inputs(self, from_path: str, template_path: str, base_path: str, minify: bool = False) -> dict:
+        """Describe everything a generated page depends on."""
+        return {
+            "source": from_path,
+            "source_hash": hash_file(from_path),
+            "template_hash": self.template_hash(template_path),
+            "base_path": base_path,
+            "minify": minify,
+            "generator": GENERATOR_VERSION,
+        }
+
+    def is_fresh(self, dest_path: str, inputs: dict) -> bool:
+        """Check whether dest_path was built from exactly these inputs and still exists.
+
+        Every output checked is marked as seen for this build, whether fresh or not.
+        """
+        self._seen.add(dest_path)
+        return self.entries.get(dest_path) == inputs and os.path.exists(dest_path)
+
+    def record(self, dest_path: str, inputs: dict, metadata: dict = None) -> None:
+        """Record the inputs a page was just built from, and its metadata if it has any."""
+        self._seen.add(dest_path)
+        self.entries[dest_path] = inputs
+        if metadata is not None:
+            self.metadata[dest_path] = metadata
+
+    def prune(self, output_dir: str = None) -> list[str]:
+        """Delete outputs recorded by a previous build that this build did not produce.
+
+        Args:
+            output_dir: Directory the outputs are written under; directories
+                left empty are removed up to, but not including, it (defaults
+                to None, which removes no directories)
+
+        Returns:
+            The list of removed output paths
+        """
+        removed = []
+        for dest_path in sorted(set(self.entries) - self._seen):
+            self.remove(dest_path, output_dir)
+            removed.append(dest_path)
+        return removed
+
+    def remove(self, dest_path: str, output_dir: str = None) -> bool:
+        """Delete a recorded output and forget it.
+
+        Args:
+            dest_path: The output to delete
+            output_dir: Directory the outputs are written under, as in prune
+                (defaults to None)
+
+        Returns:
+            True if the output was recorded
+        """
+        if self.entries.pop(dest_path, None) is None:
+            return False
+        self.metadata.pop(dest_path, None)
+        self._seen.discard(dest_path)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            if output_dir is not None:
+                remove_empty_dirs(os.path.dirname(dest_path), output_dir)
+        return True
+
+def remove_empty_dirs(directory: str, stop_dir: str) -> None:
+    """Remove directory and its parents up to, but not including, stop_dir while they are empty."""
+    stop_dir = os.path.abspath(stop_dir)
+    while os.path.abspath(directory).startswith(stop_dir + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
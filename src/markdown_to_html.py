@@ -1,47 +1,82 @@
+from typing import TYPE_CHECKING, Iterable
 from textnode import TextNode
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from text_type import TextType, BlockType
-from block import block_to_block_type
+from block import Block, iter_blocks, block_lines_to_block_type
+from urls import resolve_url
 
-def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
-    """Convert a TextNode to an HTMLNode."""
+if TYPE_CHECKING:
+    from block_memo import BlockMemo
+
+def text_node_to_html_node(text_node: TextNode, base_path: str = "/") -> HTMLNode:
+    """Convert a TextNode to an HTMLNode, resolving root-relative URLs against base_path.
+
+    Inline spans become a single tagged LeafNode rather than a ParentNode
+    wrapping an untagged one; the HTML is the same with half the nodes.
+    """
     if text_node.text_type == TextType.TEXT:
         return LeafNode(text_node.text)
     elif text_node.text_type == TextType.BOLD:
-        return ParentNode("b", [LeafNode(text_node.text)])
+        return LeafNode(text_node.text, "b")
     elif text_node.text_type == TextType.ITALIC:
-        return ParentNode("i", [LeafNode(text_node.text)])
+        return LeafNode(text_node.text, "i")
     elif text_node.text_type == TextType.CODE:
-        return ParentNode("code", [LeafNode(text_node.text)])
+        return LeafNode(text_node.text, "code")
     elif text_node.text_type == TextType.LINK:
-        return ParentNode("a", [LeafNode(text_node.text)], {"href": text_node.url})
+        return LeafNode(text_node.text, "a", {"href": resolve_url(text_node.url, base_path)})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("", "img", {"src": text_node.url, "alt": text_node.text})
+        return LeafNode("", "img", {"src": resolve_url(text_node.url, base_path), "alt": text_node.text})
     raise ValueError(f"Invalid text type: {text_node.text_type}")
 
-def text_to_children(text: str) -> list[HTMLNode]:
+# Tags for each heading level, so heading nodes share one string per level
+HEADING_TAGS = (None, "h1", "h2", "h3", "h4", "h5", "h6")
+
+def text_to_children(text: str, base_path: str = "/") -> list[HTMLNode]:
     """Convert markdown text to a list of HTMLNode children."""
     nodes = TextNode.text_to_textnodes(text)
     html_nodes = []
     for node in nodes:
         if node.text_type == TextType.TEXT and not node.text.strip():
             continue  # Skip empty text nodes
-        html_nodes.append(text_node_to_html_node(node))
+        html_nodes.append(text_node_to_html_node(node, base_path))
     return html_nodes
 
-def paragraph_to_html_node(text: str) -> HTMLNode:
+def paragraph_to_html_node(text: str, base_path: str = "/") -> HTMLNode:
     """Convert a paragraph block to an HTMLNode."""
-    return ParentNode("p", text_to_children(text))
+    return ParentNode("p", text_to_children(text, base_path))
 
-def heading_to_html_node(text: str) -> HTMLNode:
+def heading_to_html_node(text: str, base_path: str = "/") -> HTMLNode:
     """Convert a heading block to an HTMLNode."""
     level = len(text.split()[0])  # Count the number of # characters
-    return ParentNode(f"h{level}", text_to_children(text.lstrip("#").strip()))
+    return ParentNode(HEADING_TAGS[level], text_to_children(text.lstrip("#").strip(), base_path))
 
 def code_to_html_node(text: str) -> HTMLNode:
     """Convert a code block to an HTMLNode."""
+    return code_lines_to_html_node(text.split("\n"))
+
+def quote_to_html_node(text: str, base_path: str = "/") -> HTMLNode:
+    """Convert a quote block to an HTMLNode."""
+    return quote_lines_to_html_node(text.split("\n"), base_path)
+
+def unordered_list_to_html_node(text: str, base_path: str = "/") -> HTMLNode:
+    """Convert an unordered list block to an HTMLNode."""
+    return unordered_list_lines_to_html_node(text.split("\n"), base_path)
+
+def ordered_list_to_html_node(text: str, base_path: str = "/") -> HTMLNode:
+    """Convert an ordered list block to an HTMLNode."""
+    return ordered_list_lines_to_html_node(text.split("\n"), base_path)
+
+def paragraph_lines_to_html_node(lines: list[str], base_path: str = "/") -> HTMLNode:
+    """Convert the lines of a paragraph block to an HTMLNode."""
+    return paragraph_to_html_node("\n".join(lines), base_path)
+
+def heading_lines_to_html_node(lines: list[str], base_path: str = "/") -> HTMLNode:
+    """Convert the lines of a heading block to an HTMLNode."""
+    return heading_to_html_node("\n".join(lines), base_path)
+
+def code_lines_to_html_node(lines: list[str], base_path: str = "/") -> HTMLNode:
+    """Convert the lines of a code block to an HTMLNode."""
     # Remove the ``` delimiters and get the content
-    lines = text.split("\n")
     if len(lines) > 2:
         code_content = "\n".join(lines[1:-1])
     else:
@@ -51,52 +86,60 @@ def code_to_html_node(text: str) -> HTMLNode:
     code_node = ParentNode("code", [LeafNode(code_content)])
     return ParentNode("pre", [code_node])
 
-def quote_to_html_node(text: str) -> HTMLNode:
-    """Convert a quote block to an HTMLNode."""
+def quote_lines_to_html_node(lines: list[str], base_path: str = "/") -> HTMLNode:
+    """Convert the lines of a quote block to an HTMLNode."""
     # Remove the > characters and convert the content
-    lines = [line.lstrip(">").strip() for line in text.split("\n")]
-    return ParentNode("blockquote", text_to_children("\n".join(lines)))
+    text = "\n".join(line.lstrip(">").strip() for line in lines)
+    return ParentNode("blockquote", text_to_children(text, base_path))
 
-def unordered_list_to_html_node(text: str) -> HTMLNode:
-    """Convert an unordered list block to an HTMLNode."""
+def unordered_list_lines_to_html_node(lines: list[str], base_path: str = "/") -> HTMLNode:
+    """Convert the lines of an unordered list block to an HTMLNode."""
     items = []
-    for line in text.split("\n"):
+    for line in lines:
         item_text = line.lstrip("- ").strip()
-        items.append(ParentNode("li", text_to_children(item_text)))
+        items.append(ParentNode("li", text_to_children(item_text, base_path)))
     return ParentNode("ul", items)
 
-def ordered_list_to_html_node(text: str) -> HTMLNode:
-    """Convert an ordered list block to an HTMLNode."""
+def ordered_list_lines_to_html_node(lines: list[str], base_path: str = "/") -> HTMLNode:
+    """Convert the lines of an ordered list block to an HTMLNode."""
     items = []
-    for line in text.split("\n"):
+    for line in lines:
         item_text = line.split(". ", 1)[1].strip()
-        items.append(ParentNode("li", text_to_children(item_text)))
+        items.append(ParentNode("li", text_to_children(item_text, base_path)))
     return ParentNode("ol", items)
 
-def block_to_html_node(block: str) -> HTMLNode:
-    """Convert a markdown block to an HTMLNode based on its type."""
-    block_type = block_to_block_type(block)
-
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
-    elif block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
-    elif block_type == BlockType.CODE:
-        return code_to_html_node(block)
-    elif block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
-    elif block_type == BlockType.UNORDERED_LIST:
-        return unordered_list_to_html_node(block)
-    elif block_type == BlockType.ORDERED_LIST:
-        return ordered_list_to_html_node(block)
-
-    raise ValueError(f"Invalid block type: {block_type}")
-
-def markdown_to_html_node(markdown: str) -> HTMLNode:
+# Converter for the lines of each type of block
+BLOCK_LINES_CONVERTERS = {
+    BlockType.PARAGRAPH: paragraph_lines_to_html_node,
+    BlockType.HEADING: heading_lines_to_html_node,
+    BlockType.CODE: code_lines_to_html_node,
+    BlockType.QUOTE: quote_lines_to_html_node,
+    BlockType.UNORDERED_LIST: unordered_list_lines_to_html_node,
+    BlockType.ORDERED_LIST: ordered_list_lines_to_html_node,
+}
+
+def block_to_html_node(block: str | Block, base_path: str = "/") -> HTMLNode:
+    """Convert a markdown block, as a string or an already classified Block, to an HTMLNode based on its type."""
+    if isinstance(block, str):
+        lines = block.split("\n")
+        block = Block(lines, block_lines_to_block_type(lines) if block else BlockType.PARAGRAPH)
+
+    converter = BLOCK_LINES_CONVERTERS.get(block.block_type)
+    if converter is None:
+        raise ValueError(f"Invalid block type: {block.block_type}")
+    return converter(block.lines, base_path)
+
+def markdown_to_html_node(markdown: str | Iterable[str], base_path: str = "/",
+                          memo: "BlockMemo | None" = None) -> HTMLNode:
     """Convert a markdown document to an HTMLNode tree.
 
     Args:
-        markdown: A string containing the markdown document
+        markdown: The markdown document as a string, or any iterable of its
+            lines such as an open file
+        base_path: Base path that root-relative link and image URLs are resolved
+            against (defaults to "/", which leaves them unchanged)
+        memo: BlockMemo to reuse the HTML of previously rendered blocks from
+            (defaults to None)
 
     Returns:
         An HTMLNode representing the root of the document
@@ -104,9 +147,9 @@ def markdown_to_html_node(markdown: str) -> HTMLNode:
     # Create parent div
     parent = ParentNode("div", [])
 
-    # Split markdown into blocks and process each one
-    blocks = TextNode.markdown_to_blocks(markdown)
-    for block in blocks:
-        parent.children.append(block_to_html_node(block.text))
+    # Scan the markdown block by block and process each one as it is found
+    for block in iter_blocks(markdown):
+        node = memo.node(block, base_path) if memo is not None else block_to_html_node(block, base_path)
+        parent.children.append(node)
 
-    return parent
\ No newline at end of file
+    return parent
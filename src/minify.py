@@ -0,0 +1,106 @@
+import re
+
+# Whitespace as HTML defines it; a no-break space is content, not whitespace
+HTML_WHITESPACE = " \t\n\r\f"
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r\f]+")
+
+# Characters that an unquoted attribute value can't contain
+UNQUOTED_UNSAFE_PATTERN = re.compile(r"""[ \t\n\r\f"'=<>`]""")
+
+# Elements whose whitespace is part of their content, kept as written when minifying
+PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea", "script", "style"})
+
+# Elements that whitespace next to never renders as a space, so minifying drops it
+BLOCK_TAGS = frozenset({
+    "!doctype", "html", "head", "body", "title", "meta", "link", "base", "script", "style", "noscript", "template",
+    "article", "aside", "section", "nav", "header", "footer", "main", "div", "p", "pre", "blockquote", "address",
+    "ul", "ol", "li", "dl", "dt", "dd", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "figure", "figcaption",
+    "table", "caption", "thead", "tbody", "tfoot", "tr", "td", "th", "form", "fieldset", "details", "summary",
+})
+
+# Matches a comment or a tag in hand-written markup
+TAG_PATTERN = re.compile(r"<!--.*?-->|<[^>]*>", re.DOTALL)
+TAG_NAME_PATTERN = re.compile(r"</?([!\w-]+)")
+
+# Matches an attribute and its value, if it has one, so quoted values are consumed whole
+ATTRIBUTE_PATTERN = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]*))?""")
+
+def collapse_whitespace(text: str) -> str:
+    """Replace each run of whitespace in text with a single space."""
+    # Most text has nothing to collapse, and substring checks are much cheaper than the regex
+    if "  " not in text and "\n" not in text and "\t" not in text and "\r" not in text and "\f" not in text:
+        return text
+    return WHITESPACE_PATTERN.sub(" ", text)
+
+def quote_attribute(value: str) -> str:
+    """Return an attribute value as it must be written: quoted only if it can't go without."""
+    if value and not UNQUOTED_UNSAFE_PATTERN.search(value):
+        return value
+    return '"' + value.replace('"', "&quot;") + '"'
+
+def minify_markup(source: str) -> str:
+    """
+    Minify hand-written HTML, such as a template.
+
+    Whitespace next to a block-level tag is dropped, other whitespace runs
+    become one space, and quotes are dropped from attribute values that
+    don't need them. The content of <pre> and the other
+    PRESERVE_WHITESPACE_TAGS is kept as written, and so are comments.
+    Values holding a template placeholder keep their quotes, since the text
+    that fills them in may need them.
+
+    Args:
+        source: The HTML to minify
+
+    Returns:
+        The minified HTML
+    """
+    # Split the markup into text and tags, each tag with the name of its element
+    tokens = []
+    position = 0
+    for match in TAG_PATTERN.finditer(source):
+        if match.start() < position:
+            # Inside an element whose content was copied as written
+            continue
+        if match.start() > position:
+            tokens.append((source[position:match.start()], None))
+        tag = match.group(0)
+        position = match.end()
+        if tag.startswith("<!--"):
+            tokens.append((tag, "!--"))
+            continue
+
+        name_match = TAG_NAME_PATTERN.match(tag)
+        name = name_match.group(1).lower() if name_match else ""
+        tag = ATTRIBUTE_PATTERN.sub(_unquote_attribute, tag)
+        if name in PRESERVE_WHITESPACE_TAGS and not tag.startswith("</"):
+            close = re.compile(rf"</{name}\s*>", re.IGNORECASE).search(source, position)
+            end = close.end() if close else len(source)
+            tag += source[position:end]
+            position = end
+        tokens.append((tag, name))
+    if position < len(source):
+        tokens.append((source[position:], None))
+
+    parts = []
+    for i, (text, name) in enumerate(tokens):
+        if name is None:
+            text = collapse_whitespace(text)
+            # The start and end of the document count as block boundaries
+            if i == 0 or tokens[i - 1][1] in BLOCK_TAGS:
+                text = text.lstrip(HTML_WHITESPACE)
+            if i == len(tokens) - 1 or tokens[i + 1][1] in BLOCK_TAGS:
+                text = text.rstrip(HTML_WHITESPACE)
+        parts.append(text)
+    return "".join(parts)
+
+def _unquote_attribute(match: re.Match) -> str:
+    name, value = match.group(1), match.group(2)
+    if not value or value[0] not in "\"'":
+        return match.group(0)
+    value = value[1:-1]
+    # A / right after the value, as in <br class="a"/>, would become part of it
+    if (not value or UNQUOTED_UNSAFE_PATTERN.search(value) or "{{" in value
+            or match.string.startswith("/", match.end())):
+        return match.group(0)
+    return f"{name}={value}"
@@ -0,0 +1,130 @@
+import os
+import gzip
+import time
+import logging
+from typing import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from manifest import remove_empty_dirs
+
+# Extensions of text formats worth compressing; images, fonts and archives are compressed already
+COMPRESSIBLE_EXTENSIONS = frozenset({
+    ".html", ".htm", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".md", ".map", ".ico",
+    ".webmanifest", ".wasm",
+})
+
+GZIP_SUFFIX = ".gz"
+
+# Files smaller than this fit in a packet or two either way, so they aren't compressed
+MIN_SIZE = 256
+
+# A .gz is only kept when it is at most this fraction of the original's size
+MAX_RATIO = 0.9
+
+# zlib level; the build pays it once, so take the smallest output
+COMPRESSION_LEVEL = 9
+
+def precompress_tree(dest_dir: str, previous: dict = None, workers: int = None,
+                     level: int = COMPRESSION_LEVEL) -> dict:
+    """
+    Write a gzip-compressed .gz sibling of every compressible file in dest_dir.
+
+    A static host can then serve the .gz as is instead of compressing each
+    response. Only files that are new or changed since the previous run are
+    compressed, on a pool of threads, as zlib releases the GIL while it works.
+    Files too small or too incompressible to gain from it get no .gz, and the
+    .gz of a file that was deleted or stopped gaining is removed.
+
+    Args:
+        dest_dir: Directory of the built site
+        previous: The record returned by the previous run (defaults to None,
+            for a first run)
+        workers: Number of compressing threads (defaults to the CPU count)
+        level: zlib compression level (defaults to COMPRESSION_LEVEL)
+
+    Returns:
+        A record of the compressible files, keyed by path relative to
+        dest_dir, to pass as previous to the next run
+    """
+    start = time.perf_counter()
+    previous = previous or {}
+    record = {}
+    stale = []
+    for root, dirs, files in os.walk(dest_dir):
+        dirs.sort()
+        for file_name in sorted(files):
+            if os.path.splitext(file_name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, file_name)
+            rel_path = os.path.relpath(path, dest_dir)
+            stat = os.stat(path)
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            previous_entry = previous.get(rel_path)
+            if previous_entry is not None and _is_unchanged(path, entry, previous_entry):
+                record[rel_path] = previous_entry
+            else:
+                stale.append((rel_path, entry))
+
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        sizes = pool.map(lambda job: compress_file(os.path.join(dest_dir, job[0]), level), stale)
+        for (rel_path, entry), gz_size in zip(stale, sizes):
+            record[rel_path] = {**entry, "gz_size": gz_size}
+
+    remove_precompressed(dest_dir, set(previous) - set(record))
+
+    compressed = [record[rel_path] for rel_path, _ in stale if record[rel_path]["gz_size"] is not None]
+    size = sum(entry["size"] for entry in compressed)
+    gz_size = sum(entry["gz_size"] for entry in compressed)
+    ratio = f" ({size} -> {gz_size} bytes, {gz_size / size:.1%})" if size else ""
+    logging.info(f"Precompressed {len(compressed)} file(s){ratio} in {(time.perf_counter() - start) * 1000:.0f} ms: "
+                 f"{len(stale) - len(compressed)} not worth compressing, {len(record) - len(stale)} up to date")
+    return record
+
+def compress_file(path: str, level: int = COMPRESSION_LEVEL) -> int | None:
+    """
+    Write path's .gz sibling if compressing it saves enough, or remove an old one if not.
+
+    Returns:
+        The size of the written .gz, or None if none was written
+    """
+    gz_path = path + GZIP_SUFFIX
+    with open(path, "rb") as f:
+        data = f.read()
+    # mtime=0 keeps the output reproducible, so unchanged files give identical .gz files
+    compressed = gzip.compress(data, compresslevel=level, mtime=0) if len(data) >= MIN_SIZE else None
+    if compressed is None or len(compressed) > len(data) * MAX_RATIO:
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return None
+
+    tmp_path = gz_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    os.replace(tmp_path, gz_path)
+    return len(compressed)
+
+def remove_precompressed(dest_dir: str, rel_paths: Iterable[str]) -> int:
+    """
+    Remove the .gz siblings of files in dest_dir, such as every file in a previous run's record.
+
+    Returns:
+        The number of removed files
+    """
+    removed = 0
+    for rel_path in sorted(rel_paths):
+        gz_path = os.path.join(dest_dir, rel_path) + GZIP_SUFFIX
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+            remove_empty_dirs(os.path.dirname(gz_path), dest_dir)
+            removed += 1
+    return removed
+
+def _is_unchanged(path: str, entry: dict, previous_entry: dict) -> bool:
+    """Check whether a file and its .gz are still what the previous run recorded."""
+    if previous_entry["size"] != entry["size"] or previous_entry["mtime_ns"] != entry["mtime_ns"]:
+        return False
+    if previous_entry["gz_size"] is None:
+        return True
+    try:
+        return os.stat(path + GZIP_SUFFIX).st_size == previous_entry["gz_size"]
+    except FileNotFoundError:
+        return False
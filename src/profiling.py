@@ -0,0 +1,172 @@
+import io
+import os
+import time
+import heapq
+import pstats
+import cProfile
+import tracemalloc
+from typing import Callable
+
+# Lines of each allocation report
+TOP_ALLOCATIONS = 25
+
+# Functions listed in each text report
+TOP_FUNCTIONS = 30
+
+class PageProfile:
+    """The profile of generating one page, kept while it ranks among the slowest or hungriest.
+
+    Attributes:
+        dest: Path of the generated HTML file
+        seconds: Wall time spent generating the page
+        peak_bytes: Peak memory traced while generating the page
+        profile: The page's cProfile.Profile
+        allocations: The page's allocations by line, largest first
+    """
+    __slots__ = ("dest", "seconds", "peak_bytes", "profile", "allocations")
+
+    def __init__(self, dest: str, seconds: float, peak_bytes: int, profile: cProfile.Profile,
+                 allocations: list[tracemalloc.StatisticDiff]):
+        self.dest = dest
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.profile = profile
+        self.allocations = allocations
+
+class BuildProfiler:
+    """Runs page generation under cProfile and tracemalloc.
+
+    Function timings are aggregated across every profiled page, and the
+    profiles of the N slowest and N most memory-hungry pages are kept so they
+    can be dumped on their own.
+    """
+    def __init__(self, top: int = 5):
+        self.top = top
+        self.pages = 0
+        self.stats = None
+        self.slowest = []
+        self.hungriest = []
+
+    def run(self, dest: str, func: Callable, *args, **kwargs):
+        """
+        Call func under the profilers, on behalf of the page written to dest.
+
+        Args:
+            dest: Path of the generated HTML file, used to name its reports
+            func: The function generating the page
+            *args, **kwargs: Passed on to func
+
+        Returns:
+            What func returns
+        """
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            result = profile.runcall(func, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+
+        allocations = after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+        self._add(PageProfile(dest, seconds, peak - baseline, profile, allocations))
+        return result
+
+    def _add(self, page: PageProfile) -> None:
+        self.pages += 1
+        if self.stats is None:
+            self.stats = pstats.Stats(page.profile)
+        else:
+            self.stats.add(page.profile)
+
+        # Min-heaps of the top pages; the counter breaks ties without comparing pages
+        for heap, metric in ((self.slowest, page.seconds), (self.hungriest, page.peak_bytes)):
+            entry = (metric, self.pages, page)
+            if len(heap) < self.top:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+
+    def slowest_pages(self) -> list[PageProfile]:
+        return [page for _, _, page in sorted(self.slowest, reverse=True)]
+
+    def hungriest_pages(self) -> list[PageProfile]:
+        return [page for _, _, page in sorted(self.hungriest, reverse=True)]
+
+    def write(self, dest_dir: str) -> list[str]:
+        """
+        Dump the profiles to dest_dir.
+
+        Writes build.pstats and build.txt with the functions aggregated over
+        every page, then a .pstats and .txt report for each of the slowest
+        pages under slowest/, and a top-allocations report for each of the most
+        memory-hungry pages under memory/. The .pstats files load with
+        pstats.Stats or tools such as snakeviz.
+
+        Args:
+            dest_dir: Directory to write the reports into
+
+        Returns:
+            The paths of the written files
+        """
+        written = []
+        if self.stats is None:
+            return written
+        os.makedirs(dest_dir, exist_ok=True)
+
+        path = os.path.join(dest_dir, "build.pstats")
+        self.stats.dump_stats(path)
+        written.append(path)
+        written.append(self._write_text(os.path.join(dest_dir, "build.txt"), self._build_summary()))
+
+        for rank, page in enumerate(self.slowest_pages(), 1):
+            name = os.path.join(dest_dir, "slowest", f"{rank:02d}-{_page_name(page.dest)}")
+            os.makedirs(os.path.dirname(name), exist_ok=True)
+            page.profile.dump_stats(name + ".pstats")
+            written.append(name + ".pstats")
+            header = f"{page.dest}: {page.seconds * 1000:.2f} ms\n\n"
+            written.append(self._write_text(name + ".txt", header + _function_report(pstats.Stats(page.profile))))
+
+        for rank, page in enumerate(self.hungriest_pages(), 1):
+            name = os.path.join(dest_dir, "memory", f"{rank:02d}-{_page_name(page.dest)}")
+            os.makedirs(os.path.dirname(name), exist_ok=True)
+            lines = [f"{page.dest}: peak {page.peak_bytes / 1024:.1f} KiB", ""]
+            lines.extend(str(allocation) for allocation in page.allocations)
+            written.append(self._write_text(name + ".txt", "\n".join(lines) + "\n"))
+        return written
+
+    def _build_summary(self) -> str:
+        lines = [f"Profiled {self.pages} page(s)", "", "Slowest pages:"]
+        lines.extend(f"  {page.seconds * 1000:10.2f} ms  {page.dest}" for page in self.slowest_pages())
+        lines.extend(["", "Most memory-hungry pages:"])
+        lines.extend(f"  {page.peak_bytes / 1024:10.1f} KiB  {page.dest}" for page in self.hungriest_pages())
+        lines.append("")
+        return "\n".join(lines) + "\n" + _function_report(self.stats)
+
+    @staticmethod
+    def _write_text(path: str, text: str) -> str:
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+def _function_report(stats: pstats.Stats) -> str:
+    """List the hottest functions by own time and by cumulative time."""
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.strip_dirs()
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+    return stream.getvalue()
+
+def _page_name(dest: str) -> str:
+    """Turn a page's path into a flat file name."""
+    return dest.replace(os.sep, "_").replace(".", "_")
@@ -0,0 +1,362 @@
+import os
+import re
+import json
+import heapq
+import marshal
+from collections import Counter
+from htmlnode import HTMLNode
+from manifest import GENERATOR_VERSION
+from urls import resolve_url
+
+# Characters of a token's prefix that pick the shard it is stored in
+SHARD_PREFIX_LENGTH = 2
+
+# Tokens outside these lengths aren't indexed; the minimum must be at least SHARD_PREFIX_LENGTH
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 40
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Matches shard prefixes that can be used as file names as they are
+PLAIN_PREFIX_PATTERN = re.compile(r"[a-z0-9_]+")
+
+# Version of the files written for the search page
+INDEX_FORMAT = 1
+
+# Directory the index and search page are written to, relative to the output directory
+SEARCH_DIR = "search"
+
+# Subdirectory of SEARCH_DIR holding the shards, apart from docs.json and the search page
+SHARDS_DIR = "shards"
+
+def tokenize(text: str) -> list[str]:
+    """Split text into the lowercase tokens the index is keyed by."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH]
+
+def page_terms(root: HTMLNode) -> dict[str, int]:
+    """
+    Count the tokens of a page's text.
+
+    The text is taken from the leaves of the page's parsed tree, which hold
+    the text of the TextNodes the parser produced, so no HTML is scraped.
+
+    Args:
+        root: The root of the page's HTMLNode tree
+
+    Returns:
+        Each token of the page and the number of times it occurs
+    """
+    counts = Counter(TOKEN_PATTERN.findall(" ".join(root.iter_text()).lower()))
+    return {token: count for token, count in counts.items() if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH}
+
+def shard_name(token: str, prefix_length: int = SHARD_PREFIX_LENGTH) -> str:
+    """Return the name of the shard a token is stored in: its prefix, or the prefix's UTF-8 in hex after a dash."""
+    prefix = token[:prefix_length]
+    if PLAIN_PREFIX_PATTERN.fullmatch(prefix):
+        return prefix
+    return "-" + prefix.encode("utf-8").hex()
+
+class SearchIndex:
+    """Inverted index of the site's page text, updated one page at a time.
+
+    The index maps each token to a posting list of the pages it occurs in,
+    with its count on each page. It is written for a static search page as
+    JSON shards, one per token prefix, so a query only downloads the shards
+    of its own tokens. Each posting list is flattened to alternating doc id
+    deltas and counts, which stay small and repetitive and so gzip well.
+
+    Only the shards whose posting lists changed are written again, and the
+    whole index is saved between builds so unchanged pages are never
+    indexed twice.
+    """
+    def __init__(self, path: str = None, prefix_length: int = SHARD_PREFIX_LENGTH):
+        self.path = path
+        self.prefix_length = prefix_length
+        # url -> (doc id, title, source hash, terms)
+        self.pages = {}
+        # token -> {doc id: count}
+        self.postings = {}
+        self.next_id = 0
+        self.free_ids = []
+        self.base_path = None
+        self.dirty_shards = set()
+        self.docs_dirty = False
+
+    @classmethod
+    def load(cls, path: str, prefix_length: int = SHARD_PREFIX_LENGTH) -> "SearchIndex":
+        """
+        Load an index saved by an earlier build.
+
+        Returns:
+            The loaded index, or an empty one if the file is missing, unreadable
+            or was saved by another generator version or with another prefix length
+        """
+        index = cls(path, prefix_length)
+        try:
+            with open(path, "rb") as f:
+                version, saved_prefix_length, base_path, pages, postings, next_id, free_ids = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return index
+        if version == GENERATOR_VERSION and saved_prefix_length == prefix_length:
+            index.pages = pages
+            index.postings = postings
+            index.next_id = next_id
+            index.free_ids = free_ids
+            index.base_path = base_path
+        return index
+
+    def save(self) -> None:
+        """Write the index to its path atomically."""
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = (GENERATOR_VERSION, self.prefix_length, self.base_path, self.pages, self.postings, self.next_id,
+                self.free_ids)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps(data))
+        os.replace(tmp_path, self.path)
+
+    def source_hash(self, url: str) -> str | None:
+        """Return the source hash a page was last indexed from, or None if it isn't indexed."""
+        page = self.pages.get(url)
+        return page[2] if page is not None else None
+
+    def update(self, url: str, title: str, terms: dict[str, int], source_hash: str = None) -> None:
+        """
+        Index a page, replacing what was indexed for it before.
+
+        Args:
+            url: Site URL of the page
+            title: Title of the page, shown in search results
+            terms: The page's token counts, as returned by page_terms
+            source_hash: Hash of the markdown the page was built from (defaults to None)
+        """
+        page = self.pages.get(url)
+        if page is None:
+            doc_id = heapq.heappop(self.free_ids) if self.free_ids else self._new_id()
+            old_terms = {}
+            self.docs_dirty = True
+        else:
+            doc_id, old_title, _, old_terms = page
+            if old_title != title:
+                self.docs_dirty = True
+
+        # Only the tokens whose count changed touch their posting lists and shards
+        for token, count in old_terms.items():
+            if terms.get(token) != count:
+                self._remove_posting(token, doc_id)
+        for token, count in terms.items():
+            if old_terms.get(token) != count:
+                self.postings.setdefault(token, {})[doc_id] = count
+                self.dirty_shards.add(shard_name(token, self.prefix_length))
+        self.pages[url] = (doc_id, title, source_hash, terms)
+
+    def remove(self, url: str) -> bool:
+        """
+        Remove a page from the index.
+
+        Returns:
+            True if the page was indexed
+        """
+        page = self.pages.pop(url, None)
+        if page is None:
+            return False
+        doc_id, _, _, terms = page
+        for token in terms:
+            self._remove_posting(token, doc_id)
+        heapq.heappush(self.free_ids, doc_id)
+        self.docs_dirty = True
+        return True
+
+    def retain(self, urls: set[str]) -> list[str]:
+        """
+        Remove every page whose URL is not in urls.
+
+        Returns:
+            The URLs of the removed pages
+        """
+        removed = [url for url in self.pages if url not in urls]
+        for url in removed:
+            self.remove(url)
+        return removed
+
+    def _new_id(self) -> int:
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _remove_posting(self, token: str, doc_id: int) -> None:
+        postings = self.postings[token]
+        del postings[doc_id]
+        if not postings:
+            del self.postings[token]
+        self.dirty_shards.add(shard_name(token, self.prefix_length))
+
+    def render_shard(self, tokens: list[str]) -> str:
+        """Encode the posting lists of a shard's tokens as compact JSON, tokens and doc ids in order."""
+        shard = {}
+        for token in sorted(tokens):
+            postings = self.postings[token]
+            flat = []
+            previous = 0
+            for doc_id in sorted(postings):
+                flat.append(doc_id - previous)
+                flat.append(postings[doc_id])
+                previous = doc_id
+            shard[token] = flat
+        return json.dumps(shard, separators=(",", ":"), ensure_ascii=False)
+
+    def render_docs(self, base_path: str = "/") -> str:
+        """Encode the index's settings and the URL and title of each doc id as compact JSON."""
+        docs = [None] * self.next_id
+        for url, (doc_id, title, _, _) in self.pages.items():
+            docs[doc_id] = [resolve_url(url, base_path), title]
+        return json.dumps({
+            "format": INDEX_FORMAT,
+            "prefix_length": self.prefix_length,
+            "min_token_length": MIN_TOKEN_LENGTH,
+            "pages": len(self.pages),
+            "docs": docs,
+        }, separators=(",", ":"), ensure_ascii=False)
+
+    def render_changes(self, base_path: str = "/") -> dict[str, str | None]:
+        """
+        Render the index files that changed since the last call, and mark them clean.
+
+        Args:
+            base_path: Base path for the site, which the page URLs are resolved against
+
+        Returns:
+            The contents of each changed file keyed by its path under
+            SEARCH_DIR, with None for shards that no longer have any tokens
+            and should be deleted
+        """
+        changes = {}
+        if self.dirty_shards:
+            tokens = {name: [] for name in self.dirty_shards}
+            for token in self.postings:
+                name = shard_name(token, self.prefix_length)
+                if name in tokens:
+                    tokens[name].append(token)
+            for name in sorted(tokens):
+                changes[f"{SHARDS_DIR}/{name}.json"] = self.render_shard(tokens[name]) if tokens[name] else None
+        if self.docs_dirty or base_path != self.base_path:
+            changes["docs.json"] = self.render_docs(base_path)
+        self.dirty_shards = set()
+        self.docs_dirty = False
+        self.base_path = base_path
+        return changes
+
+    def mark_missing(self, search_dir: str) -> int:
+        """
+        Mark the index files that are missing from search_dir as changed, so the next render_changes writes them.
+
+        Returns:
+            The number of missing files
+        """
+        names = {shard_name(token, self.prefix_length) for token in self.postings}
+        missing = {name for name in names if not os.path.exists(os.path.join(search_dir, SHARDS_DIR, f"{name}.json"))}
+        self.dirty_shards |= missing
+        if not os.path.exists(os.path.join(search_dir, "docs.json")):
+            self.docs_dirty = True
+            return len(missing) + 1
+        return len(missing)
+
+    def rebuild_all(self) -> None:
+        """Mark every file as changed, so the next render_changes writes the whole index."""
+        self.dirty_shards = {shard_name(token, self.prefix_length) for token in self.postings}
+        self.docs_dirty = True
+
+    def shard_sizes(self) -> dict[str, int]:
+        """Return the encoded size in bytes of every shard, keyed by shard name."""
+        tokens = {}
+        for token in self.postings:
+            tokens.setdefault(shard_name(token, self.prefix_length), []).append(token)
+        return {name: len(self.render_shard(names).encode("utf-8")) for name, names in tokens.items()}
+
+    def __repr__(self) -> str:
+        return f"SearchIndex(pages={len(self.pages)}, tokens={len(self.postings)})"
+
+# Content of the search page; its script fetches the shards of the query's tokens
+SEARCH_PAGE = """<h1>Search</h1>
+<form id="search-form" role="search"><input id="search-input" type="search" placeholder="Search" autofocus></form>
+<ol id="search-results"></ol>
+<script>
+(function () {
+  var root = "__INDEX_URL__";
+  var input = document.getElementById("search-input");
+  var list = document.getElementById("search-results");
+  var meta = null;
+  var shards = {};
+
+  function fetchJson(name) {
+    return fetch(root + name).then(function (response) { return response.ok ? response.json() : {}; });
+  }
+  function shardName(token) {
+    var prefix = Array.from(token).slice(0, meta.prefix_length).join("");
+    if (/^[a-z0-9_]+$/.test(prefix)) return prefix;
+    return "-" + Array.from(new TextEncoder().encode(prefix), function (b) {
+      return b.toString(16).padStart(2, "0");
+    }).join("");
+  }
+  function shard(name) {
+    if (!shards[name]) shards[name] = fetchJson("__SHARDS_DIR__/" + name + ".json");
+    return shards[name];
+  }
+  function postings(token) {
+    // Tokens at least as long as the prefix also match longer tokens, so results come as you type
+    return shard(shardName(token)).then(function (tokens) {
+      var scores = {};
+      Object.keys(tokens).forEach(function (candidate) {
+        if (candidate !== token && (token.length < meta.prefix_length || candidate.indexOf(token) !== 0)) return;
+        var flat = tokens[candidate], id = 0, weight = Math.log(1 + meta.pages * 2 / flat.length);
+        for (var i = 0; i < flat.length; i += 2) {
+          id += flat[i];
+          scores[id] = (scores[id] || 0) + flat[i + 1] * weight;
+        }
+      });
+      return scores;
+    });
+  }
+  function search(query) {
+    var tokens = (query.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || []).filter(function (token) {
+      return token.length >= meta.min_token_length;
+    });
+    if (!tokens.length) return Promise.resolve([]);
+    return Promise.all(tokens.map(postings)).then(function (results) {
+      // Pages must match every token; their scores add up
+      return Object.keys(results[0]).filter(function (id) {
+        return results.every(function (scores) { return id in scores; });
+      }).map(function (id) {
+        return [id, results.reduce(function (sum, scores) { return sum + scores[id]; }, 0)];
+      }).sort(function (a, b) { return b[1] - a[1]; }).slice(0, 20);
+    });
+  }
+  function show(matches) {
+    list.textContent = "";
+    matches.forEach(function (match) {
+      var doc = meta.docs[match[0]], item = document.createElement("li"), link = document.createElement("a");
+      link.href = doc[0];
+      link.textContent = doc[1];
+      item.appendChild(link);
+      list.appendChild(item);
+    });
+  }
+  fetchJson("docs.json").then(function (docs) {
+    meta = docs;
+    input.addEventListener("input", function () {
+      var query = input.value;
+      search(query).then(function (matches) { if (input.value === query) show(matches); });
+    });
+  });
+  document.getElementById("search-form").addEventListener("submit", function (event) { event.preventDefault(); });
+})();
+</script>"""
+
+def search_page(base_path: str = "/") -> str:
+    """Return the HTML content of the search page, querying the index under base_path."""
+    return SEARCH_PAGE.replace("__INDEX_URL__", resolve_url(f"/{SEARCH_DIR}/", base_path)).replace(
+        "__SHARDS_DIR__", SHARDS_DIR)
@@ -0,0 +1,237 @@
+import os
+from html import escape
+from document import Document
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from urls import resolve_url
+
+# Section of the site whose pages are listed on paginated index pages
+BLOG_SECTION = "blog"
+
+# Posts on each listing page
+POSTS_PER_PAGE = 10
+
+# Newest posts included in the Atom feed
+FEED_ENTRIES = 20
+
+# Where the sitemap and feed are written, relative to the output directory
+SITEMAP_PATH = "sitemap.xml"
+FEED_PATH = "atom.xml"
+
+def page_metadata(document: Document) -> dict:
+    """
+    Collect what the site index needs to know about a page.
+
+    The title, date and tags come from the page's front matter. Without a
+    title there, the page's first h1 is used. A page without a date has
+    none: its markdown's mtime changes with every checkout, and the index
+    must come out the same from the same content.
+
+    Args:
+        document: The page's parsed Document
+
+    Returns:
+        A dict with the page's title, date (UTC, ISO 8601, or None), summary and tags
+    """
+    front_matter = document.front_matter
+    return {
+        "title": front_matter.get("title") or document.title,
+        "date": front_matter.get("date"),
+        "summary": document.summary,
+        "tags": front_matter.get("tags", []),
+    }
+
+def page_url(dest_path: str, dest_dir: str) -> str:
+    """Return the site URL a generated page is served at, like /blog/tom/ for docs/blog/tom/index.html."""
+    rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[:-len("index.html")]
+    return "/" + rel_path
+
+def url_dest_path(url: str, dest_dir: str) -> str:
+    """Return the path of the index.html a directory URL like /blog/page/2/ is written to."""
+    return os.path.join(dest_dir, *[part for part in url.split("/") if part], "index.html")
+
+def site_pages(metadata: dict, dest_paths: list[str], dest_dir: str) -> list[dict]:
+    """
+    List the site's pages for the index, oldest first.
+
+    Args:
+        metadata: Page metadata keyed by HTML path, as kept by the build manifest
+        dest_paths: HTML paths of every page currently in the site
+        dest_dir: Output directory of the site
+
+    Returns:
+        The metadata of each page that has any, with its "url" added, sorted
+        by date and then URL so pages with equal dates keep a stable order.
+        Undated pages come first, by URL.
+    """
+    pages = []
+    for dest_path in dest_paths:
+        meta = metadata.get(dest_path)
+        if meta is not None:
+            pages.append({**meta, "url": page_url(dest_path, dest_dir)})
+    pages.sort(key=lambda page: (page["date"] or "", page["url"]))
+    return pages
+
+class Listing:
+    """One page of a section's paginated post listing.
+
+    Attributes:
+        url: Site URL of the listing page
+        number: Page number, counting from the oldest posts
+        posts: Metadata of the listed posts, newest first
+        newer_url: URL of the listing page with the next newer posts, or None
+        older_url: URL of the listing page with the next older posts, or None
+    """
+    __slots__ = ("url", "number", "posts", "newer_url", "older_url")
+
+    def __init__(self, url: str, number: int, posts: list[dict], newer_url: str = None, older_url: str = None):
+        self.url = url
+        self.number = number
+        self.posts = posts
+        self.newer_url = newer_url
+        self.older_url = older_url
+
+    def inputs(self) -> dict:
+        """Everything the listing page's HTML depends on, besides the template and base path."""
+        return {"url": self.url, "posts": self.posts, "newer": self.newer_url, "older": self.older_url}
+
+    def __repr__(self) -> str:
+        return f"Listing(url={self.url}, posts={len(self.posts)})"
+
+def paginate(posts: list[dict], section_url: str, per_page: int = POSTS_PER_PAGE,
+             index_taken: bool = False) -> list[Listing]:
+    """
+    Split a section's posts into listing pages.
+
+    Pages are filled from the oldest post, so page N always holds the same
+    posts and a new post only changes the newest page. The newest page is
+    served at the section's own URL and the older ones at page/N/ under it.
+
+    Args:
+        posts: Metadata of the section's posts, oldest first
+        section_url: Site URL of the section, like /blog/
+        per_page: Posts on each page (defaults to POSTS_PER_PAGE)
+        index_taken: Whether the section has an index page of its own, in
+            which case the newest listing page goes to page/N/ as well
+            (defaults to False)
+
+    Returns:
+        The listing pages, oldest first
+    """
+    chunks = [posts[i:i + per_page] for i in range(0, len(posts), per_page)]
+    urls = [f"{section_url}page/{number}/" for number in range(1, len(chunks) + 1)]
+    if urls and not index_taken:
+        urls[-1] = section_url
+
+    listings = []
+    for i, chunk in enumerate(chunks):
+        newer_url = urls[i + 1] if i + 1 < len(urls) else None
+        older_url = urls[i - 1] if i > 0 else None
+        listings.append(Listing(urls[i], i + 1, chunk[::-1], newer_url, older_url))
+    return listings
+
+def listing_node(listing: Listing, title: str, base_path: str = "/") -> HTMLNode:
+    """
+    Build the HTML of a listing page's content.
+
+    Args:
+        listing: The listing page
+        title: Heading of the page
+        base_path: Base path to resolve the links against (defaults to "/")
+
+    Returns:
+        An HTMLNode tree with the heading, one list item per post and links
+        to the newer and older listing pages
+    """
+    items = []
+    for post in listing.posts:
+        children = [LeafNode(escape(post["title"], quote=False), "a", {"href": resolve_url(post["url"], base_path)})]
+        if post["date"]:
+            date = post["date"][:10]
+            children.extend([LeafNode(" "), LeafNode(date, "time", {"datetime": date})])
+        if post.get("summary"):
+            children.append(LeafNode(escape(post["summary"], quote=False), "p"))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode(escape(title, quote=False), "h1"), ParentNode("ul", items)]
+    links = []
+    if listing.newer_url is not None:
+        links.append(LeafNode("Newer posts", "a", {"href": resolve_url(listing.newer_url, base_path)}))
+    if listing.older_url is not None:
+        if links:
+            links.append(LeafNode(" "))
+        links.append(LeafNode("Older posts", "a", {"href": resolve_url(listing.older_url, base_path)}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+def absolute_url(url: str, site_url: str, base_path: str = "/") -> str:
+    """Turn a site URL into an absolute one, like https://example.com/base/blog/tom/."""
+    return site_url.rstrip("/") + resolve_url(url, base_path)
+
+def render_sitemap(pages: list[tuple[str, str]], site_url: str, base_path: str = "/") -> str:
+    """
+    Render a sitemap.xml.
+
+    Args:
+        pages: (site URL, ISO 8601 date or None) pairs of every page to
+            list; pages without a date get no lastmod
+        site_url: Scheme and host the site is served from, like https://example.com
+        base_path: Base path of the site (defaults to "/")
+
+    Returns:
+        The sitemap's XML
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url, date in sorted(pages, key=lambda page: page[0]):
+        lastmod = f"<lastmod>{date[:10]}</lastmod>" if date else ""
+        lines.append(f"  <url><loc>{escape(absolute_url(url, site_url, base_path))}</loc>{lastmod}</url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+def render_feed(posts: list[dict], title: str, feed_url: str, site_url: str, base_path: str = "/") -> str:
+    """
+    Render an Atom feed.
+
+    Args:
+        posts: Metadata of the posts to include, newest first; all of them
+            need a date
+        title: Title of the feed, also used as its author
+        feed_url: Site URL of the feed itself
+        site_url: Scheme and host the site is served from, like https://example.com
+        base_path: Base path of the site (defaults to "/")
+
+    Returns:
+        The feed's XML
+    """
+    home = absolute_url("/", site_url, base_path)
+    updated = posts[0]["date"] if posts else "1970-01-01T00:00:00Z"
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(title)}</title>",
+        f"  <id>{escape(home)}</id>",
+        f'  <link href="{escape(home)}"/>',
+        f'  <link rel="self" href="{escape(absolute_url(feed_url, site_url, base_path))}"/>',
+        f"  <updated>{updated}</updated>",
+        f"  <author><name>{escape(title)}</name></author>",
+    ]
+    for post in posts:
+        url = escape(absolute_url(post["url"], site_url, base_path))
+        lines.extend([
+            "  <entry>",
+            f"    <title>{escape(post['title'])}</title>",
+            f"    <id>{url}</id>",
+            f'    <link href="{url}"/>',
+            f"    <updated>{post['date']}</updated>",
+        ])
+        lines.extend(f'    <category term="{escape(tag)}"/>' for tag in post.get("tags", ()))
+        if post.get("summary"):
+            lines.append(f"    <summary>{escape(post['summary'])}</summary>")
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
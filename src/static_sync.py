@@ -0,0 +1,136 @@
+import os
+import shutil
+import logging
+from manifest import hash_file, remove_empty_dirs
+
+# Ways a changed asset can be written to the destination
+SYNC_METHODS = ("copy", "hardlink", "copy_file_range")
+
+# Ways to decide whether an asset changed since it was last synced
+SYNC_COMPARISONS = ("mtime", "hash")
+
+def sync_static(source_dir: str, dest_dir: str, previous: dict = None, compare: str = "mtime",
+                method: str = "copy") -> dict:
+    """
+    Bring dest_dir's copy of the files in source_dir up to date, touching only what changed.
+
+    Files are copied only if they are new or differ from the copy in dest_dir,
+    and files synced by a previous run whose source has since been deleted are
+    removed. Anything else in dest_dir, such as generated pages, is left alone.
+
+    Args:
+        source_dir: Source directory path
+        dest_dir: Destination directory path
+        previous: The record returned by the previous sync (defaults to None,
+            for a first sync)
+        compare: "mtime" treats a file as unchanged if its copy has the same
+            size and modification time; "hash" also requires the same content
+            hash (defaults to "mtime")
+        method: "copy" copies changed files, "hardlink" hard-links them when
+            source and destination share a filesystem, and "copy_file_range"
+            lets the kernel copy (or reflink) them (defaults to "copy")
+
+    Returns:
+        A record of the synced files, keyed by path relative to source_dir, to
+        pass as previous to the next sync
+    """
+    if compare not in SYNC_COMPARISONS:
+        raise ValueError(f"Invalid sync comparison: {compare}")
+    if method not in SYNC_METHODS:
+        raise ValueError(f"Invalid sync method: {method}")
+    previous = previous or {}
+
+    record = {}
+    copied = 0
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for file_name in sorted(files):
+            source_file = os.path.join(root, file_name)
+            rel_path = os.path.relpath(source_file, source_dir)
+            dest_file = os.path.join(dest_dir, rel_path)
+
+            source_stat = os.stat(source_file)
+            entry = {"size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns}
+            if compare == "hash":
+                entry["hash"] = _source_hash(source_file, entry, previous.get(rel_path))
+
+            if not _is_unchanged(dest_file, entry, previous.get(rel_path)):
+                _write_file(source_file, dest_file, method)
+                logging.info(f"Copied file: {dest_file}")
+                copied += 1
+            record[rel_path] = entry
+
+    removed = 0
+    for rel_path in sorted(set(previous) - set(record)):
+        dest_file = os.path.join(dest_dir, rel_path)
+        if os.path.exists(dest_file):
+            os.remove(dest_file)
+            logging.info(f"Removed file: {dest_file}")
+            remove_empty_dirs(os.path.dirname(dest_file), dest_dir)
+            removed += 1
+
+    logging.info(f"Synced {source_dir} to {dest_dir}: {copied} copied, "
+                 f"{len(record) - copied} unchanged, {removed} removed")
+    return record
+
+def _source_hash(source_file: str, entry: dict, previous_entry: dict | None) -> str:
+    # Reuse the recorded hash while the source's size and mtime haven't moved
+    if (previous_entry is not None and "hash" in previous_entry
+            and previous_entry["size"] == entry["size"] and previous_entry["mtime_ns"] == entry["mtime_ns"]):
+        return previous_entry["hash"]
+    return hash_file(source_file)
+
+def _is_unchanged(dest_file: str, entry: dict, previous_entry: dict | None) -> bool:
+    """Check whether dest_file already holds the file described by entry."""
+    try:
+        dest_stat = os.stat(dest_file)
+    except FileNotFoundError:
+        return False
+    if dest_stat.st_size != entry["size"]:
+        return False
+
+    if "hash" in entry:
+        # Compare against what the last sync wrote, or the file itself if it wasn't recorded
+        if previous_entry is not None and "hash" in previous_entry:
+            return previous_entry["hash"] == entry["hash"] and previous_entry["size"] == dest_stat.st_size
+        return hash_file(dest_file) == entry["hash"]
+
+    # Copies keep the source's mtime, and hard links share it
+    return dest_stat.st_mtime_ns == entry["mtime_ns"]
+
+def _write_file(source_file: str, dest_file: str, method: str) -> None:
+    """Write source_file to dest_file with the given method, replacing any old copy atomically."""
+    os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+    tmp_file = dest_file + ".tmp"
+    if os.path.lexists(tmp_file):
+        os.remove(tmp_file)
+
+    if method == "hardlink":
+        try:
+            os.link(source_file, tmp_file)
+            os.replace(tmp_file, dest_file)
+            return
+        except OSError:
+            # Different filesystems, or links not supported: fall back to copying
+            pass
+    elif method == "copy_file_range" and hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(source_file, tmp_file)
+            shutil.copystat(source_file, tmp_file)
+            os.replace(tmp_file, dest_file)
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(source_file, tmp_file)
+    os.replace(tmp_file, dest_file)
+
+def _copy_file_range(source_file: str, dest_file: str) -> None:
+    """Copy a file inside the kernel, which can share blocks on filesystems that support it."""
+    with open(source_file, "rb") as fsrc, open(dest_file, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
@@ -0,0 +1,98 @@
+import os
+import re
+from typing import Iterator, TextIO
+from urls import resolve_root_relative_attrs
+from minify import minify_markup
+
+# Matches placeholders such as {{ Title }} and {{ Content }}
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class Template:
+    """An HTML template compiled into static segments and named slots.
+
+    The template text is split once into the static segments between
+    placeholders, so rendering a page is a single join instead of one
+    whole-page str.replace per placeholder. Root-relative links in the
+    template's own markup are resolved against base_path at compile time.
+
+    A minify template has its markup minified at compile time as well, and
+    pages rendered with it should fill it with minified content, as
+    generate_page does by checking template.minify.
+    """
+    def __init__(self, source: str, base_path: str = "/", minify: bool = False):
+        self.segments = []
+        self.slots = []
+        self.minify = minify
+
+        # Links are resolved first, so minifying sees the attribute values as they will be written
+        source = resolve_root_relative_attrs(source, base_path)
+        if minify:
+            source = minify_markup(source)
+
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.segments.append(source[position:match.start()])
+            self.slots.append((match.group(1), match.group(0)))
+            position = match.end()
+        self.segments.append(source[position:])
+
+    def render(self, values: dict) -> str:
+        """Fill the template's slots with values.
+
+        Args:
+            values: Mapping of slot name to the text to insert. Slots without a
+                value are left in the output as written in the template.
+
+        Returns:
+            The rendered page
+        """
+        return "".join(self.iter_render(values))
+
+    def iter_render(self, values: dict) -> Iterator[str]:
+        """Yield the rendered page in chunks.
+
+        Args:
+            values: Mapping of slot name to either a string or an iterable of
+                string chunks, such as HTMLNode.iter_html(). An iterable value
+                can only be consumed once, so it should fill a single slot.
+        """
+        yield self.segments[0]
+        for (name, placeholder), segment in zip(self.slots, self.segments[1:]):
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield segment
+
+    def render_to(self, fp: TextIO, values: dict) -> None:
+        """Write the rendered page straight to an open text file."""
+        fp.writelines(self.iter_render(values))
+
+    def __repr__(self) -> str:
+        return f"Template(slots={[name for name, _ in self.slots]}, minify={self.minify})"
+
+# Compiled templates keyed by path, base path and minify, each stored with the mtime it was read at
+_template_cache = {}
+
+def load_template(template_path: str, base_path: str = "/", minify: bool = False) -> Template:
+    """Load and compile a template, reusing the compiled copy until the file changes.
+
+    Args:
+        template_path: Path to the HTML template
+        base_path: Base path to resolve the template's root-relative links against
+        minify: Minify the template's markup (defaults to False)
+
+    Returns:
+        The compiled Template
+    """
+    mtime = os.stat(template_path).st_mtime_ns
+    key = (template_path, base_path, minify)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(template_path, "r") as f:
+        template = Template(f.read(), base_path, minify)
+    _template_cache[key] = (mtime, template)
+    return template
@@ -0,0 +1,40 @@
+import unittest
+import os
+import tempfile
+import shutil
+from benchmark import Corpus, compare_results, index_size_report, load_baseline, save_baseline
+
+class TestBaseline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "baseline.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_compare_results(self):
+        baseline = {"block_split": 0.010, "build": 0.500}
+        results = {"block_split": 0.0124, "build": 0.700, "to_html": 1.0}
+        self.assertEqual(compare_results(baseline, results), ["build"])
+        self.assertEqual(compare_results(baseline, results, threshold=0.5), [])
+        self.assertEqual(compare_results(baseline, results, threshold=0.2), ["block_split", "build"])
+
+    def test_round_trip(self):
+        corpus = Corpus("small_posts", 2)
+        save_baseline(self.path, corpus, {"build": 0.5})
+        self.assertEqual(load_baseline(self.path, Corpus("small_posts", 2)), {"build": 0.5})
+
+    def test_different_corpus(self):
+        save_baseline(self.path, Corpus("small_posts", 2), {"build": 0.5})
+        with self.assertRaises(ValueError):
+            load_baseline(self.path, Corpus("small_posts", 3))
+
+class TestIndexSizeReport(unittest.TestCase):
+    def test_longer_prefixes_make_more_smaller_shards(self):
+        report = index_size_report(Corpus("small_posts", 5), (1, 2))
+        self.assertLess(report[1]["shards"], report[2]["shards"])
+        self.assertLessEqual(report[2]["largest_bytes"], report[1]["largest_bytes"])
+        self.assertLess(report[1]["gzip_bytes"], report[1]["bytes"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 from text_type import BlockType
-from block import block_to_block_type
+from block import Block, block_to_block_type, iter_blocks
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_paragraph(self):
@@ -73,5 +74,62 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type("1. First\n3. Wrong number"), BlockType.PARAGRAPH)
         self.assertEqual(block_to_block_type("1.No space"), BlockType.PARAGRAPH)
 
+    def test_ordered_list_numbers(self):
+        # Numbering must start at 1 and go up one at a time, past single digits too
+        block = "\n".join(f"{i}. Item {i}" for i in range(1, 12))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("2. Starts at two"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("01. Leading zero"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("2024 was a good year."), BlockType.PARAGRAPH)
+
+    def test_indented_list_lines(self):
+        self.assertEqual(block_to_block_type("- First\n  - Second"), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type("1. First\n 2. Second"), BlockType.ORDERED_LIST)
+
+    def test_paragraph_starting_with_syntax_characters(self):
+        self.assertEqual(block_to_block_type("#hashtag"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("`code` first"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("-5 degrees"), BlockType.PARAGRAPH)
+
+class TestIterBlocks(unittest.TestCase):
+    def test_blocks_are_typed(self):
+        markdown = "# Title\n\n  Some text\n  more text  \n\n\n- one\n- two\n\n> quote"
+        self.assertEqual(list(iter_blocks(markdown)), [
+            Block(["# Title"], BlockType.HEADING),
+            Block(["Some text", "more text"], BlockType.PARAGRAPH),
+            Block(["- one", "- two"], BlockType.UNORDERED_LIST),
+            Block(["> quote"], BlockType.QUOTE),
+        ])
+
+    def test_whitespace_only_lines_separate_blocks(self):
+        blocks = list(iter_blocks("First\n   \nSecond"))
+        self.assertEqual([block.text for block in blocks], ["First", "Second"])
+
+    def test_empty(self):
+        self.assertEqual(list(iter_blocks("")), [])
+        self.assertEqual(list(iter_blocks("\n\n  \n")), [])
+
+    def test_fenced_code_with_blank_lines(self):
+        markdown = "Intro\n\n```\nfirst()\n\n\nsecond()\n```\n\nOutro"
+        blocks = list(iter_blocks(markdown))
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(blocks[1], Block(["```", "first()", "", "", "second()", "```"], BlockType.CODE))
+        self.assertEqual(blocks[2].text, "Outro")
+
+    def test_single_line_fence_does_not_open_block(self):
+        blocks = list(iter_blocks("```inline```\n\nNext"))
+        self.assertEqual([block.block_type for block in blocks], [BlockType.CODE, BlockType.PARAGRAPH])
+
+    def test_file_source(self):
+        source = io.StringIO("# Title\n\nBody line\n")
+        self.assertEqual(list(iter_blocks(source)), [
+            Block(["# Title"], BlockType.HEADING),
+            Block(["Body line"], BlockType.PARAGRAPH),
+        ])
+
+    def test_lazy(self):
+        blocks = iter_blocks("# One\n\n# Two")
+        self.assertEqual(next(blocks).text, "# One")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
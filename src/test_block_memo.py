@@ -0,0 +1,106 @@
+import unittest
+import os
+import tempfile
+import shutil
+from unittest import mock
+import block_memo as block_memo_module
+from block_memo import BlockMemo
+from block import iter_blocks
+from document import parse_document
+from document_store import decode_node, encode_node
+from manifest import hash_bytes
+from markdown_to_html import markdown_to_html_node
+from corpus import corpus_pages
+
+MARKDOWN = """# Title
+
+A [link](/about), an ![image](/images/a.png) and an [external one](https://example.com).
+
+- **bold** item
+- `code` item
+
+Shared footer with a [home link](/)."""
+
+class TestBlockMemo(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_parse(self):
+        memo = BlockMemo()
+        for _, markdown in corpus_pages("mixed", 12):
+            for base_path in ("/", "/site/"):
+                with self.subTest(base_path=base_path):
+                    document = parse_document(markdown, base_path, memo)
+                    expected = parse_document(markdown, base_path)
+                    self.assertEqual(document.root.to_html(), expected.root.to_html())
+                    self.assertEqual(document.outline, expected.outline)
+                    self.assertEqual(document.word_count, expected.word_count)
+        self.assertGreater(memo.hits, 0)
+
+    def test_markdown_to_html_node(self):
+        memo = BlockMemo()
+        markdown_to_html_node(MARKDOWN, "/", memo)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, "/site/", memo).to_html(),
+                         markdown_to_html_node(MARKDOWN, "/site/").to_html())
+        self.assertEqual((memo.hits, memo.misses), (4, 4))
+
+    def test_edit_reuses_unchanged_blocks(self):
+        memo = BlockMemo()
+        parse_document(MARKDOWN, "/", memo)
+        parse_document(MARKDOWN.replace("bold", "strong"), "/", memo)
+        self.assertEqual(memo.hits, 3)
+        self.assertEqual(memo.misses, 5)
+
+    def test_lru_eviction(self):
+        memo = BlockMemo(maxsize=2)
+        blocks = list(iter_blocks("one\n\ntwo\n\nthree"))
+        memo.node(blocks[0])
+        memo.node(blocks[1])
+        memo.node(blocks[0])
+        memo.node(blocks[2])
+        self.assertEqual(list(memo.entries), [hash_bytes(b"one"), hash_bytes(b"three")])
+
+    def test_marker_in_text_is_not_memoized(self):
+        memo = BlockMemo()
+        block = next(iter_blocks("A \0 [link](/about)"))
+        self.assertEqual(memo.node(block, "/site/").to_html(), "<p>A \0 <a href=/site/about>link</a></p>")
+        self.assertEqual(memo.entries, {})
+
+    def test_save_and_load(self):
+        path = os.path.join(self.temp_dir, ".build", "blocks.marshal")
+        memo = BlockMemo(path=path)
+        parse_document(MARKDOWN, "/", memo)
+        memo.save()
+
+        loaded = BlockMemo.load(path)
+        self.assertEqual(loaded.entries, memo.entries)
+        self.assertEqual(parse_document(MARKDOWN, "/site/", loaded).root.to_html(),
+                         parse_document(MARKDOWN, "/site/").root.to_html())
+        self.assertEqual(loaded.misses, 0)
+
+        self.assertEqual(len(BlockMemo.load(path, maxsize=2).entries), 2)
+        with mock.patch.object(block_memo_module, "GENERATOR_VERSION", "next"):
+            self.assertEqual(BlockMemo.load(path).entries, {})
+        self.assertEqual(BlockMemo.load(os.path.join(self.temp_dir, "missing")).entries, {})
+
+    def test_minify(self):
+        path = os.path.join(self.temp_dir, "blocks.marshal")
+        memo = BlockMemo(path=path, minify=True)
+        markdown = "A ![two words](/a.png)\nand  more"
+        self.assertEqual(parse_document(markdown, "/site/", memo).root.to_html(),
+                         parse_document(markdown, "/site/").root.to_html(minify=True))
+        memo.save()
+        self.assertEqual(len(BlockMemo.load(path, minify=True).entries), 1)
+        self.assertEqual(BlockMemo.load(path).entries, {})
+
+    def test_document_store_round_trip(self):
+        memo = BlockMemo()
+        document = parse_document(MARKDOWN, "/", memo)
+        decoded = decode_node(encode_node(document.root), "/site/")
+        self.assertEqual(decoded.to_html(), parse_document(MARKDOWN, "/site/").root.to_html())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from build_report import BuildReport, PageStats, count_nodes
+from markdown_to_html import markdown_to_html_node
+
+def page_stats(dest, read, render, cached=False):
+    stats = PageStats(dest.replace(".html", ".md"), dest)
+    stats.times["read"] = read
+    stats.times["render"] = render
+    stats.nodes = 10
+    stats.output_bytes = 100
+    stats.document_cached = cached
+    return stats
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.report = BuildReport()
+        self.report.add_page(page_stats("a.html", 0.001, 0.002))
+        self.report.add_page(page_stats("b.html", 0.003, 0.004, cached=True))
+        self.report.add_page(page_stats("c.html", 0.002, 0.002))
+        self.report.count("manifest_misses", 3)
+        self.report.count("manifest_hits")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_summary(self):
+        summary = self.report.summary(slowest=2)
+        self.assertEqual(summary["pages"], 3)
+        self.assertAlmostEqual(summary["total"], 0.014)
+        self.assertAlmostEqual(summary["times"]["read"], 0.006)
+        self.assertEqual(summary["times"]["write"], 0)
+        self.assertEqual(summary["nodes"], 30)
+        self.assertEqual(summary["output_bytes"], 300)
+        self.assertEqual([page["dest"] for page in summary["slowest"]], ["b.html", "c.html"])
+        self.assertEqual(summary["counters"], {
+            "manifest_misses": 3,
+            "manifest_hits": 1,
+            "document_cache_hits": 1,
+            "document_cache_misses": 2,
+        })
+
+    def test_write_json(self):
+        path = os.path.join(self.temp_dir, "reports", "build.json")
+        self.report.write(path)
+        with open(path, "r") as f:
+            report = json.load(f)
+        self.assertEqual(report["summary"]["pages"], 3)
+        self.assertEqual([page["dest"] for page in report["pages"]], ["a.html", "b.html", "c.html"])
+        self.assertAlmostEqual(report["pages"][1]["total"], 0.007)
+
+    def test_write_jsonl(self):
+        path = os.path.join(self.temp_dir, "build.jsonl")
+        self.report.write(path)
+        with open(path, "r") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["type"] for line in lines], ["page", "page", "page", "summary"])
+        self.assertEqual(lines[0]["times"]["render"], 0.002)
+        self.assertEqual(lines[-1]["counters"]["manifest_hits"], 1)
+
+class TestCountNodes(unittest.TestCase):
+    def test_count_nodes(self):
+        # div > p > (text, b), ul > li > text
+        root = markdown_to_html_node("Some **bold**\n\n- item")
+        self.assertEqual(count_nodes(root), 7)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import os
+import tempfile
+import shutil
+from corpus import CORPUS_SHAPES, corpus_pages, write_corpus
+from document import parse_document
+
+class TestCorpus(unittest.TestCase):
+    def test_same_seed_same_site(self):
+        self.assertEqual(corpus_pages("mixed", 20), corpus_pages("mixed", 20))
+        self.assertNotEqual(corpus_pages("mixed", 20), corpus_pages("mixed", 20, seed=1))
+
+    def test_every_shape_parses(self):
+        for shape in CORPUS_SHAPES:
+            with self.subTest(shape=shape):
+                pages = corpus_pages(shape, 3)
+                self.assertEqual(len(pages), 3)
+                for index, (rel_path, markdown) in enumerate(pages):
+                    self.assertEqual(rel_path, os.path.join("posts", f"post-{index}", "index.md"))
+                    self.assertEqual(parse_document(markdown).title, f"Post {index}")
+
+    def test_default_pages(self):
+        self.assertEqual(len(corpus_pages("huge_documents")), CORPUS_SHAPES["huge_documents"][1])
+
+    def test_unknown_shape(self):
+        with self.assertRaises(ValueError):
+            corpus_pages("tiny")
+
+    def test_write_corpus(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            paths = write_corpus(temp_dir, "small_posts", 2)
+            self.assertEqual(paths, [os.path.join(temp_dir, "posts", f"post-{i}", "index.md") for i in range(2)])
+            with open(paths[1], "r") as f:
+                self.assertEqual(f.read(), corpus_pages("small_posts", 2)[1][1])
+        finally:
+            shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    unittest.main()
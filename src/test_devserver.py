@@ -0,0 +1,188 @@
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+import gzip
+import http.client
+import urllib.request
+from devserver import LIVE_RELOAD_PATH, LIVE_RELOAD_SCRIPT, ReloadNotifier, parse_range, start_server
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "blog"))
+        with open(os.path.join(self.temp_dir, "blog", "index.html"), "w") as f:
+            f.write("<html><body><h1>Blog</h1></body></html>")
+        with open(os.path.join(self.temp_dir, "index.css"), "w") as f:
+            f.write("body {}")
+
+        self.notifier = ReloadNotifier()
+        self.server = start_server(self.temp_dir, 0, "/site/", self.notifier)
+        self.base_url = f"http://localhost:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.notifier.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def get(self, path):
+        with urllib.request.urlopen(self.base_url + path, timeout=5) as response:
+            return response.read().decode("utf-8")
+
+    def test_html_gets_reload_script(self):
+        html = self.get("/site/blog/")
+        self.assertEqual(html, f"<html><body><h1>Blog</h1>{LIVE_RELOAD_SCRIPT}</body></html>")
+
+    def test_other_files_served_as_is(self):
+        self.assertEqual(self.get("/site/index.css"), "body {}")
+
+    def test_reload_event(self):
+        response = urllib.request.urlopen(self.base_url + LIVE_RELOAD_PATH, timeout=5)
+        try:
+            threading.Timer(0.1, self.notifier.notify).start()
+            self.assertEqual(response.readline(), b"data: reload\n")
+        finally:
+            response.close()
+
+class TestPreviewServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "blog"))
+        self.page = os.path.join(self.temp_dir, "index.html")
+        self.html = "<html><body>" + "<p>Hello, world!</p>" * 50 + "</body></html>"
+        with open(self.page, "w") as f:
+            f.write(self.html)
+        self.image = bytes(range(256)) * 4
+        with open(os.path.join(self.temp_dir, "photo.png"), "wb") as f:
+            f.write(self.image)
+
+        self.server = start_server(self.temp_dir, 0)
+        self.connection = http.client.HTTPConnection("localhost", self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, path, method="GET", **headers):
+        self.connection.request(method, path, headers=headers)
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_etag_revalidation(self):
+        response, body = self.request("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body.decode("utf-8"), self.html)
+        etag = response.getheader("ETag")
+
+        response, body = self.request("/", **{"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+        self.assertEqual(self.server.cache.misses, 1)
+        self.assertEqual(self.server.cache.hits, 1)
+
+    def test_changed_file_is_reread(self):
+        _, _ = self.request("/index.html")
+        with open(self.page, "w") as f:
+            f.write("<p>Rebuilt</p>")
+        response, body = self.request("/index.html")
+        self.assertEqual(body, b"<p>Rebuilt</p>")
+        self.assertEqual(self.server.cache.misses, 2)
+
+    def test_gzip(self):
+        response, body = self.request("/", **{"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body).decode("utf-8"), self.html)
+
+        # Images are already compressed
+        response, body = self.request("/photo.png", **{"Accept-Encoding": "gzip"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, self.image)
+
+    def test_range(self):
+        response, body = self.request("/photo.png", Range="bytes=100-199")
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader("Content-Range"), "bytes 100-199/1024")
+        self.assertEqual(body, self.image[100:200])
+
+        response, body = self.request("/photo.png", Range="bytes=2000-")
+        self.assertEqual(response.status, 416)
+        self.assertEqual(response.getheader("Content-Range"), "bytes */1024")
+
+        # A range that doesn't parse is ignored
+        response, body = self.request("/photo.png", Range="bytes=abc-5")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.image)
+
+        # A stale If-Range gets the whole file
+        response, body = self.request("/photo.png", Range="bytes=0-9", **{"If-Range": '"stale"'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.image)
+
+    def test_head(self):
+        response, body = self.request("/photo.png", method="HEAD")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Length"), "1024")
+        self.assertEqual(body, b"")
+
+    def test_directory_redirect_and_not_found(self):
+        response, _ = self.request("/blog?page=2")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/blog/?page=2")
+
+        response, _ = self.request("/blog/")
+        self.assertEqual(response.status, 404)
+
+    def test_base_path_redirect(self):
+        server = start_server(self.temp_dir, 0, "/base/")
+        connection = http.client.HTTPConnection("localhost", server.server_address[1], timeout=5)
+        try:
+            connection.request("GET", "/base?x=1")
+            response = connection.getresponse()
+            response.read()
+            self.assertEqual(response.status, 301)
+            self.assertEqual(response.getheader("Location"), "/base/?x=1")
+
+            connection.request("GET", "/base/")
+            response = connection.getresponse()
+            self.assertEqual(response.read().decode("utf-8"), self.html)
+        finally:
+            connection.close()
+            server.shutdown()
+            server.server_close()
+
+class TestParseRange(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-2000", 1000), (990, 999))
+
+    def test_ignored(self):
+        self.assertIsNone(parse_range("bytes=0-9,20-29", 1000))
+        self.assertIsNone(parse_range("items=0-9", 1000))
+        self.assertIsNone(parse_range("bytes=a-b", 1000))
+        self.assertIsNone(parse_range("bytes=abc-", 1000))
+        self.assertIsNone(parse_range("bytes=abc-5", 1000))
+        self.assertIsNone(parse_range("bytes=5-abc", 1000))
+        self.assertIsNone(parse_range("bytes=-", 1000))
+
+    def test_unsatisfiable(self):
+        with self.assertRaises(ValueError):
+            parse_range("bytes=1000-", 1000)
+        with self.assertRaises(ValueError):
+            parse_range("bytes=20-10", 1000)
+
+class TestReloadNotifier(unittest.TestCase):
+    def test_wait(self):
+        notifier = ReloadNotifier()
+        self.assertEqual(notifier.wait(0, timeout=0.01), 0)
+        notifier.notify()
+        self.assertEqual(notifier.wait(0, timeout=0.01), 1)
+
+if __name__ == "__main__":
+    unittest.main()
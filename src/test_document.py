@@ -0,0 +1,88 @@
+import unittest
+from document import SUMMARY_LENGTH, Document, document_from_blocks, parse_document, shorten
+from block import iter_blocks
+from markdown_to_html import markdown_to_html_node
+
+MARKDOWN = """# Main Title
+
+Some **bold** and *italic* text with a [link](/about).
+
+## Section One
+
+- first item
+- second item
+
+### Details
+
+```
+code here
+```
+
+## Section Two
+
+> A quote
+"""
+
+class TestParseDocument(unittest.TestCase):
+    def test_html_matches_markdown_to_html_node(self):
+        document = parse_document(MARKDOWN, "/site/")
+        self.assertEqual(document.root.to_html(), markdown_to_html_node(MARKDOWN, "/site/").to_html())
+
+    def test_title(self):
+        self.assertEqual(parse_document(MARKDOWN).title, "Main Title")
+
+    def test_title_is_first_h1(self):
+        document = parse_document("## Intro\n\n# First\n\n# Second")
+        self.assertEqual(document.title, "First")
+
+    def test_no_title(self):
+        self.assertIsNone(parse_document("## Only a subtitle\n\nText").title)
+        self.assertIsNone(parse_document("").title)
+
+    def test_outline(self):
+        self.assertEqual(parse_document(MARKDOWN).outline, [
+            (1, "Main Title"),
+            (2, "Section One"),
+            (3, "Details"),
+            (2, "Section Two"),
+        ])
+
+    def test_word_count(self):
+        document = parse_document("# Two words\n\nThree **more** words\n\n- and four here")
+        self.assertEqual(document.word_count, 8)
+
+    def test_word_count_empty(self):
+        self.assertEqual(parse_document("").word_count, 0)
+
+    def test_summary(self):
+        self.assertEqual(parse_document(MARKDOWN).summary, "Some bold and italic text with a link.")
+
+    def test_summary_skips_link_only_paragraphs(self):
+        document = parse_document("# Post\n\n[< Back Home](/)\n\n![Photo](/a.png)\n\nThe *first*\nprose.")
+        self.assertEqual(document.summary, "The first prose.")
+        self.assertIsNone(parse_document("# Post\n\n- a list").summary)
+
+    def test_summary_is_shortened(self):
+        summary = parse_document("word " * 100).summary
+        self.assertLessEqual(len(summary), SUMMARY_LENGTH)
+        self.assertTrue(summary.endswith("word…"))
+
+    def test_shorten(self):
+        self.assertEqual(shorten("short"), "short")
+        self.assertEqual(shorten("one two, three", 10), "one two…")
+
+    def test_document_from_blocks(self):
+        document = document_from_blocks(list(iter_blocks(MARKDOWN)), "/site/")
+        expected = parse_document(MARKDOWN, "/site/")
+        self.assertEqual(document.root.to_html(), expected.root.to_html())
+        self.assertEqual(document.outline, expected.outline)
+        self.assertEqual(document.word_count, expected.word_count)
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(Document(markdown_to_html_node("# Hi"), [(1, "Hi")], 1)),
+            "Document(title=Hi, headings=1, word_count=1)",
+        )
+
+if __name__ == "__main__":
+    unittest.main()
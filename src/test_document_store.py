@@ -0,0 +1,82 @@
+import unittest
+import os
+import tempfile
+import shutil
+from unittest import mock
+import document_store as document_store_module
+from document_store import DocumentStore, decode_node, encode_node
+from document import parse_document
+
+MARKDOWN = """# Title
+
+A [link](/about), an ![image](/images/a.png) and an [external one](https://example.com).
+
+- **bold** item
+- `code` item
+
+> quote
+"""
+
+class TestDocumentStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = DocumentStore(os.path.join(self.temp_dir, "documents"))
+        document = parse_document(MARKDOWN)
+        document.front_matter = {"tags": ["a"]}
+        self.store.save("content/index.md", MARKDOWN, document)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_matches_parse(self):
+        for base_path in ("/", "/site/"):
+            with self.subTest(base_path=base_path):
+                document = self.store.load("content/index.md", MARKDOWN, base_path)
+                expected = parse_document(MARKDOWN, base_path)
+                self.assertEqual(document.root.to_html(), expected.root.to_html())
+                self.assertEqual(document.outline, expected.outline)
+                self.assertEqual(document.word_count, expected.word_count)
+                self.assertEqual(document.summary, expected.summary)
+                self.assertEqual(document.front_matter, {"tags": ["a"]})
+        self.assertEqual(self.store.hits, 2)
+
+    def test_changed_markdown_misses(self):
+        self.assertIsNone(self.store.load("content/index.md", MARKDOWN + "\nMore", "/"))
+        self.assertIsNone(self.store.load("content/other.md", MARKDOWN, "/"))
+        self.assertEqual(self.store.misses, 2)
+
+    def test_new_generator_version_misses(self):
+        with mock.patch.object(document_store_module, "GENERATOR_VERSION", "next"):
+            self.assertIsNone(self.store.load("content/index.md", MARKDOWN, "/"))
+
+    def test_other_minify_mode_misses(self):
+        store = DocumentStore(self.store.directory, minify=True)
+        self.assertIsNone(store.load("content/index.md", MARKDOWN, "/"))
+        store.save("content/index.md", MARKDOWN, parse_document(MARKDOWN))
+        self.assertIsNotNone(store.load("content/index.md", MARKDOWN, "/"))
+        self.assertIsNone(self.store.load("content/index.md", MARKDOWN, "/"))
+
+    def test_corrupt_entry_misses(self):
+        with open(self.store.entry_path("content/index.md"), "wb") as f:
+            f.write(b"\x00garbage")
+        self.assertIsNone(self.store.load("content/index.md", MARKDOWN, "/"))
+
+    def test_prune(self):
+        self.store.save("content/old.md", MARKDOWN, parse_document(MARKDOWN))
+        self.assertEqual(self.store.prune(["content/index.md"]), 1)
+        self.assertEqual(os.listdir(self.store.directory), [os.path.basename(self.store.entry_path("content/index.md"))])
+        self.assertEqual(DocumentStore(os.path.join(self.temp_dir, "missing")).prune([]), 0)
+
+class TestEncodeNode(unittest.TestCase):
+    def test_round_trip(self):
+        root = parse_document(MARKDOWN).root
+        decoded = decode_node(encode_node(root))
+        self.assertEqual(decoded.to_html(), root.to_html())
+        self.assertEqual(repr(decoded), repr(root))
+
+    def test_empty_parent(self):
+        root = parse_document("").root
+        self.assertEqual(decode_node(encode_node(root)).children, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import tempfile
+import shutil
+from front_matter import normalize_date, page_template_path, parse_front_matter, read_front_matter, split_front_matter
+
+class TestParseFrontMatter(unittest.TestCase):
+    def test_known_keys(self):
+        front_matter = parse_front_matter([
+            'title: "Why Tom Bombadil: a Mistake"',
+            "date: 2024-01-02",
+            "tags: [tolkien, 'elves']",
+            "draft: true",
+            "template: post.html",
+            "# a comment",
+            "",
+            "author: Tim",
+        ])
+        self.assertEqual(front_matter, {
+            "title": "Why Tom Bombadil: a Mistake",
+            "date": "2024-01-02T00:00:00Z",
+            "tags": ["tolkien", "elves"],
+            "draft": True,
+            "template": "post.html",
+            "author": "Tim",
+        })
+
+    def test_block_list(self):
+        self.assertEqual(parse_front_matter(["tags:", "  - one", "  - 'two words'"]), {"tags": ["one", "two words"]})
+
+    def test_comma_separated_tags(self):
+        self.assertEqual(parse_front_matter(["tags: a, b"]), {"tags": ["a", "b"]})
+
+    def test_empty_values(self):
+        self.assertEqual(parse_front_matter(["tags:", "title:"]), {"tags": [], "title": ""})
+
+    def test_malformed(self):
+        for lines in (["no separator"], ["draft: maybe"], ["date: someday"], ["- orphan"], ["title: a", "- b"],
+                      ["title: [a, b]"]):
+            with self.subTest(lines=lines):
+                with self.assertRaises(ValueError):
+                    parse_front_matter(lines)
+
+    def test_normalize_date(self):
+        self.assertEqual(normalize_date("2024-01-02 10:30+02:00"), "2024-01-02T08:30:00Z")
+        self.assertEqual(normalize_date("2024-01-02T10:30:00Z"), "2024-01-02T10:30:00Z")
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_split(self):
+        self.assertEqual(split_front_matter("---\r\ntitle: Hi\r\n---\r\n# Body\r\n"), ({"title": "Hi"}, "# Body\r\n"))
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Body"), ({}, "# Body"))
+        self.assertEqual(split_front_matter("----\n# Body"), ({}, "----\n# Body"))
+        self.assertEqual(split_front_matter(""), ({}, ""))
+
+    def test_closing_fence_at_end(self):
+        self.assertEqual(split_front_matter("---\ndraft: no\n---"), ({"draft": False}, ""))
+
+    def test_unclosed(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: Hi\n# Body")
+
+class TestReadFrontMatter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "post.md")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+    def test_reads_only_the_header(self):
+        # Bytes that can't be decoded, far past the header, are never read
+        with open(self.path, "wb") as f:
+            f.write(b"---\ntitle: Hi\n---\n# Body\n" + b"x" * 100000 + b"\xff\xfe")
+        self.assertEqual(read_front_matter(self.path), {"title": "Hi"})
+
+    def test_no_front_matter(self):
+        self.write("# Body\n\n---\ntitle: not front matter\n---\n")
+        self.assertEqual(read_front_matter(self.path), {})
+
+    def test_error_names_file(self):
+        self.write("---\ndraft: perhaps\n---\n")
+        with self.assertRaisesRegex(ValueError, "post.md"):
+            read_front_matter(self.path)
+        self.write("---\ntitle: Hi\n")
+        with self.assertRaisesRegex(ValueError, "not closed"):
+            read_front_matter(self.path)
+
+class TestPageTemplatePath(unittest.TestCase):
+    def test_page_template_path(self):
+        self.assertEqual(page_template_path({}, "template.html"), "template.html")
+        self.assertEqual(page_template_path({"template": "post.html"}, "template.html"), "post.html")
+        self.assertEqual(page_template_path({"template": "post.html"}, os.path.join("site", "template.html")),
+                         os.path.join("site", "post.html"))
+
+if __name__ == "__main__":
+    unittest.main()
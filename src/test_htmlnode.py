@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RenderedNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_init(self):
@@ -132,6 +133,87 @@ class TestParentNode(unittest.TestCase):
         )
 
 
+class TestStreamingRender(unittest.TestCase):
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode("Hello "), LeafNode("world", "b")], {"class": "intro"}),
+            LeafNode("", "img", {"src": "a.png"}),
+            ParentNode("ul", [ParentNode("li", [LeafNode("one")]), ParentNode("li", [LeafNode("two")])]),
+        ])
+        self.assertEqual(
+            "".join(node.iter_html()),
+            "<div><p class=intro>Hello <b>world</b></p><img src=a.png><ul><li>one</li><li>two</li></ul></div>",
+        )
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_iter_html_leaf(self):
+        self.assertEqual(list(LeafNode("Hi", "b").iter_html()), ["<b>Hi</b>"])
+
+    def test_deep_nesting(self):
+        depth = 10000
+        node = LeafNode("deep")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * depth + "deep"))
+        self.assertTrue(html.endswith("</span>" * depth))
+
+    def test_render_to(self):
+        node = ParentNode("div", [LeafNode("Hello", "p")])
+        fp = io.StringIO()
+        node.render_to(fp)
+        self.assertEqual(fp.getvalue(), "<div><p>Hello</p></div>")
+
+    def test_iter_html_errors(self):
+        node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            "".join(node.iter_html())
+        with self.assertRaises(NotImplementedError):
+            "".join(ParentNode("div", [HTMLNode("p", "x")]).iter_html())
+
+    def test_iter_text(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode("Hello "), LeafNode("world", "b")]),
+            LeafNode("", "img", {"src": "a.png"}),
+            ParentNode("ul", [ParentNode("li", [LeafNode("one")])]),
+        ])
+        self.assertEqual(list(node.iter_text()), ["Hello ", "world", "one"])
+
+    def test_rendered_node(self):
+        rendered = RenderedNode(('<p><a href=', 'about>About</a> us</p>'), ("About", " us"), "/site/")
+        node = ParentNode("div", [rendered, LeafNode("end", "p")])
+        self.assertEqual(node.to_html(), "<div><p><a href=/site/about>About</a> us</p><p>end</p></div>")
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+        self.assertEqual(list(node.iter_text()), ["About", " us", "end"])
+
+        rendered.resolve("/")
+        self.assertEqual(rendered.to_html(), "<p><a href=/about>About</a> us</p>")
+
+class TestMinifiedRender(unittest.TestCase):
+    def test_whitespace_and_quotes(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode("Some\n  text "), LeafNode("link", "a", {"href": "/a b", "class": "x"})]),
+            LeafNode(None, "img", {"src": "/a.png", "alt": "An image"}),
+        ])
+        expected = '<div><p>Some text <a href="/a b" class=x>link</a></p><img src=/a.png alt="An image"></div>'
+        self.assertEqual(node.to_html(minify=True), expected)
+        self.assertEqual("".join(node.iter_html(minify=True)), expected)
+
+    def test_pre_is_kept(self):
+        code = ParentNode("pre", [ParentNode("code", [LeafNode("if x:\n    y  = 1")])])
+        node = ParentNode("div", [code, LeafNode("a  b", "p")])
+        self.assertEqual(node.to_html(minify=True), "<div><pre><code>if x:\n    y  = 1</code></pre><p>a b</p></div>")
+        self.assertEqual(LeafNode("a  b", "pre").to_html(minify=True), "<pre>a  b</pre>")
+
+    def test_default_is_unchanged(self):
+        node = ParentNode("p", [LeafNode("a  b", "a", {"href": "/x y"})])
+        self.assertEqual(node.to_html(), "<p><a href=/x y>a  b</a></p>")
+
+    def test_render_to(self):
+        buffer = io.StringIO()
+        ParentNode("p", [LeafNode("a\n b")]).render_to(buffer, minify=True)
+        self.assertEqual(buffer.getvalue(), "<p>a b</p>")
+
 
 if __name__ == "__main__":
     unittest.main()
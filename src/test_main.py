@@ -2,7 +2,15 @@ import unittest
 import os
 import tempfile
 import shutil
-from main import extract_title, generate_page
+from unittest import mock
+import main
+from main import (extract_title, generate_page, generate_pages_recursive, generate_pages_pipelined, generate_site_index,
+                  find_pages, rebuild_changed, update_search_index)
+from manifest import BuildManifest
+from search_index import SEARCH_DIR, SHARDS_DIR, SearchIndex
+from build_report import PAGE_STAGES, BuildReport
+from document_store import DocumentStore
+from block_memo import BlockMemo
 
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title_simple(self):
@@ -86,6 +94,36 @@ class TestGeneratePage(unittest.TestCase):
         self.assertIn("Test Title", html)
         self.assertIn("This is a test paragraph", html)
 
+    def test_generate_page_base_path(self):
+        with open(self.markdown_path, "w") as f:
+            f.write("# Test Title\n\n![Logo](/images/logo.png) [Home](/)\n\n```\nhref=\"/not-a-link\"\n```")
+        with open(self.template_path, "w") as f:
+            f.write('<link href="/index.css" /><title>{{ Title }}</title>{{ Content }}')
+
+        generate_page(self.markdown_path, self.template_path, self.dest_path, "/site")
+
+        with open(self.dest_path, "r") as f:
+            html = f.read()
+        self.assertIn('<link href="/site/index.css" />', html)
+        self.assertIn("src=/site/images/logo.png", html)
+        self.assertIn("<a href=/site/>Home</a>", html)
+        # Literal text inside code blocks is left alone
+        self.assertIn('href="/not-a-link"', html)
+
+    def test_generate_page_minify(self):
+        with open(self.markdown_path, "w") as f:
+            f.write("# Test Title\n\n![Two words](/logo.png) and\nmore\n\n```\n  keep  this\n```")
+        with open(self.template_path, "w") as f:
+            f.write('<html>\n  <link href="/index.css" />\n  <body>\n    {{ Content }}\n  </body>\n</html>\n')
+
+        generate_page(self.markdown_path, self.template_path, self.dest_path, "/site/", minify=True)
+
+        with open(self.dest_path, "r") as f:
+            html = f.read()
+        self.assertEqual(html, '<html><link href=/site/index.css /><body><div><h1>Test Title</h1>'
+                               '<p><img src=/site/logo.png alt="Two words"> and more</p>'
+                               '<pre><code>keep  this</code></pre></div></body></html>')
+
     def test_generate_page_nested_directories(self):
         # Create a nested destination path
         nested_dest = os.path.join(self.temp_dir, "nested", "output.html")
@@ -105,6 +143,21 @@ class TestGeneratePage(unittest.TestCase):
         with self.assertRaises(ValueError):
             generate_page(self.markdown_path, self.template_path, self.dest_path)
 
+    def test_generate_page_render_error_keeps_previous_output(self):
+        generate_page(self.markdown_path, self.template_path, self.dest_path)
+        with open(self.dest_path, "r") as f:
+            previous = f.read()
+
+        # An empty link text renders an empty leaf, which fails part way through the page
+        with open(self.markdown_path, "w") as f:
+            f.write("# Test Title\n\nA [](/empty) link")
+        with self.assertRaises(ValueError):
+            generate_page(self.markdown_path, self.template_path, self.dest_path)
+
+        with open(self.dest_path, "r") as f:
+            self.assertEqual(f.read(), previous)
+        self.assertFalse(os.path.exists(self.dest_path + ".tmp"))
+
     def test_generate_page_invalid_template(self):
         # Create invalid template (missing placeholders)
         with open(self.template_path, "w") as f:
@@ -116,5 +169,559 @@ class TestGeneratePage(unittest.TestCase):
         # Check if file was created
         self.assertTrue(os.path.exists(self.dest_path))
 
+class TestGeneratePagesRecursive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.temp_dir, "content")
+        os.makedirs(os.path.join(self.content_dir, "blog", "post"))
+
+        self.sources = {
+            "index.md": "# Home\n\n[Blog](/blog/post)",
+            os.path.join("blog", "post", "index.md"): "# Post\n\nSome **text**.",
+            os.path.join("blog", "notes.md"): "# Notes\n\n- one\n- two",
+        }
+        for rel_path, markdown in self.sources.items():
+            with open(os.path.join(self.content_dir, rel_path), "w") as f:
+                f.write(markdown)
+
+        self.template_path = os.path.join(self.temp_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def read_outputs(self, dest_dir):
+        outputs = {}
+        for _, dest_path in find_pages(self.content_dir, dest_dir):
+            with open(dest_path, "r") as f:
+                outputs[os.path.relpath(dest_path, dest_dir)] = f.read()
+        return outputs
+
+    def test_find_pages(self):
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        pages = find_pages(self.content_dir, dest_dir)
+        self.assertEqual(pages, sorted(pages))
+        self.assertIn(
+            (os.path.join(self.content_dir, "blog", "notes.md"), os.path.join(dest_dir, "blog", "notes.html")),
+            pages,
+        )
+        self.assertEqual(len(pages), 3)
+
+    def test_parallel_matches_serial(self):
+        serial_dir = os.path.join(self.temp_dir, "serial")
+        parallel_dir = os.path.join(self.temp_dir, "parallel")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, "/site/")
+        generate_pages_recursive(self.content_dir, self.template_path, parallel_dir, "/site/", jobs=2)
+        self.assertEqual(self.read_outputs(serial_dir), self.read_outputs(parallel_dir))
+        self.assertEqual(len(self.read_outputs(parallel_dir)), 3)
+
+    def test_minify_matches_across_modes(self):
+        serial_dir = os.path.join(self.temp_dir, "serial")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, "/site/", minify=True)
+        expected = self.read_outputs(serial_dir)
+        self.assertIn("<p>Some <b>text</b>.</p>", expected[os.path.join("blog", "post", "index.html")])
+
+        for name, kwargs in (("parallel", {"jobs": 2}), ("pipelined", {"pipeline": True}),
+                             ("memo", {"block_memo": BlockMemo(minify=True)})):
+            with self.subTest(name):
+                dest_dir = os.path.join(self.temp_dir, name)
+                generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/site/", minify=True, **kwargs)
+                self.assertEqual(self.read_outputs(dest_dir), expected)
+
+    def test_minify_change_rebuilds(self):
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        manifest = BuildManifest(os.path.join(self.temp_dir, "manifest.json"))
+        generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/", manifest)
+        with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate_page:
+            generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/", manifest, minify=True)
+        self.assertEqual(generate_page.call_count, 3)
+
+    def test_parallel_reports_errors(self):
+        with open(os.path.join(self.content_dir, "blog", "notes.md"), "w") as f:
+            f.write("No title here")
+
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        with self.assertLogs(level="ERROR") as logs:
+            with self.assertRaises(ValueError):
+                generate_pages_recursive(self.content_dir, self.template_path, dest_dir, jobs=2)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("notes.html", logs.output[0])
+
+        # The other pages are still generated
+        self.assertTrue(os.path.exists(os.path.join(dest_dir, "index.html")))
+
+    def test_parallel_failure_records_generated_pages(self):
+        with open(os.path.join(self.content_dir, "blog", "notes.md"), "w") as f:
+            f.write("No title here")
+
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        manifest = BuildManifest(os.path.join(self.temp_dir, "manifest.json"))
+        with self.assertLogs(level="ERROR"):
+            with self.assertRaises(ValueError):
+                generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/", manifest, jobs=2)
+        self.assertEqual(sorted(manifest.entries), [os.path.join(dest_dir, "blog", "post", "index.html"),
+                                                    os.path.join(dest_dir, "index.html")])
+
+    def test_report(self):
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        streamed_dir = os.path.join(self.temp_dir, "streamed")
+        manifest = BuildManifest(os.path.join(self.temp_dir, ".build", "manifest.json"))
+        report = BuildReport()
+        generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/site/", manifest, report=report)
+        generate_pages_recursive(self.content_dir, self.template_path, streamed_dir, "/site/")
+
+        # Timing the stages separately doesn't change the output
+        self.assertEqual(self.read_outputs(dest_dir), self.read_outputs(streamed_dir))
+        self.assertEqual(len(report.pages), 3)
+        for stats in report.pages:
+            self.assertEqual(list(stats.times), list(PAGE_STAGES))
+            self.assertGreater(stats.times["inline_parse"], 0)
+            self.assertGreater(stats.nodes, 1)
+            self.assertEqual(stats.output_bytes, os.path.getsize(stats.dest))
+        self.assertEqual(report.counters, {"manifest_misses": 3})
+
+        report = BuildReport()
+        generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/site/", manifest, report=report)
+        self.assertEqual(report.pages, [])
+        self.assertEqual(report.counters, {"manifest_hits": 3})
+
+    def test_document_store(self):
+        store = DocumentStore(os.path.join(self.temp_dir, ".build", "documents"))
+        stored_dir = os.path.join(self.temp_dir, "stored")
+        parsed_dir = os.path.join(self.temp_dir, "parsed")
+        generate_pages_recursive(self.content_dir, self.template_path, stored_dir, "/", document_store=store)
+        self.assertEqual(store.misses, 3)
+
+        # A base path change renders every page from the store without parsing
+        with mock.patch.object(main, "parse_document", wraps=main.parse_document) as parse_document:
+            generate_pages_recursive(self.content_dir, self.template_path, stored_dir, "/site/", document_store=store)
+            generate_pages_recursive(self.content_dir, self.template_path, stored_dir, "/site/", jobs=2,
+                                     document_store=store)
+        self.assertEqual(parse_document.call_count, 0)
+        self.assertEqual(store.hits, 3)
+
+        generate_pages_recursive(self.content_dir, self.template_path, parsed_dir, "/site/")
+        self.assertEqual(self.read_outputs(stored_dir), self.read_outputs(parsed_dir))
+
+    def test_block_memo_with_document_store(self):
+        store = DocumentStore(os.path.join(self.temp_dir, ".build", "documents"))
+        memo = BlockMemo()
+        memo_dir = os.path.join(self.temp_dir, "memo")
+        parsed_dir = os.path.join(self.temp_dir, "parsed")
+        generate_pages_recursive(self.content_dir, self.template_path, memo_dir, "/site/", document_store=store,
+                                 block_memo=memo)
+        generate_pages_recursive(self.content_dir, self.template_path, parsed_dir, "/site/")
+        self.assertEqual(self.read_outputs(memo_dir), self.read_outputs(parsed_dir))
+
+        generate_pages_recursive(self.content_dir, self.template_path, memo_dir, "/other/", document_store=store,
+                                 block_memo=memo)
+        generate_pages_recursive(self.content_dir, self.template_path, parsed_dir, "/other/")
+        self.assertEqual(self.read_outputs(memo_dir), self.read_outputs(parsed_dir))
+
+    def test_pipeline_matches_serial(self):
+        serial_dir = os.path.join(self.temp_dir, "serial")
+        pipeline_dir = os.path.join(self.temp_dir, "pipeline")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, "/site/")
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content_dir, self.template_path, pipeline_dir, "/site/", pipeline=True)
+        self.assertEqual(self.read_outputs(serial_dir), self.read_outputs(pipeline_dir))
+
+        # Pages are logged in order
+        generated = [line.split("Generated ")[1] for line in logs.output if "Generated " in line]
+        self.assertEqual(generated, [dest_path for _, dest_path in find_pages(self.content_dir, pipeline_dir)])
+
+    def test_pipeline_backpressure(self):
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        pages = find_pages(self.content_dir, dest_dir)
+        generate_pages_pipelined(pages, self.template_path, "/", readers=1, writers=1, depth=1)
+        self.assertEqual(len(self.read_outputs(dest_dir)), 3)
+
+    def test_pipeline_errors(self):
+        with open(os.path.join(self.content_dir, "index.md"), "w") as f:
+            f.write("No title here")
+
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        with self.assertRaises(ValueError):
+            generate_pages_recursive(self.content_dir, self.template_path, dest_dir, pipeline=True)
+        # Pages before the failing one are still written
+        self.assertTrue(os.path.exists(os.path.join(dest_dir, "blog", "notes.html")))
+        self.assertTrue(os.path.exists(os.path.join(dest_dir, "blog", "post", "index.html")))
+        self.assertEqual(sorted(os.listdir(dest_dir)), ["blog"])
+
+    def test_drafts_skipped_before_reading(self):
+        draft_path = os.path.join(self.content_dir, "blog", "draft.md")
+        with open(draft_path, "w") as f:
+            f.write("---\ndraft: true\n---\n# Draft")
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        with mock.patch.object(main, "_read_markdown", wraps=main._read_markdown) as read_markdown:
+            generate_pages_recursive(self.content_dir, self.template_path, dest_dir)
+        self.assertNotIn(draft_path, [call.args[0] for call in read_markdown.call_args_list])
+        self.assertEqual(read_markdown.call_count, 3)
+        self.assertFalse(os.path.exists(os.path.join(dest_dir, "blog", "draft.html")))
+
+        generate_pages_recursive(self.content_dir, self.template_path, dest_dir, drafts=True)
+        self.assertTrue(os.path.exists(os.path.join(dest_dir, "blog", "draft.html")))
+
+    def test_front_matter_title_and_template(self):
+        with open(os.path.join(self.temp_dir, "post.html"), "w") as f:
+            f.write("<title>Post: {{ Title }}</title>{{ Content }}")
+        with open(os.path.join(self.content_dir, "blog", "notes.md"), "w") as f:
+            f.write("---\ntitle: Field Notes\ntemplate: post.html\n---\n- one")
+        dest_dir = os.path.join(self.temp_dir, "docs")
+        for options in ({}, {"pipeline": True}):
+            with self.subTest(**options):
+                manifest = BuildManifest(os.path.join(self.temp_dir, "manifest.json"))
+                generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/", manifest, **options)
+                with open(os.path.join(dest_dir, "blog", "notes.html"), "r") as f:
+                    self.assertEqual(f.read(), "<title>Post: Field Notes</title><div><ul><li>one</li></ul></div>")
+                notes_path = os.path.join(dest_dir, "blog", "notes.html")
+                self.assertEqual(manifest.metadata[notes_path]["title"], "Field Notes")
+
+                # Editing the page's own template makes it stale
+                inputs = manifest.entries[notes_path]
+                self.assertEqual(inputs["template_hash"], manifest.template_hash(os.path.join(self.temp_dir, "post.html")))
+
+    def test_metadata_recorded_in_every_mode(self):
+        for name, options in (("serial", {}), ("parallel", {"jobs": 2}), ("pipelined", {"pipeline": True})):
+            with self.subTest(name):
+                dest_dir = os.path.join(self.temp_dir, name)
+                manifest = BuildManifest(os.path.join(self.temp_dir, "manifest.json"))
+                generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/", manifest, **options)
+                titles = {os.path.relpath(path, dest_dir): meta["title"] for path, meta in manifest.metadata.items()}
+                self.assertEqual(titles, {"index.html": "Home", os.path.join("blog", "notes.html"): "Notes",
+                                          os.path.join("blog", "post", "index.html"): "Post"})
+                self.assertEqual(manifest.metadata[os.path.join(dest_dir, "blog", "post", "index.html")]["summary"],
+                                 "Some text.")
+
+    def test_parallel_report(self):
+        report = BuildReport()
+        generate_pages_recursive(self.content_dir, self.template_path, os.path.join(self.temp_dir, "docs"),
+                                 jobs=2, report=report)
+        self.assertEqual([stats.dest for stats in report.pages],
+                         [dest_path for _, dest_path in find_pages(self.content_dir, os.path.join(self.temp_dir, "docs"))])
+        self.assertTrue(all(stats.nodes > 1 for stats in report.pages))
+
+class TestGenerateSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.temp_dir, "content")
+        self.dest_dir = os.path.join(self.temp_dir, "docs")
+        self.template_path = os.path.join(self.temp_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.manifest = BuildManifest(os.path.join(self.temp_dir, "manifest.json"))
+        self.write_markdown("index.md", "# Home")
+        for i in range(3):
+            self.write_post(i)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_markdown(self, rel_path, markdown):
+        path = os.path.join(self.content_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+
+    def write_post(self, i, text=None):
+        self.write_markdown(os.path.join("blog", f"post-{i}", "index.md"),
+                            f"---\ndate: 1970-01-{i + 2:02d}\n---\n# Post {i}\n\n{text or f'About {i}.'}")
+
+    def build(self, site_url=None, manifest=None, dest_dir=None):
+        manifest = manifest or self.manifest
+        dest_dir = dest_dir or self.dest_dir
+        generate_pages_recursive(self.content_dir, self.template_path, dest_dir, "/", manifest)
+        dest_paths = [dest_path for _, dest_path in find_pages(self.content_dir, dest_dir)]
+        with mock.patch.object(main, "parse_document", wraps=main.parse_document) as parse_document:
+            with mock.patch.object(main, "write_page", wraps=main.write_page) as write_page:
+                generate_site_index(manifest, dest_paths, self.template_path, dest_dir, "/", site_url, per_page=2)
+        self.assertEqual(parse_document.call_count, 0)
+        return [os.path.relpath(call.args[0], dest_dir) for call in write_page.call_args_list]
+
+    def read(self, *parts, dest_dir=None):
+        with open(os.path.join(dest_dir or self.dest_dir, *parts), "r") as f:
+            return f.read()
+
+    def test_listings(self):
+        written = self.build()
+        self.assertEqual(written, [os.path.join("blog", "page", "1", "index.html"), os.path.join("blog", "index.html")])
+        newest = self.read("blog", "index.html")
+        self.assertTrue(newest.startswith("<title>Blog</title><div><h1>Blog</h1><ul><li><a href=/blog/post-2/>"))
+        self.assertIn("<p>About 2.</p>", newest)
+        self.assertIn("<a href=/blog/page/1/>Older posts</a>", newest)
+        self.assertIn("Post 0", self.read("blog", "page", "1", "index.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "sitemap.xml")))
+
+    def test_unchanged_build_writes_nothing(self):
+        self.build("https://example.com")
+        self.assertEqual(self.build("https://example.com"), [])
+
+    def test_new_post_only_rewrites_newest_listing(self):
+        self.build()
+        self.write_post(3)
+        self.assertEqual(self.build(), [os.path.join("blog", "index.html")])
+        self.assertIn("Post 3", self.read("blog", "index.html"))
+
+    def test_edited_post_keeps_its_place(self):
+        self.build()
+        self.write_post(0, "Edited.")
+        self.assertEqual(self.build(), [os.path.join("blog", "page", "1", "index.html")])
+
+    def test_clean_and_incremental_builds_match(self):
+        self.write_markdown(os.path.join("blog", "undated", "index.md"), "# Undated\n\nNo date.")
+        self.build("https://example.com")
+        # A fresh checkout gives every source a new mtime
+        for from_path, _ in find_pages(self.content_dir, self.dest_dir):
+            os.utime(from_path, (1_000_000_000, 1_000_000_000))
+        self.assertEqual(self.build("https://example.com"), [])
+
+        clean_dir = os.path.join(self.temp_dir, "clean")
+        self.build("https://example.com", BuildManifest(os.path.join(self.temp_dir, "clean.json")), clean_dir)
+        for name in ("sitemap.xml", "atom.xml"):
+            with self.subTest(name):
+                self.assertEqual(self.read(name, dest_dir=clean_dir), self.read(name))
+        self.assertNotIn("undated", self.read("atom.xml"))
+        self.assertIn("<loc>https://example.com/blog/undated/</loc></url>", self.read("sitemap.xml"))
+
+    def test_page_becoming_draft_is_dropped(self):
+        search_index = SearchIndex()
+
+        def build():
+            generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, "/", self.manifest,
+                                     search_index=search_index)
+            pages = find_pages(self.content_dir, self.dest_dir)
+            generate_site_index(self.manifest, [dest_path for _, dest_path in pages], self.template_path,
+                                self.dest_dir, "/", "https://example.com", per_page=2)
+            update_search_index(search_index, self.manifest, pages, self.template_path, self.dest_dir)
+
+        build()
+        self.write_markdown(os.path.join("blog", "post-2", "index.md"), "---\ndraft: true\n---\n# Post 2")
+        build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "blog", "post-2")))
+        for parts in [("blog", "index.html"), ("sitemap.xml",), ("atom.xml",), (SEARCH_DIR, "docs.json")]:
+            self.assertNotIn("post-2", self.read(*parts))
+
+    def test_listings_without_posts_are_removed(self):
+        self.build()
+        shutil.rmtree(os.path.join(self.content_dir, "blog", "post-2"))
+        shutil.rmtree(os.path.join(self.content_dir, "blog", "post-1"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "blog", "page")))
+        self.assertIn("Post 0", self.read("blog", "index.html"))
+
+    def test_sitemap_and_feed(self):
+        written = self.build("https://example.com")
+        self.assertEqual(written[-2:], ["sitemap.xml", "atom.xml"])
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<loc>https://example.com/blog/post-0/</loc><lastmod>1970-01-02</lastmod>", sitemap)
+        self.assertIn("<loc>https://example.com/</loc></url>", sitemap)
+        self.assertIn("<loc>https://example.com/blog/page/1/</loc>", sitemap)
+        feed = self.read("atom.xml")
+        self.assertIn("<title>Home</title>", feed)
+        self.assertEqual(feed.count("<entry>"), 3)
+
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "sitemap.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "atom.xml")))
+
+class TestUpdateSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.temp_dir, "content")
+        self.dest_dir = os.path.join(self.temp_dir, "docs")
+        self.template_path = os.path.join(self.temp_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.manifest = BuildManifest(os.path.join(self.temp_dir, "manifest.json"))
+        self.index = SearchIndex()
+        self.write_markdown("index.md", "# Home\n\nWelcome to the shire.")
+        self.write_markdown(os.path.join("blog", "tom", "index.md"), "# Tom\n\nTom sang in the forest.")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_markdown(self, rel_path, markdown):
+        path = os.path.join(self.content_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+
+    def build(self, index_pages=True):
+        generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, "/site/", self.manifest,
+                                 search_index=self.index if index_pages else None)
+        pages = find_pages(self.content_dir, self.dest_dir)
+        with mock.patch.object(main, "parse_document", wraps=main.parse_document) as parse_document:
+            with mock.patch.object(main, "write_page", wraps=main.write_page) as write_page:
+                update_search_index(self.index, self.manifest, pages, self.template_path, self.dest_dir, "/site/")
+        written = [os.path.relpath(call.args[0], os.path.join(self.dest_dir, SEARCH_DIR))
+                   for call in write_page.call_args_list]
+        return written, parse_document.call_count
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest_dir, SEARCH_DIR, *parts), "r") as f:
+            return f.read()
+
+    def test_pages_are_indexed_while_generated(self):
+        written, parsed = self.build()
+        self.assertEqual(parsed, 0)
+        self.assertIn(os.path.join(SHARDS_DIR, "fo.json"), written)
+        self.assertIn("index.html", written)
+        self.assertEqual(self.read(SHARDS_DIR, "fo.json"), '{"forest":[0,1]}')
+        self.assertIn('["/site/blog/tom/","Tom"]', self.read("docs.json"))
+        self.assertIn('"/site/search/"', self.read("index.html"))
+
+    def test_unchanged_build_writes_nothing(self):
+        self.build()
+        self.assertEqual(self.build(), ([], 0))
+
+    def test_edit_rewrites_only_changed_shards(self):
+        self.build()
+        self.write_markdown(os.path.join("blog", "tom", "index.md"), "# Tom\n\nTom sang in the meadow.")
+        written, _ = self.build()
+        self.assertEqual(written, [os.path.join(SHARDS_DIR, "me.json")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, SEARCH_DIR, SHARDS_DIR, "fo.json")))
+
+    def test_deleted_output_is_rewritten(self):
+        self.build()
+        shutil.rmtree(self.dest_dir)
+        written, parsed = self.build()
+        self.assertEqual(parsed, 0)
+        self.assertIn("docs.json", written)
+        self.assertEqual(self.read(SHARDS_DIR, "fo.json"), '{"forest":[0,1]}')
+
+    def test_pages_built_without_the_index_are_caught_up(self):
+        self.build(index_pages=False)
+        written, parsed = self.build(index_pages=False)
+        self.assertEqual(parsed, 0)
+        self.assertEqual(written, [])
+        self.assertEqual(sorted(self.index.pages), ["/", "/blog/tom/"])
+
+        self.index = SearchIndex()
+        written, parsed = self.build(index_pages=False)
+        self.assertEqual(parsed, 2)
+        self.assertIn("docs.json", written)
+
+    def test_removed_page_is_dropped(self):
+        self.build()
+        shutil.rmtree(os.path.join(self.content_dir, "blog"))
+        self.manifest.prune(self.dest_dir)
+        self.build()
+        self.assertEqual(list(self.index.pages), ["/"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, SEARCH_DIR, SHARDS_DIR, "fo.json")))
+
+class TestRebuildChanged(unittest.TestCase):
+    def setUp(self):
+        self.previous_dir = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+
+        os.makedirs(os.path.join("content", "blog"))
+        os.makedirs("static")
+        for path, markdown in [("index.md", "# Home"), (os.path.join("blog", "index.md"), "# Blog")]:
+            with open(os.path.join("content", path), "w") as f:
+                f.write(markdown)
+        with open("template.html", "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+        self.manifest = BuildManifest(os.path.join(".build", "manifest.json"))
+        self.document_cache = {}
+        generate_pages_recursive("content", "template.html", "docs", "/", self.manifest,
+                                 document_cache=self.document_cache)
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.temp_dir)
+
+    def rebuild(self, changed, document_store=None):
+        with mock.patch.object(main, "parse_document", wraps=main.parse_document) as parse_document:
+            with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate_page:
+                rebuild_changed(changed, "/", self.manifest, self.document_cache, document_store=document_store)
+        return [call.args[0] for call in generate_page.call_args_list], parse_document.call_count
+
+    def test_markdown_change_rebuilds_only_that_page(self):
+        changed = os.path.join("content", "blog", "index.md")
+        with open(changed, "w") as f:
+            f.write("# Blog\n\nFirst post")
+        generated, parsed = self.rebuild({changed})
+        self.assertEqual(generated, [changed])
+        self.assertEqual(parsed, 1)
+        with open(os.path.join("docs", "blog", "index.html"), "r") as f:
+            self.assertIn("First post", f.read())
+
+    def test_template_change_reuses_parses(self):
+        with open("template.html", "w") as f:
+            f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        generated, parsed = self.rebuild({"template.html"})
+        self.assertEqual(len(generated), 2)
+        self.assertEqual(parsed, 0)
+        with open(os.path.join("docs", "index.html"), "r") as f:
+            self.assertEqual(f.read(), "<title>Home</title><main><div><h1>Home</h1></div></main>")
+
+    def test_template_change_reuses_stored_parses(self):
+        # Pages the first build skipped or parsed in workers are only in the document store
+        document_store = DocumentStore(os.path.join(".build", "documents"))
+        generate_pages_recursive("content", "template.html", "docs", "/", document_store=document_store)
+        self.document_cache.clear()
+        with open("template.html", "w") as f:
+            f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        generated, parsed = self.rebuild({"template.html"}, document_store)
+        self.assertEqual(len(generated), 2)
+        self.assertEqual(parsed, 0)
+
+    def test_template_change_with_deleted_markdown(self):
+        deleted = os.path.join("content", "blog", "index.md")
+        os.remove(deleted)
+        with open("template.html", "w") as f:
+            f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        generated, _ = self.rebuild({deleted, "template.html"})
+        self.assertEqual(generated, [os.path.join("content", "index.md")])
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog")))
+        self.assertNotIn(os.path.join("docs", "blog", "index.html"), self.manifest.entries)
+
+    def test_page_template_change_rebuilds_its_pages(self):
+        with open("post.html", "w") as f:
+            f.write("<article>{{ Content }}</article>")
+        changed = os.path.join("content", "blog", "index.md")
+        with open(changed, "w") as f:
+            f.write("---\ntemplate: post.html\n---\n# Blog")
+        self.rebuild({changed})
+        with open("post.html", "w") as f:
+            f.write("<main>{{ Content }}</main>")
+        generated, parsed = self.rebuild({"post.html"})
+        self.assertEqual((generated, parsed), ([changed], 0))
+        with open(os.path.join("docs", "blog", "index.html"), "r") as f:
+            self.assertEqual(f.read(), "<main><div><h1>Blog</h1></div></main>")
+
+    def test_watched_templates(self):
+        self.assertEqual(main.watched_templates(), ["template.html"])
+        with open(os.path.join("content", "index.md"), "w") as f:
+            f.write("---\ntemplate: home.html\n---\n# Home")
+        self.assertEqual(main.watched_templates(), ["home.html", "template.html"])
+
+    def test_deleted_markdown_removes_page(self):
+        deleted = os.path.join("content", "blog", "index.md")
+        os.remove(deleted)
+        generated, _ = self.rebuild({deleted})
+        self.assertEqual(generated, [])
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog", "index.html")))
+        self.assertNotIn(os.path.join("docs", "blog", "index.html"), self.manifest.entries)
+
+    def test_page_becoming_draft_is_removed(self):
+        changed = os.path.join("content", "blog", "index.md")
+        with open(changed, "w") as f:
+            f.write("---\ndraft: yes\n---\n# Blog")
+        generated, parsed = self.rebuild({changed})
+        self.assertEqual((generated, parsed), ([], 0))
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog", "index.html")))
+        self.assertNotIn(os.path.join("docs", "blog", "index.html"), self.manifest.metadata)
+
+    def test_static_change_syncs(self):
+        with open(os.path.join("static", "index.css"), "w") as f:
+            f.write("body {}")
+        generated, _ = self.rebuild({os.path.join("static", "index.css")})
+        self.assertEqual(generated, [])
+        self.assertTrue(os.path.exists(os.path.join("docs", "index.css")))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,171 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from unittest import mock
+import main
+import manifest as manifest_module
+from manifest import BuildManifest
+from main import generate_pages_recursive
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.temp_dir, ".build", "manifest.json")
+
+        self.source_path = os.path.join(self.temp_dir, "page.md")
+        with open(self.source_path, "w") as f:
+            f.write("# Page")
+
+        self.template_path = os.path.join(self.temp_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+        self.dest_path = os.path.join(self.temp_dir, "page.html")
+        with open(self.dest_path, "w") as f:
+            f.write("<h1>Page</h1>")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_missing(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.entries, {})
+
+    def test_load_corrupt(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(BuildManifest.load(self.manifest_path).entries, {})
+
+    def test_load_other_format(self):
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, "w") as f:
+            json.dump({"format": -1, "pages": {"x": {}}}, f)
+        self.assertEqual(BuildManifest.load(self.manifest_path).entries, {})
+
+    def test_save_and_load(self):
+        manifest = BuildManifest(self.manifest_path)
+        inputs = manifest.page_inputs(self.source_path, self.template_path, "/")
+        manifest.record(self.dest_path, inputs)
+        manifest.save()
+
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertTrue(loaded.is_fresh(self.dest_path, inputs))
+
+    def test_metadata_saved_and_removed(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.dest_path, manifest.page_inputs(self.source_path, self.template_path, "/"),
+                        {"title": "Page"})
+        manifest.save()
+
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.metadata, {self.dest_path: {"title": "Page"}})
+        loaded.remove(self.dest_path)
+        self.assertEqual(loaded.metadata, {})
+
+    def test_compressed_saved(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.compressed = {"page.html": {"size": 13, "mtime_ns": 1, "gz_size": None}}
+        manifest.save()
+        self.assertEqual(BuildManifest.load(self.manifest_path).compressed, manifest.compressed)
+
+    def test_source_change_is_stale(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.dest_path, manifest.page_inputs(self.source_path, self.template_path, "/"))
+
+        with open(self.source_path, "w") as f:
+            f.write("# Changed")
+        inputs = manifest.page_inputs(self.source_path, self.template_path, "/")
+        self.assertFalse(manifest.is_fresh(self.dest_path, inputs))
+
+    def test_base_path_change_is_stale(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.dest_path, manifest.page_inputs(self.source_path, self.template_path, "/"))
+        inputs = manifest.page_inputs(self.source_path, self.template_path, "/site/")
+        self.assertFalse(manifest.is_fresh(self.dest_path, inputs))
+
+    def test_generator_version_change_is_stale(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record(self.dest_path, manifest.page_inputs(self.source_path, self.template_path, "/"))
+        with mock.patch.object(manifest_module, "GENERATOR_VERSION", "next"):
+            inputs = manifest.page_inputs(self.source_path, self.template_path, "/")
+        self.assertFalse(manifest.is_fresh(self.dest_path, inputs))
+
+    def test_missing_output_is_stale(self):
+        manifest = BuildManifest(self.manifest_path)
+        inputs = manifest.page_inputs(self.source_path, self.template_path, "/")
+        manifest.record(self.dest_path, inputs)
+        os.remove(self.dest_path)
+        self.assertFalse(manifest.is_fresh(self.dest_path, inputs))
+
+    def test_prune_removes_unseen_outputs(self):
+        old = BuildManifest(self.manifest_path)
+        old.record(self.dest_path, old.page_inputs(self.source_path, self.template_path, "/"))
+        old.save()
+
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.prune(), [self.dest_path])
+        self.assertFalse(os.path.exists(self.dest_path))
+        self.assertEqual(manifest.entries, {})
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.temp_dir, "content")
+        self.dest_dir = os.path.join(self.temp_dir, "docs")
+        self.manifest_path = os.path.join(self.temp_dir, "manifest.json")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+
+        with open(os.path.join(self.content_dir, "index.md"), "w") as f:
+            f.write("# Home\n\nWelcome.")
+        with open(os.path.join(self.content_dir, "blog", "index.md"), "w") as f:
+            f.write("# Blog\n\nPosts.")
+
+        self.template_path = os.path.join(self.temp_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate_page:
+            generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, "/", manifest)
+        manifest.prune(self.dest_dir)
+        manifest.save()
+        return sorted(call.args[0] for call in generate_page.call_args_list)
+
+    def test_only_changed_pages_are_rebuilt(self):
+        self.assertEqual(len(self.build()), 2)
+        self.assertEqual(self.build(), [])
+
+        changed = os.path.join(self.content_dir, "blog", "index.md")
+        with open(changed, "w") as f:
+            f.write("# Blog\n\nNew posts.")
+        self.assertEqual(self.build(), [changed])
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content_dir, "blog", "index.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "index.html")))
+
+    def test_prune_stops_at_output_dir(self):
+        self.build()
+        shutil.rmtree(self.content_dir)
+        os.makedirs(self.content_dir)
+        self.build()
+        self.assertEqual(os.listdir(self.dest_dir), [])
+
+if __name__ == "__main__":
+    unittest.main()
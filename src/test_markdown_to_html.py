@@ -1,3 +1,4 @@
+import io
 import unittest
 from markdown_to_html import (
     text_node_to_html_node,
@@ -25,25 +26,29 @@ class TestMarkdownToHTML(unittest.TestCase):
         node = TextNode("Bold text", TextType.BOLD)
         html = text_node_to_html_node(node)
         self.assertEqual(html.tag, "b")
-        self.assertEqual(html.children[0].value, "Bold text")
+        self.assertEqual(html.value, "Bold text")
+        self.assertIsNone(html.children)
 
     def test_text_node_to_html_node_italic(self):
         node = TextNode("Italic text", TextType.ITALIC)
         html = text_node_to_html_node(node)
         self.assertEqual(html.tag, "i")
-        self.assertEqual(html.children[0].value, "Italic text")
+        self.assertEqual(html.value, "Italic text")
+        self.assertIsNone(html.children)
 
     def test_text_node_to_html_node_code(self):
         node = TextNode("Code text", TextType.CODE)
         html = text_node_to_html_node(node)
         self.assertEqual(html.tag, "code")
-        self.assertEqual(html.children[0].value, "Code text")
+        self.assertEqual(html.value, "Code text")
+        self.assertIsNone(html.children)
 
     def test_text_node_to_html_node_link(self):
         node = TextNode("Link text", TextType.LINK, "https://example.com")
         html = text_node_to_html_node(node)
         self.assertEqual(html.tag, "a")
-        self.assertEqual(html.children[0].value, "Link text")
+        self.assertEqual(html.value, "Link text")
+        self.assertIsNone(html.children)
         self.assertEqual(html.props["href"], "https://example.com")
 
     def test_text_node_to_html_node_image(self):
@@ -53,6 +58,14 @@ class TestMarkdownToHTML(unittest.TestCase):
         self.assertEqual(html.props["src"], "image.png")
         self.assertEqual(html.props["alt"], "Alt text")
 
+    def test_text_node_to_html_node_base_path(self):
+        link = text_node_to_html_node(TextNode("Blog", TextType.LINK, "/blog"), "/site/")
+        self.assertEqual(link.props["href"], "/site/blog")
+        image = text_node_to_html_node(TextNode("Alt", TextType.IMAGE, "/img.png"), "/site/")
+        self.assertEqual(image.props["src"], "/site/img.png")
+        external = text_node_to_html_node(TextNode("Boot.dev", TextType.LINK, "https://www.boot.dev"), "/site/")
+        self.assertEqual(external.props["href"], "https://www.boot.dev")
+
     def test_text_to_children_simple(self):
         children = text_to_children("Hello, world!")
         self.assertEqual(len(children), 1)
@@ -145,5 +158,23 @@ def hello():
         self.assertIn("ul", tags)
         self.assertIn("ol", tags)
 
+    def test_markdown_to_html_node_fenced_code_with_blank_lines(self):
+        markdown = "```\nfirst()\n\nsecond()\n```\n\nAfter"
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(html, "<div><pre><code>first()\n\nsecond()</code></pre><p>After</p></div>")
+
+    def test_markdown_to_html_node_from_file(self):
+        markdown = "# Heading\n\nSome **bold** text\n"
+        self.assertEqual(
+            markdown_to_html_node(io.StringIO(markdown)).to_html(),
+            markdown_to_html_node(markdown).to_html(),
+        )
+
+    def test_markdown_to_html_node_base_path(self):
+        markdown = "[Contact](/contact)\n\n```\n<a href=\"/raw\">literal</a>\n```"
+        html = markdown_to_html_node(markdown, "/site/").to_html()
+        self.assertIn("<a href=/site/contact>Contact</a>", html)
+        self.assertIn('<a href="/raw">literal</a>', html)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import unittest
+from minify import collapse_whitespace, minify_markup, quote_attribute
+
+class TestQuoteAttribute(unittest.TestCase):
+    def test_safe_values_stay_unquoted(self):
+        self.assertEqual(quote_attribute("/images/a.png"), "/images/a.png")
+        self.assertEqual(quote_attribute("https://example.com/?a=1"), '"https://example.com/?a=1"')
+
+    def test_unsafe_values_are_quoted(self):
+        self.assertEqual(quote_attribute("Glorfindel image"), '"Glorfindel image"')
+        self.assertEqual(quote_attribute('say "hi"'), '"say &quot;hi&quot;"')
+        self.assertEqual(quote_attribute(""), '""')
+
+class TestCollapseWhitespace(unittest.TestCase):
+    def test_collapse(self):
+        self.assertEqual(collapse_whitespace("a \n\t b  c"), "a b c")
+        self.assertEqual(collapse_whitespace(" plain "), " plain ")
+
+    def test_no_break_space_is_kept(self):
+        self.assertEqual(collapse_whitespace("a\xa0\xa0b"), "a\xa0\xa0b")
+
+class TestMinifyMarkup(unittest.TestCase):
+    def test_template(self):
+        source = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>{{ Title }}</title>
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+        self.assertEqual(minify_markup(source),
+                         '<!doctype html><html><head><meta charset=utf-8 />'
+                         '<meta name=viewport content="width=device-width, initial-scale=1" />'
+                         '<title>{{ Title }}</title></head><body><article>{{ Content }}</article></body></html>')
+
+    def test_inline_whitespace_becomes_one_space(self):
+        self.assertEqual(minify_markup("<p>\n  Hello  <b>there</b>\n  <i>you</i>\n</p>"),
+                         "<p>Hello <b>there</b> <i>you</i></p>")
+
+    def test_preserved_elements_are_kept(self):
+        source = '<div>\n<pre class="x">\n  keep   this\n</pre>\n<script>\nlet a = "b"\nf()\n</script>\n</div>'
+        self.assertEqual(minify_markup(source),
+                         '<div><pre class=x>\n  keep   this\n</pre><script>\nlet a = "b"\nf()\n</script></div>')
+
+    def test_quotes_kept_where_needed(self):
+        self.assertEqual(minify_markup('<br class="a"/><a href="x=\'y\'" title="{{T}}" id=\'\'>z</a>'),
+                         '<br class="a"/><a href="x=\'y\'" title="{{T}}" id=\'\'>z</a>')
+
+    def test_comments_are_kept(self):
+        self.assertEqual(minify_markup("<p>a</p>  <!-- note -->  <i>b</i>"), "<p>a</p><!-- note --> <i>b</i>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import gzip
+import tempfile
+import shutil
+from unittest import mock
+import precompress
+from precompress import precompress_tree, remove_precompressed
+
+PAGE = "<html><body>" + "<p>Tom Bombadil is a merry fellow.</p>\n" * 50 + "</body></html>"
+
+class TestPrecompressTree(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dest_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(os.path.join(self.dest_dir, "blog", "tom"))
+        self.write("index.html", PAGE)
+        self.write(os.path.join("blog", "tom", "index.html"), PAGE.replace("merry", "jolly"))
+        self.write("index.css", "body { color: black; }")
+        self.write("logo.png", "x" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, rel_path, content):
+        with open(os.path.join(self.dest_dir, rel_path), "w") as f:
+            f.write(content)
+
+    def exists(self, rel_path):
+        return os.path.exists(os.path.join(self.dest_dir, rel_path))
+
+    def compress(self, previous=None):
+        with mock.patch.object(precompress, "compress_file", wraps=precompress.compress_file) as compress_file:
+            record = precompress_tree(self.dest_dir, previous, workers=2)
+        compressed = sorted(os.path.relpath(call.args[0], self.dest_dir) for call in compress_file.call_args_list)
+        return record, compressed
+
+    def test_first_run_compresses_text_files(self):
+        record, compressed = self.compress()
+        self.assertEqual(compressed, [os.path.join("blog", "tom", "index.html"), "index.css", "index.html"])
+        self.assertEqual(sorted(record), compressed)
+        with gzip.open(os.path.join(self.dest_dir, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertEqual(record["index.html"]["gz_size"], os.path.getsize(os.path.join(self.dest_dir, "index.html.gz")))
+
+    def test_small_and_incompressible_files_are_skipped(self):
+        record, _ = self.compress()
+        self.assertFalse(self.exists("logo.png.gz"))
+        self.assertFalse(self.exists("index.css.gz"))
+        self.assertIsNone(record["index.css"]["gz_size"])
+
+    def test_unchanged_files_are_skipped(self):
+        record, _ = self.compress()
+        _, compressed = self.compress(record)
+        self.assertEqual(compressed, [])
+
+    def test_changed_file_is_compressed(self):
+        record, _ = self.compress()
+        self.write("index.html", PAGE + "<!-- changed -->")
+        _, compressed = self.compress(record)
+        self.assertEqual(compressed, ["index.html"])
+
+    def test_missing_gz_is_rewritten(self):
+        record, _ = self.compress()
+        os.remove(os.path.join(self.dest_dir, "index.html.gz"))
+        _, compressed = self.compress(record)
+        self.assertEqual(compressed, ["index.html"])
+        self.assertTrue(self.exists("index.html.gz"))
+
+    def test_file_that_stops_compressing_loses_its_gz(self):
+        record, _ = self.compress()
+        self.write("index.html", "<p>short</p>")
+        record, _ = self.compress(record)
+        self.assertFalse(self.exists("index.html.gz"))
+        self.assertIsNone(record["index.html"]["gz_size"])
+
+    def test_deleted_file_loses_its_gz(self):
+        record, _ = self.compress()
+        os.remove(os.path.join(self.dest_dir, "blog", "tom", "index.html"))
+        record, _ = self.compress(record)
+        self.assertNotIn(os.path.join("blog", "tom", "index.html"), record)
+        self.assertFalse(self.exists("blog"))
+
+    def test_remove_precompressed(self):
+        record, _ = self.compress()
+        self.assertEqual(remove_precompressed(self.dest_dir, record), 2)
+        self.assertFalse(self.exists("index.html.gz"))
+        self.assertTrue(self.exists("index.html"))
+
+if __name__ == "__main__":
+    unittest.main()
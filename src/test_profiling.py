@@ -0,0 +1,64 @@
+import unittest
+import os
+import tempfile
+import shutil
+import pstats
+from profiling import BuildProfiler
+from main import generate_pages_recursive
+
+class TestBuildProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_keeps_top_pages(self):
+        profiler = BuildProfiler(top=2)
+        for size in (1, 300, 20, 5000):
+            self.assertEqual(profiler.run(f"page-{size}.html", lambda n: len(["x" * 100 for _ in range(n)]), size),
+                             size)
+        self.assertEqual(profiler.pages, 4)
+        self.assertEqual([page.dest for page in profiler.hungriest_pages()], ["page-5000.html", "page-300.html"])
+        self.assertEqual(len(profiler.slowest_pages()), 2)
+
+    def test_errors_propagate(self):
+        def fail():
+            raise ValueError("No h1 heading found in markdown")
+
+        profiler = BuildProfiler()
+        with self.assertRaises(ValueError):
+            profiler.run("page.html", fail)
+        self.assertEqual(profiler.pages, 0)
+
+    def test_write(self):
+        content_dir = os.path.join(self.temp_dir, "content")
+        os.makedirs(os.path.join(content_dir, "blog"))
+        for rel_path, markdown in (("index.md", "# Home"), (os.path.join("blog", "index.md"), "# Blog\n\n- a\n- b")):
+            with open(os.path.join(content_dir, rel_path), "w") as f:
+                f.write(markdown)
+        template_path = os.path.join(self.temp_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write("{{ Content }}")
+
+        profiler = BuildProfiler(top=1)
+        generate_pages_recursive(content_dir, template_path, os.path.join(self.temp_dir, "docs"), jobs=2,
+                                 profiler=profiler)
+        self.assertEqual(profiler.pages, 2)
+
+        profile_dir = os.path.join(self.temp_dir, "profile")
+        written = profiler.write(profile_dir)
+        self.assertEqual(len(written), 5)
+        self.assertEqual(sorted(os.listdir(profile_dir)), ["build.pstats", "build.txt", "memory", "slowest"])
+        self.assertEqual(len(os.listdir(os.path.join(profile_dir, "slowest"))), 2)
+        self.assertEqual(len(os.listdir(os.path.join(profile_dir, "memory"))), 1)
+        stats = pstats.Stats(os.path.join(profile_dir, "build.pstats"))
+        self.assertTrue(any(name == "generate_page" for _, _, name in stats.stats))
+        with open(os.path.join(profile_dir, "build.txt"), "r") as f:
+            self.assertIn("Profiled 2 page(s)", f.read())
+
+    def test_write_nothing_profiled(self):
+        self.assertEqual(BuildProfiler().write(os.path.join(self.temp_dir, "profile")), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from unittest import mock
+import search_index as search_index_module
+from search_index import SHARDS_DIR, SearchIndex, page_terms, search_page, shard_name, tokenize
+from document import parse_document
+
+class TestTokenize(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("The Hobbit, a 1937 novel: Bilbo's tale"),
+                         ["the", "hobbit", "1937", "novel", "bilbo", "tale"])
+
+    def test_long_tokens_are_dropped(self):
+        self.assertEqual(tokenize("x" * 41 + " kept"), ["kept"])
+
+    def test_page_terms(self):
+        root = parse_document("# Tom Bombadil\n\nTom sang **loudly** in the [forest](/forest).\n\n```\ntom()\n```").root
+        terms = page_terms(root)
+        self.assertEqual(terms["tom"], 3)
+        self.assertEqual(terms["loudly"], 1)
+        self.assertEqual(terms["forest"], 1)
+        self.assertNotIn("a", terms)
+        self.assertNotIn("href", terms)
+
+class TestShardName(unittest.TestCase):
+    def test_plain_prefix(self):
+        self.assertEqual(shard_name("hobbit"), "ho")
+        self.assertEqual(shard_name("hobbit", 3), "hob")
+        self.assertEqual(shard_name("x1"), "x1")
+
+    def test_non_ascii_prefix_is_hex(self):
+        self.assertEqual(shard_name("éowyn"), "-c3a96f")
+        self.assertEqual(shard_name("eä"), "-65c3a4")
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.update("/a/", "A", {"hobbit": 2, "ring": 1}, "hash-a")
+        self.index.update("/b/", "B", {"hobbit": 1, "tom": 3}, "hash-b")
+        self.changes = self.index.render_changes()
+
+    def test_render_changes(self):
+        self.assertEqual(sorted(self.changes), ["docs.json", f"{SHARDS_DIR}/ho.json", f"{SHARDS_DIR}/ri.json",
+                                                f"{SHARDS_DIR}/to.json"])
+        self.assertEqual(json.loads(self.changes[f"{SHARDS_DIR}/ho.json"]), {"hobbit": [0, 2, 1, 1]})
+        docs = json.loads(self.changes["docs.json"])
+        self.assertEqual(docs["docs"], [["/a/", "A"], ["/b/", "B"]])
+        self.assertEqual(docs["prefix_length"], 2)
+        self.assertEqual(self.index.render_changes(), {})
+
+    def test_doc_ids_are_delta_encoded(self):
+        self.index.update("/c/", "C", {"hobbit": 4}, "hash-c")
+        self.index.remove("/a/")
+        self.assertEqual(self.index.render_shard(["hobbit"]), '{"hobbit":[1,1,1,4]}')
+
+    def test_update_only_dirties_changed_tokens(self):
+        self.index.update("/a/", "A", {"hobbit": 2, "ring": 2}, "hash-a2")
+        self.assertEqual(list(self.index.render_changes()), [f"{SHARDS_DIR}/ri.json"])
+        self.assertEqual(self.index.source_hash("/a/"), "hash-a2")
+
+    def test_title_change_rewrites_docs(self):
+        self.index.update("/a/", "New A", {"hobbit": 2, "ring": 1}, "hash-a2")
+        self.assertEqual(list(self.index.render_changes()), ["docs.json"])
+
+    def test_base_path_change_rewrites_docs(self):
+        changes = self.index.render_changes("/site/")
+        self.assertEqual(list(changes), ["docs.json"])
+        self.assertEqual(json.loads(changes["docs.json"])["docs"][0], ["/site/a/", "A"])
+
+    def test_remove_deletes_empty_shards(self):
+        self.assertTrue(self.index.remove("/b/"))
+        self.assertFalse(self.index.remove("/b/"))
+        changes = self.index.render_changes()
+        self.assertIsNone(changes[f"{SHARDS_DIR}/to.json"])
+        self.assertEqual(json.loads(changes[f"{SHARDS_DIR}/ho.json"]), {"hobbit": [0, 2]})
+        self.assertEqual(json.loads(changes["docs.json"])["docs"], [["/a/", "A"], None])
+
+    def test_removed_ids_are_reused(self):
+        self.index.remove("/a/")
+        self.index.update("/c/", "C", {"ring": 1})
+        self.assertEqual(self.index.pages["/c/"][0], 0)
+        self.assertEqual(self.index.next_id, 2)
+
+    def test_retain(self):
+        self.assertEqual(self.index.retain({"/a/"}), ["/b/"])
+        self.assertEqual(list(self.index.pages), ["/a/"])
+
+    def test_mark_missing(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(temp_dir, SHARDS_DIR))
+            with open(os.path.join(temp_dir, SHARDS_DIR, "ho.json"), "w") as f:
+                f.write(self.changes[f"{SHARDS_DIR}/ho.json"])
+            self.assertEqual(self.index.mark_missing(temp_dir), 3)
+            self.assertEqual(sorted(self.index.render_changes()),
+                             ["docs.json", f"{SHARDS_DIR}/ri.json", f"{SHARDS_DIR}/to.json"])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_rebuild_all(self):
+        self.index.rebuild_all()
+        self.assertEqual(len(self.index.render_changes()), 4)
+
+    def test_shard_sizes(self):
+        sizes = self.index.shard_sizes()
+        self.assertEqual(sorted(sizes), ["ho", "ri", "to"])
+        self.assertEqual(sizes["ri"], len('{"ring":[0,1]}'))
+
+class TestSearchIndexPersistence(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, ".build", "search.marshal")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_and_load(self):
+        index = SearchIndex(self.path)
+        index.update("/a/", "A", {"hobbit": 2}, "hash-a")
+        index.render_changes("/site/")
+        index.save()
+
+        loaded = SearchIndex.load(self.path)
+        self.assertEqual(loaded.pages, index.pages)
+        self.assertEqual(loaded.postings, index.postings)
+        self.assertEqual(loaded.render_changes("/site/"), {})
+
+    def test_load_missing_or_corrupt(self):
+        self.assertEqual(SearchIndex.load(self.path).pages, {})
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"\x00garbage")
+        self.assertEqual(SearchIndex.load(self.path).pages, {})
+
+    def test_other_version_or_prefix_length_starts_empty(self):
+        index = SearchIndex(self.path)
+        index.update("/a/", "A", {"hobbit": 2})
+        index.save()
+        self.assertEqual(SearchIndex.load(self.path, 3).pages, {})
+        with mock.patch.object(search_index_module, "GENERATOR_VERSION", "next"):
+            self.assertEqual(SearchIndex.load(self.path).pages, {})
+
+class TestSearchPage(unittest.TestCase):
+    def test_index_url(self):
+        page = search_page("/site/")
+        self.assertIn('"/site/search/"', page)
+        self.assertIn(f'"{SHARDS_DIR}/"', page)
+        self.assertNotIn("__", page)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import os
+from document import parse_document
+from site_index import (Listing, listing_node, page_metadata, page_url, paginate, render_feed, render_sitemap,
+                        site_pages, url_dest_path)
+
+def make_posts(count):
+    return [{"url": f"/blog/post-{i}/", "title": f"Post {i}", "date": f"2024-01-{i + 1:02d}T00:00:00Z",
+             "summary": f"Summary {i}"} for i in range(count)]
+
+class TestPageMetadata(unittest.TestCase):
+    def test_page_metadata(self):
+        markdown = "# Post\n\n[< Back](/)\n\nFirst *real* paragraph."
+        self.assertEqual(page_metadata(parse_document(markdown)), {
+            "title": "Post",
+            "date": None,
+            "summary": "First real paragraph.",
+            "tags": [],
+        })
+
+    def test_page_metadata_from_front_matter(self):
+        document = parse_document("# Heading\n\nText.")
+        document.front_matter = {"title": "Front", "date": "2024-03-04T00:00:00Z", "tags": ["elves"]}
+        self.assertEqual(page_metadata(document), {
+            "title": "Front",
+            "date": "2024-03-04T00:00:00Z",
+            "summary": "Text.",
+            "tags": ["elves"],
+        })
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "notes.html"), "docs"), "/blog/notes.html")
+
+    def test_url_dest_path(self):
+        self.assertEqual(url_dest_path("/", "docs"), os.path.join("docs", "index.html"))
+        self.assertEqual(url_dest_path("/blog/page/2/", "docs"), os.path.join("docs", "blog", "page", "2", "index.html"))
+
+    def test_site_pages_sorted_oldest_first(self):
+        metadata = {
+            os.path.join("docs", "b", "index.html"): {"title": "B", "date": "2024-01-01T00:00:00Z", "summary": None},
+            os.path.join("docs", "a", "index.html"): {"title": "A", "date": "2024-01-01T00:00:00Z", "summary": None},
+            os.path.join("docs", "index.html"): {"title": "Home", "date": "2023-01-01T00:00:00Z", "summary": None},
+            os.path.join("docs", "gone", "index.html"): {"title": "Gone", "date": "2022-01-01T00:00:00Z", "summary": None},
+        }
+        dest_paths = [path for path in metadata if "gone" not in path]
+        self.assertEqual([page["url"] for page in site_pages(metadata, dest_paths, "docs")], ["/", "/a/", "/b/"])
+
+    def test_undated_pages_first_by_url(self):
+        metadata = {
+            os.path.join("docs", "c", "index.html"): {"title": "C", "date": None, "summary": None},
+            os.path.join("docs", "b", "index.html"): {"title": "B", "date": "2024-01-01T00:00:00Z", "summary": None},
+            os.path.join("docs", "a", "index.html"): {"title": "A", "date": None, "summary": None},
+        }
+        self.assertEqual([page["url"] for page in site_pages(metadata, list(metadata), "docs")], ["/a/", "/c/", "/b/"])
+
+class TestPaginate(unittest.TestCase):
+    def test_pages_fill_from_oldest(self):
+        listings = paginate(make_posts(5), "/blog/", per_page=2)
+        self.assertEqual([listing.url for listing in listings], ["/blog/page/1/", "/blog/page/2/", "/blog/"])
+        self.assertEqual([post["title"] for post in listings[0].posts], ["Post 1", "Post 0"])
+        self.assertEqual([post["title"] for post in listings[2].posts], ["Post 4"])
+        self.assertEqual((listings[0].newer_url, listings[0].older_url), ("/blog/page/2/", None))
+        self.assertEqual((listings[2].newer_url, listings[2].older_url), (None, "/blog/page/2/"))
+
+    def test_new_post_only_changes_newest_page(self):
+        before = paginate(make_posts(5), "/blog/", per_page=2)
+        after = paginate(make_posts(6), "/blog/", per_page=2)
+        self.assertEqual([listing.inputs() for listing in before[:2]], [listing.inputs() for listing in after[:2]])
+        self.assertNotEqual(before[2].inputs(), after[2].inputs())
+
+    def test_undated_and_tied_posts_order(self):
+        metadata = {}
+        for name, date in [("e", "2024-01-02T00:00:00Z"), ("d", "2024-01-01T00:00:00Z"), ("c", None),
+                           ("b", "2024-01-01T00:00:00Z"), ("a", None)]:
+            metadata[os.path.join("docs", "blog", name, "index.html")] = {"title": name, "date": date, "summary": None}
+        listings = paginate(site_pages(metadata, list(metadata), "docs"), "/blog/", per_page=2)
+        self.assertEqual([[post["title"] for post in listing.posts] for listing in listings],
+                         [["c", "a"], ["d", "b"], ["e"]])
+
+    def test_index_taken(self):
+        listings = paginate(make_posts(3), "/blog/", per_page=2, index_taken=True)
+        self.assertEqual([listing.url for listing in listings], ["/blog/page/1/", "/blog/page/2/"])
+
+    def test_no_posts(self):
+        self.assertEqual(paginate([], "/blog/"), [])
+
+class TestRender(unittest.TestCase):
+    def test_listing_node(self):
+        listing = Listing("/blog/page/2/", 2, make_posts(1), "/blog/", "/blog/page/1/")
+        self.assertEqual(
+            listing_node(listing, "Blog", "/site/").to_html(),
+            "<div><h1>Blog</h1><ul><li><a href=/site/blog/post-0/>Post 0</a> "
+            "<time datetime=2024-01-01>2024-01-01</time><p>Summary 0</p></li></ul>"
+            "<nav><a href=/site/blog/>Newer posts</a> <a href=/site/blog/page/1/>Older posts</a></nav></div>",
+        )
+
+    def test_listing_node_escapes_text(self):
+        posts = [{"url": "/blog/a/", "title": "A <b>", "date": "2024-01-01T00:00:00Z", "summary": None}]
+        html = listing_node(Listing("/blog/", 1, posts), "Blog").to_html()
+        self.assertIn(">A &lt;b&gt;</a>", html)
+        self.assertNotIn("<p>", html)
+        self.assertNotIn("<nav>", html)
+
+    def test_listing_node_without_date(self):
+        posts = [{"url": "/blog/a/", "title": "A", "date": None, "summary": None}]
+        self.assertEqual(listing_node(Listing("/blog/", 1, posts), "Blog").to_html(),
+                         "<div><h1>Blog</h1><ul><li><a href=/blog/a/>A</a></li></ul></div>")
+
+    def test_render_sitemap(self):
+        sitemap = render_sitemap([("/blog/", "2024-01-02T00:00:00Z"), ("/", "2024-01-01T00:00:00Z")],
+                                 "https://example.com/", "/site/")
+        self.assertEqual(sitemap.splitlines()[2:4], [
+            "  <url><loc>https://example.com/site/</loc><lastmod>2024-01-01</lastmod></url>",
+            "  <url><loc>https://example.com/site/blog/</loc><lastmod>2024-01-02</lastmod></url>",
+        ])
+
+    def test_render_sitemap_without_date(self):
+        sitemap = render_sitemap([("/b/", None), ("/a/", "2024-01-01T00:00:00Z")], "https://example.com")
+        self.assertEqual(sitemap.splitlines()[2:4], [
+            "  <url><loc>https://example.com/a/</loc><lastmod>2024-01-01</lastmod></url>",
+            "  <url><loc>https://example.com/b/</loc></url>",
+        ])
+
+    def test_render_feed(self):
+        posts = make_posts(2)[::-1]
+        posts[0]["title"] = "Fish & Chips"
+        feed = render_feed(posts, "Site", "/atom.xml", "https://example.com", "/site/")
+        self.assertIn('<link rel="self" href="https://example.com/site/atom.xml"/>', feed)
+        self.assertIn("<updated>2024-01-02T00:00:00Z</updated>\n  <author>", feed)
+        self.assertIn("<title>Fish &amp; Chips</title>", feed)
+        self.assertNotIn("<category", feed)
+        posts[1]["tags"] = ["elves"]
+        self.assertIn('<category term="elves"/>', render_feed(posts, "Site", "/atom.xml", "https://example.com"))
+        self.assertEqual(feed.count("<entry>"), 2)
+        self.assertLess(feed.index("post-1"), feed.index("post-0"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import tempfile
+import shutil
+from unittest import mock
+import static_sync
+from static_sync import sync_static
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "static")
+        self.dest_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(os.path.join(self.source_dir, "images"))
+        self.write("index.css", "body { color: black; }")
+        self.write(os.path.join("images", "logo.png"), "not really a png")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, rel_path, content):
+        with open(os.path.join(self.source_dir, rel_path), "w") as f:
+            f.write(content)
+
+    def read_dest(self, rel_path):
+        with open(os.path.join(self.dest_dir, rel_path), "r") as f:
+            return f.read()
+
+    def sync(self, previous=None, **kwargs):
+        with mock.patch.object(static_sync, "_write_file", wraps=static_sync._write_file) as write_file:
+            record = sync_static(self.source_dir, self.dest_dir, previous, **kwargs)
+        written = sorted(os.path.relpath(call.args[0], self.source_dir) for call in write_file.call_args_list)
+        return record, written
+
+    def test_first_sync_copies_everything(self):
+        record, written = self.sync()
+        self.assertEqual(written, [os.path.join("images", "logo.png"), "index.css"])
+        self.assertEqual(sorted(record), written)
+        self.assertEqual(self.read_dest("index.css"), "body { color: black; }")
+
+    def test_unchanged_files_are_skipped(self):
+        record, _ = self.sync()
+        _, written = self.sync(record)
+        self.assertEqual(written, [])
+
+    def test_changed_file_is_copied(self):
+        record, _ = self.sync()
+        self.write("index.css", "body { color: white; }")
+        _, written = self.sync(record)
+        self.assertEqual(written, ["index.css"])
+        self.assertEqual(self.read_dest("index.css"), "body { color: white; }")
+
+    def test_deleted_source_is_removed(self):
+        record, _ = self.sync()
+        with open(os.path.join(self.dest_dir, "index.html"), "w") as f:
+            f.write("<h1>Generated page</h1>")
+
+        os.remove(os.path.join(self.source_dir, "images", "logo.png"))
+        record, _ = self.sync(record)
+        self.assertNotIn(os.path.join("images", "logo.png"), record)
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "images")))
+        # Files the sync didn't put there are left alone
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "index.html")))
+
+    def test_hash_ignores_touched_files(self):
+        record, _ = self.sync(compare="hash")
+        source = os.path.join(self.source_dir, "index.css")
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        _, written = self.sync(record, compare="hash")
+        self.assertEqual(written, [])
+
+    def test_hash_detects_same_size_change(self):
+        record, _ = self.sync(compare="hash")
+        self.write("index.css", "body { color: whits; }")
+        _, written = self.sync(record, compare="hash")
+        self.assertEqual(written, ["index.css"])
+
+    def test_hardlink(self):
+        self.sync(method="hardlink")
+        source_stat = os.stat(os.path.join(self.source_dir, "index.css"))
+        dest_stat = os.stat(os.path.join(self.dest_dir, "index.css"))
+        self.assertEqual(source_stat.st_ino, dest_stat.st_ino)
+
+    def test_copy_file_range(self):
+        self.sync(method="copy_file_range")
+        self.assertEqual(self.read_dest(os.path.join("images", "logo.png")), "not really a png")
+        source_stat = os.stat(os.path.join(self.source_dir, "index.css"))
+        dest_stat = os.stat(os.path.join(self.dest_dir, "index.css"))
+        self.assertNotEqual(source_stat.st_ino, dest_stat.st_ino)
+        self.assertEqual(source_stat.st_mtime_ns, dest_stat.st_mtime_ns)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.source_dir, self.dest_dir, method="rsync")
+        with self.assertRaises(ValueError):
+            sync_static(self.source_dir, self.dest_dir, compare="size")
+
+if __name__ == "__main__":
+    unittest.main()
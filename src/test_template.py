@@ -0,0 +1,86 @@
+import io
+import unittest
+import os
+import tempfile
+import shutil
+from template import Template, load_template
+
+class TestTemplate(unittest.TestCase):
+    def test_minify(self):
+        template = Template('<html>\n  <link href="/index.css" />\n  <title>{{ Title }}</title>\n</html>\n', "/site/",
+                            minify=True)
+        self.assertTrue(template.minify)
+        self.assertEqual(template.render({"Title": "Hi"}), "<html><link href=/site/index.css /><title>Hi</title></html>")
+
+    def test_compile(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual([name for name, _ in template.slots], ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        html = template.render({"Title": "Hello", "Content": "<p>World</p>"})
+        self.assertEqual(html, "<title>Hello</title><body><p>World</p></body>")
+
+    def test_iter_render_with_chunks(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        chunks = iter(["<p>", "World", "</p>"])
+        html = "".join(template.iter_render({"Title": "Hello", "Content": chunks}))
+        self.assertEqual(html, "<title>Hello</title><body><p>World</p></body>")
+
+    def test_render_to(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        fp = io.StringIO()
+        template.render_to(fp, {"Title": "Hi", "Content": iter(["<p>", "x", "</p>"])})
+        self.assertEqual(fp.getvalue(), "<title>Hi</title><p>x</p>")
+
+    def test_render_repeated_slot(self):
+        template = Template("<title>{{ Title }}</title><h1>{{ Title }}</h1>")
+        self.assertEqual(template.render({"Title": "Hi"}), "<title>Hi</title><h1>Hi</h1>")
+
+    def test_render_missing_value_keeps_placeholder(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(template.render({"Title": "Hi"}), "<title>Hi</title>{{ Content }}")
+
+    def test_render_does_not_expand_values(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        html = template.render({"Title": "{{ Content }}", "Content": "{{ Title }}"})
+        self.assertEqual(html, "<title>{{ Content }}</title>{{ Title }}")
+
+    def test_base_path_resolved_at_compile_time(self):
+        template = Template('<link href="/index.css" /><a href="https://example.com">x</a>{{ Content }}', "/site/")
+        html = template.render({"Content": '<a href="/in-content">y</a>'})
+        self.assertEqual(
+            html,
+            '<link href="/site/index.css" /><a href="https://example.com">x</a><a href="/in-content">y</a>',
+        )
+
+    def test_no_slots(self):
+        template = Template("<html><body>No placeholders</body></html>")
+        self.assertEqual(template.render({"Title": "Hi"}), "<html><body>No placeholders</body></html>")
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.temp_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_cached_until_modified(self):
+        template = load_template(self.template_path)
+        self.assertIs(load_template(self.template_path), template)
+
+        with open(self.template_path, "w") as f:
+            f.write("<h1>{{ Title }}</h1>")
+        stat = os.stat(self.template_path)
+        os.utime(self.template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        reloaded = load_template(self.template_path)
+        self.assertIsNot(reloaded, template)
+        self.assertEqual(reloaded.render({"Title": "Hi"}), "<h1>Hi</h1>")
+
+if __name__ == "__main__":
+    unittest.main()
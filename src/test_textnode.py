@@ -2,6 +2,17 @@ import unittest
 from text_type import TextType
 from textnode import TextNode
 
+def split_pipeline_text_to_textnodes(text: str) -> list[TextNode]:
+    """The multi-pass pipeline text_to_textnodes used to run, kept as a reference."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = TextNode.split_nodes_image(nodes)
+    nodes = TextNode.split_nodes_link(nodes)
+    nodes = TextNode.split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = TextNode.split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = TextNode.split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = TextNode.split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
 class TestTextToTextNodes(unittest.TestCase):
     def test_text_to_textnodes_simple(self):
         text = "This is a simple text"
@@ -100,6 +111,91 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertEqual(nodes[1].text_type, TextType.ITALIC)
         self.assertEqual(nodes[2].text, " text")
 
+    def test_text_to_textnodes_empty(self):
+        self.assertEqual(TextNode.text_to_textnodes(""), [])
+
+    def test_text_to_textnodes_code_contents_not_parsed(self):
+        nodes = TextNode.text_to_textnodes("Run `a * b_c` now")
+        self.assertEqual(nodes, [
+            TextNode("Run ", TextType.TEXT),
+            TextNode("a * b_c", TextType.CODE),
+            TextNode(" now", TextType.TEXT),
+        ])
+
+    def test_text_to_textnodes_plain_brackets(self):
+        text = "A [note] and a ! and ![not an image]"
+        self.assertEqual(TextNode.text_to_textnodes(text), [TextNode(text, TextType.TEXT)])
+
+    def test_text_to_textnodes_unclosed_delimiter(self):
+        with self.assertRaises(ValueError):
+            TextNode.text_to_textnodes("This is **unclosed")
+        with self.assertRaises(ValueError):
+            TextNode.text_to_textnodes("This is `unclosed")
+
+    def test_text_to_textnodes_matches_split_pipeline(self):
+        texts = [
+            "This is a simple text",
+            "This is **bold** and *italic* and `code` text",
+            "This is a [link](https://example.com) and an ![image](https://example.com/img.png) with **bold** text",
+            "This is *italic* and **bold** and _also italic_ text",
+            "This is *italic with _nested_ italic* text",
+            "**Bold** at the start and `code` at the end `x`",
+            "![first](a.png)![second](b.png) then [a](/a)[b](/b)",
+            "Disney _didn't ruin it_ (okay, but Amazon might have)",
+            "Links to [Boot.dev](https://www.boot.dev) and [the course](https://www.boot.dev/courses/x)",
+        ]
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(TextNode.text_to_textnodes(text), split_pipeline_text_to_textnodes(text))
+
+class TestSplitNodesImageLink(unittest.TestCase):
+    def test_split_nodes_image(self):
+        nodes = TextNode.split_nodes_image([TextNode("A ![one](1.png) and ![two](2.png)", TextType.TEXT)])
+        self.assertEqual(nodes, [
+            TextNode("A ", TextType.TEXT),
+            TextNode("one", TextType.IMAGE, "1.png"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("two", TextType.IMAGE, "2.png"),
+        ])
+
+    def test_split_nodes_link(self):
+        nodes = TextNode.split_nodes_link([TextNode("[one](/1) and [two](/2) end", TextType.TEXT)])
+        self.assertEqual(nodes, [
+            TextNode("one", TextType.LINK, "/1"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("two", TextType.LINK, "/2"),
+            TextNode(" end", TextType.TEXT),
+        ])
+
+    def test_split_nodes_link_repeated(self):
+        nodes = TextNode.split_nodes_link([TextNode("[a](/a) x [a](/a) y [a](/a)", TextType.TEXT)])
+        self.assertEqual([node.text_type for node in nodes], [
+            TextType.LINK, TextType.TEXT, TextType.LINK, TextType.TEXT, TextType.LINK,
+        ])
+        self.assertEqual(nodes[1].text, " x ")
+        self.assertEqual(nodes[3].text, " y ")
+
+    def test_split_nodes_link_same_text_as_image(self):
+        # The link must be split where it occurs, not inside the identical-looking image
+        nodes = TextNode.split_nodes_link([TextNode("![a](/a) then [a](/a)", TextType.TEXT)])
+        self.assertEqual(nodes, [
+            TextNode("![a](/a) then ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "/a"),
+        ])
+
+    def test_split_nodes_no_matches_keeps_node(self):
+        node = TextNode("No links here", TextType.TEXT)
+        bold = TextNode("[a](/a)", TextType.BOLD)
+        self.assertEqual(TextNode.split_nodes_link([node, bold]), [node, bold])
+        self.assertIs(TextNode.split_nodes_link([node])[0], node)
+
+    def test_split_nodes_link_many(self):
+        text = " ".join(f"[link {i}](/{i})" for i in range(300))
+        nodes = TextNode.split_nodes_link([TextNode(text, TextType.TEXT)])
+        links = [node for node in nodes if node.text_type == TextType.LINK]
+        self.assertEqual(len(links), 300)
+        self.assertEqual(links[299], TextNode("link 299", TextType.LINK, "/299"))
+
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
         node = TextNode("This is a text node", TextType.BOLD)
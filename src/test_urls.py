@@ -0,0 +1,46 @@
+import unittest
+from urls import is_root_relative, normalize_base_path, resolve_url, resolve_root_relative_attrs
+
+class TestNormalizeBasePath(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_base_path("/"), "/")
+        self.assertEqual(normalize_base_path("site"), "/site/")
+        self.assertEqual(normalize_base_path("/site"), "/site/")
+        self.assertEqual(normalize_base_path("/site/"), "/site/")
+
+class TestResolveUrl(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(resolve_url("/images/a.png", "/site/"), "/site/images/a.png")
+
+    def test_default_base_path(self):
+        self.assertEqual(resolve_url("/images/a.png"), "/images/a.png")
+
+    def test_other_urls_unchanged(self):
+        self.assertEqual(resolve_url("https://example.com", "/site/"), "https://example.com")
+        self.assertEqual(resolve_url("images/a.png", "/site/"), "images/a.png")
+        self.assertEqual(resolve_url("//cdn.example.com/a.js", "/site/"), "//cdn.example.com/a.js")
+        self.assertEqual(resolve_url("#top", "/site/"), "#top")
+        self.assertIsNone(resolve_url(None, "/site/"))
+
+    def test_is_root_relative(self):
+        self.assertTrue(is_root_relative("/images/a.png"))
+        self.assertTrue(is_root_relative("/"))
+        self.assertFalse(is_root_relative("//cdn.example.com/a.js"))
+        self.assertFalse(is_root_relative("images/a.png"))
+        self.assertFalse(is_root_relative(""))
+        self.assertFalse(is_root_relative(None))
+
+class TestResolveRootRelativeAttrs(unittest.TestCase):
+    def test_quoted_and_unquoted(self):
+        html = """<link href="/a.css"><img src='/b.png'><a href=/c>c</a>"""
+        self.assertEqual(
+            resolve_root_relative_attrs(html, "/site/"),
+            """<link href="/site/a.css"><img src='/site/b.png'><a href=/site/c>c</a>""",
+        )
+
+    def test_other_attrs_unchanged(self):
+        html = """<a href="https://example.com" data-href="/x">x</a>"""
+        self.assertEqual(resolve_root_relative_attrs(html, "/site/"), html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+from watch import snapshot, diff_snapshots, watch_changes
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "content", "blog"))
+        self.page = os.path.join(self.temp_dir, "content", "blog", "index.md")
+        with open(self.page, "w") as f:
+            f.write("# Blog")
+        self.template = os.path.join(self.temp_dir, "template.html")
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def paths(self):
+        return [os.path.join(self.temp_dir, "content"), self.template, os.path.join(self.temp_dir, "missing")]
+
+    def test_snapshot(self):
+        files = snapshot(self.paths())
+        self.assertEqual(sorted(files), sorted([self.page, self.template]))
+        self.assertEqual(files[self.template][1], len("{{ Content }}"))
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), {"b", "c", "d"})
+
+    def test_watch_changes(self):
+        changes = watch_changes(self.paths(), interval=0.01)
+
+        def edit():
+            with open(self.page, "w") as f:
+                f.write("# Blog\n\nNew post")
+
+        # The first poll takes the baseline snapshot, so edit once polling has started
+        timer = threading.Timer(0.1, edit)
+        timer.start()
+        try:
+            self.assertEqual(next(changes), {self.page})
+        finally:
+            timer.cancel()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,16 @@
 import re
 from text_type import TextType
+from block import iter_blocks
+
+# Inline markdown syntax, matched by the single-pass tokenizer in text_to_textnodes
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_SPECIAL_PATTERN = re.compile(r"[!\[*_`]")
+DELIMITER_TEXT_TYPES = {"**": TextType.BOLD, "*": TextType.ITALIC, "_": TextType.ITALIC, "`": TextType.CODE}
 
 class TextNode:
     __match_args__ = ("text", "text_type", "url")
+    __slots__ = ("text", "text_type", "url")
 
     def __init__(self, text: str, text_type: TextType, url: str = None):
         self.text = text
@@ -46,75 +54,103 @@ class TextNode:
 
     @staticmethod
     def split_nodes_image(old_nodes: list["TextNode"]) -> list["TextNode"]:
-        new_nodes = []
-        for old_node in old_nodes:
-            if old_node.text_type != TextType.TEXT:
-                new_nodes.append(old_node)
-                continue
-            original_text = old_node.text
-            images = TextNode._extract_markdown_images(old_node.text)
-            if not images:
-                new_nodes.append(old_node)
-                continue
-
-            for alt_text, url in images:
-                sections = original_text.split(f"![{alt_text}]({url})", 1)
-                if sections[0] != "":
-                    new_nodes.append(TextNode(sections[0], TextType.TEXT))
-                new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-                original_text = sections[1]
-            if original_text != "":
-                new_nodes.append(TextNode(original_text, TextType.TEXT))
-        return new_nodes
+        return TextNode._split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
     @staticmethod
     def split_nodes_link(old_nodes: list["TextNode"]) -> list["TextNode"]:
+        return TextNode._split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+    @staticmethod
+    def _split_nodes_pattern(old_nodes: list["TextNode"], pattern: re.Pattern, text_type: TextType) -> list["TextNode"]:
+        """Split TEXT nodes around every match of an image or link pattern.
+
+        Each text is scanned once and sliced at the match offsets, so the cost is
+        linear in its length however many matches it contains, and repeated
+        identical matches are split at their actual positions.
+        """
         new_nodes = []
         for old_node in old_nodes:
             if old_node.text_type != TextType.TEXT:
                 new_nodes.append(old_node)
                 continue
-            original_text = old_node.text
-            links = TextNode._extract_markdown_links(old_node.text)
-            if not links:
-                new_nodes.append(old_node)
-                continue
 
-            for link_text, url in links:
-                sections = original_text.split(f"[{link_text}]({url})", 1)
-                if sections[0] != "":
-                    new_nodes.append(TextNode(sections[0], TextType.TEXT))
-                new_nodes.append(TextNode(link_text, TextType.LINK, url))
-                original_text = sections[1]
-            if original_text != "":
-                new_nodes.append(TextNode(original_text, TextType.TEXT))
+            text = old_node.text
+            position = 0
+            for match in pattern.finditer(text):
+                if match.start() > position:
+                    new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+                new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+                position = match.end()
+
+            if position == 0:
+                new_nodes.append(old_node)
+            elif position < len(text):
+                new_nodes.append(TextNode(text[position:], TextType.TEXT))
         return new_nodes
 
     @staticmethod
     def _extract_markdown_images(text: str) -> list[tuple[str, str]]:
-        return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+        return IMAGE_PATTERN.findall(text)
 
     @staticmethod
     def _extract_markdown_links(text: str) -> list[tuple[str, str]]:
-        return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+        return LINK_PATTERN.findall(text)
 
     @staticmethod
     def text_to_textnodes(text: str) -> list["TextNode"]:
         """Convert a markdown text string into a list of TextNodes.
 
+        The text is scanned once from left to right. Images and links are
+        recognised first at each position, then the **, *, _ and ` delimiters;
+        a delimited span runs to the next occurrence of the same delimiter and
+        its contents are not parsed further.
+
         Args:
             text: A string containing markdown text
 
         Returns:
             A list of TextNode objects representing the parsed markdown
+
+        Raises:
+            ValueError: If a delimiter is never closed
         """
-        nodes = [TextNode(text, TextType.TEXT)]
-        nodes = TextNode.split_nodes_image(nodes)  # Process images first
-        nodes = TextNode.split_nodes_link(nodes)   # Then process links
-        nodes = TextNode.split_nodes_delimiter(nodes, "**", TextType.BOLD)  # Process bold text
-        nodes = TextNode.split_nodes_delimiter(nodes, "*", TextType.ITALIC)  # Process italic text with *
-        nodes = TextNode.split_nodes_delimiter(nodes, "_", TextType.ITALIC)  # Process italic text with _
-        nodes = TextNode.split_nodes_delimiter(nodes, "`", TextType.CODE)  # Process code blocks
+        nodes = []
+        text_start = 0  # Start of the plain text not yet emitted
+        position = 0
+        while True:
+            special = INLINE_SPECIAL_PATTERN.search(text, position)
+            if special is None:
+                break
+            index = special.start()
+            char = text[index]
+
+            if char == "!" or char == "[":
+                pattern = IMAGE_PATTERN if char == "!" else LINK_PATTERN
+                match = pattern.match(text, index)
+                if match is None:
+                    # Not an image or link, so the character is plain text
+                    position = index + 1
+                    continue
+                text_type = TextType.IMAGE if char == "!" else TextType.LINK
+                if index > text_start:
+                    nodes.append(TextNode(text[text_start:index], TextType.TEXT))
+                nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+                text_start = position = match.end()
+                continue
+
+            delimiter = "**" if text.startswith("**", index) else char
+            content_start = index + len(delimiter)
+            content_end = text.find(delimiter, content_start)
+            if content_end == -1:
+                raise ValueError(f"Unclosed delimiter {delimiter} in text")
+            if index > text_start:
+                nodes.append(TextNode(text[text_start:index], TextType.TEXT))
+            if content_end > content_start:
+                nodes.append(TextNode(text[content_start:content_end], DELIMITER_TEXT_TYPES[delimiter]))
+            text_start = position = content_end + len(delimiter)
+
+        if text_start < len(text):
+            nodes.append(TextNode(text[text_start:], TextType.TEXT))
         return nodes
 
     @staticmethod
@@ -127,12 +163,4 @@ class TextNode:
         Returns:
             A list of TextNode objects representing the parsed markdown
         """
-        # Split into blocks and normalize each block
-        blocks = []
-        for block in markdown.split("\n\n"):
-            # Normalize whitespace in multi-line blocks
-            lines = [line.strip() for line in block.strip().split("\n")]
-            normalized_block = "\n".join(lines)
-            if normalized_block:  # Skip empty blocks
-                blocks.append(TextNode(normalized_block, TextType.TEXT))
-        return blocks
+        return [TextNode(block.text, TextType.TEXT) for block in iter_blocks(markdown)]
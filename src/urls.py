@@ -0,0 +1,43 @@
+import re
+
+# Node props holding URLs that are resolved against the base path
+URL_PROPS = ("href", "src")
+
+# Matches the start of a root-relative href/src attribute value, quoted or not
+ROOT_RELATIVE_ATTR_PATTERN = re.compile(r"""(?<![\w-])(href|src)=(["']?)/(?!/)""")
+
+def normalize_base_path(base_path: str) -> str:
+    """Make sure a base path starts and ends with a slash."""
+    if not base_path.startswith("/"):
+        base_path = "/" + base_path
+    if not base_path.endswith("/"):
+        base_path = base_path + "/"
+    return base_path
+
+def is_root_relative(url: str) -> bool:
+    """Check whether a URL is relative to the site root, like /images/a.png but not //cdn.example.com/a.png."""
+    return bool(url) and url.startswith("/") and not url.startswith("//")
+
+def resolve_url(url: str, base_path: str = "/") -> str:
+    """Prefix a root-relative URL with the site's base path.
+
+    Args:
+        url: The URL of a link or image
+        base_path: Base path for the site, starting and ending with a slash
+
+    Returns:
+        The URL under base_path if it was root-relative, otherwise the URL unchanged
+    """
+    if base_path == "/" or not is_root_relative(url):
+        return url
+    return base_path + url[1:]
+
+def resolve_root_relative_attrs(html: str, base_path: str = "/") -> str:
+    """Prefix every root-relative href and src attribute in an HTML string with the base path.
+
+    Only meant for markup written by hand, such as a template; generated
+    content has its URLs resolved when the node tree is built.
+    """
+    if base_path == "/":
+        return html
+    return ROOT_RELATIVE_ATTR_PATTERN.sub(lambda match: f"{match.group(1)}={match.group(2)}{base_path}", html)
@@ -0,0 +1,66 @@
+import os
+import time
+from typing import Iterator
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """
+    Record the modification time and size of every file under the given paths.
+
+    Args:
+        paths: Files and directories to scan; directories are scanned recursively
+            and paths that don't exist are skipped
+
+    Returns:
+        A dict mapping each file path to its (mtime_ns, size)
+    """
+    files = {}
+    stack = list(paths)
+    while stack:
+        path = stack.pop()
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            else:
+                stat = os.stat(path)
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            # Deleted while scanning
+            continue
+    return files
+
+def diff_snapshots(old: dict, new: dict) -> set[str]:
+    """Return the paths added, removed or modified between two snapshots."""
+    changed = {path for path, stat in new.items() if old.get(path) != stat}
+    changed.update(path for path in old if path not in new)
+    return changed
+
+def watch_changes(paths: list[str], interval: float = 0.05) -> Iterator[set[str]]:
+    """
+    Poll the given paths forever, yielding each batch of changed files.
+
+    Polling only needs os.scandir, so it works the same on every platform and
+    filesystem. A batch is yielded once a poll finds changes; edits that land
+    while the caller handles a batch show up in the next one.
+
+    Args:
+        paths: Files and directories to watch; the list is read again on
+            every poll, so paths added to it are watched from then on
+        interval: Seconds to wait between polls (defaults to 0.05)
+
+    Yields:
+        Sets of paths that were added, removed or modified
+    """
+    previous = snapshot(paths)
+    while True:
+        time.sleep(interval)
+        current = snapshot(paths)
+        changed = diff_snapshots(previous, current)
+        previous = current
+        if changed:
+            yield changed